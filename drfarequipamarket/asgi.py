@@ -16,14 +16,14 @@ django.setup()
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
-from channels.auth import AuthMiddlewareStack
 
 django_asgi_app = get_asgi_application()
 from drfarequipamarket.chat import routing
+from drfarequipamarket.chat.middleware import TokenAuthMiddleware
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": AllowedHostsOriginValidator(
-        AuthMiddlewareStack(URLRouter(routing.websocket_urlpatterns))
+        TokenAuthMiddleware(URLRouter(routing.websocket_urlpatterns))
     )
 })
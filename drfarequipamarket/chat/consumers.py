@@ -1,80 +1,274 @@
-from channels.generic.websocket import WebsocketConsumer
-from django.shortcuts import get_object_or_404
-from asgiref.sync import async_to_sync
+from channels.generic.websocket import AsyncWebsocketConsumer
+from asgiref.sync import sync_to_async
+import asyncio
 import json
+import logging
+import time
+from functools import wraps
+from urllib.parse import parse_qs
+from .membership import resolve_chat
 from .models import ChatGroup, GroupMessage, ChatNotification
+from .receipts import mark_messages_read
+from .typing import TypingIndicator
+from drfarequipamarket import metrics
+from drfarequipamarket.profiling import profiled
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import close_old_connections, transaction
 
-class ChatroomConsumer(WebsocketConsumer):
-    def connect(self):
+logger = logging.getLogger(__name__)
+
+def db_call(func):
+    """
+    Ejecuta ``func`` en el pool de hilos. Cada llamada a la base de datos es
+    autocontenida (no comparte transacción con otras), así que puede correr
+    en cualquier hilo; con thread_sensitive=True (el valor por defecto de
+    database_sync_to_async) todas las consultas de todos los sockets del
+    proceso se serializarían en un único hilo.
+
+    Las conexiones vencidas se cierran dentro de la misma llamada: fuera de
+    ella el hilo del pool puede no ver la conexión que abrió.
+    """
+    @wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+def parse_message_ids(value):
+    """IDs de ``value`` como enteros, o None si no es una lista de enteros."""
+    if not isinstance(value, list):
+        return None
+    message_ids = []
+    for message_id in value:
+        # int() aceptaría True o 1.5
+        if isinstance(message_id, (bool, float)):
+            return None
+        try:
+            message_ids.append(int(message_id))
+        except (TypeError, ValueError):
+            return None
+    return message_ids
+
+class ChatroomConsumer(AsyncWebsocketConsumer):
+    """
+    Consumer asíncrono del chat: la espera de eventos y los group_send no
+    ocupan hilos; solo el acceso a la base de datos pasa por un hilo, con
+    una sola llamada por evento.
+
+    Cada mensaje lleva su ``seq`` dentro del chat y los eventos de typing y
+    read el ``last_seq`` que conoce quien los envía: si el cliente ve un
+    número mayor que el último recibido, perdió mensajes. Al reconectar con
+    ``?last_seq=N`` recibe solo los mensajes posteriores a N; como se une
+    al grupo antes de consultarlos, alguno puede llegar dos veces y el
+    cliente lo descarta por ``seq``.
+    """
+
+    pending_read_ids = None
+    read_flush_task = None
+    typing_indicator = None
+    group_name = None
+    last_seq = 0
+
+    async def connect(self):
+        self.pending_read_ids = {}
         self.user = self.scope['user']
         if not self.user.is_authenticated:
-            self.close()
+            metrics.websocket_connects.labels('rejected').inc()
+            await self.close()
             return
 
+        # La sala es el producto; el vendedor con varios compradores elige
+        # el chat con ?chat=<id>.
         self.chatroom_name = self.scope['url_route']['kwargs']['chatroom_name']
-        self.chatroom = get_object_or_404(ChatGroup, group_name=self.chatroom_name)
-        
+        self.chatroom = await self._get_chatroom()
+
         # Verificar si el usuario es parte del chat
-        if self.user not in [self.chatroom.seller, self.chatroom.buyer]:
-            self.close()
+        if self.chatroom is None:
+            metrics.websocket_connects.labels('rejected').inc()
+            await self.close()
             return
 
-        async_to_sync(self.channel_layer.group_add)(
-            self.chatroom_name, self.channel_name
+        # Un grupo del channel layer por chat: los demás chats del mismo
+        # producto no reciben estos eventos.
+        self.group_name = f'chat_{self.chatroom.id}'
+        await self.channel_layer.group_add(
+            self.group_name, self.channel_name
         )
-        self.accept()
-
-    def disconnect(self, code):
-        async_to_sync(self.channel_layer.group_discard)(
-            self.chatroom_name, self.channel_name
+        self.typing_indicator = TypingIndicator(
+            self._broadcast_typing,
+            timeout=settings.CHAT_TYPING_TIMEOUT_SECONDS,
+            min_interval=settings.CHAT_TYPING_MIN_INTERVAL_SECONDS,
         )
+        await self.accept()
+        metrics.websocket_connects.labels('accepted').inc()
+        metrics.websocket_connections.inc()
+
+        last_seq = self._query_int('last_seq')
+        if last_seq is not None:
+            self.last_seq = last_seq
+            await self._replay(last_seq)
+
+    async def disconnect(self, code):
+        if self.typing_indicator is not None:
+            await self.typing_indicator.close()
+        if self.read_flush_task is not None:
+            # No se pierden las lecturas pendientes del debounce.
+            self.read_flush_task.cancel()
+            await self._flush_reads()
+        if self.group_name is not None:
+            await self.channel_layer.group_discard(
+                self.group_name, self.channel_name
+            )
+            metrics.websocket_disconnects.inc()
+            metrics.websocket_connections.dec()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Cada mensaje del socket se perfila como un request (ver profiling.py)
+        # y su duración queda en las métricas por acción.
+        started = time.perf_counter()
+        with profiled('ChatroomConsumer') as profile:
+            action = await self._receive(text_data, profile)
+        if action not in metrics.WEBSOCKET_ACTIONS:
+            action = 'invalid'
+        metrics.websocket_receive_duration.labels(action).observe(time.perf_counter() - started)
 
-    def receive(self, text_data):
+    async def _receive(self, text_data, profile):
+        action = None
         try:
             text_data_json = json.loads(text_data)
             action = text_data_json.get('action')
-            
+            if profile is not None:
+                profile.name = f'ChatroomConsumer.{action} (chat {self.chatroom.id})'
+
             if action == 'message':
-                self._handle_message(text_data_json)
+                await self._handle_message(text_data_json)
             elif action == 'typing':
-                self._handle_typing(text_data_json)
+                await self._handle_typing(text_data_json)
             elif action == 'read':
-                self._handle_read(text_data_json)
+                await self._handle_read(text_data_json)
             else:
-                self.send(text_data=json.dumps({
+                await self.send(text_data=json.dumps({
                     'error': 'Invalid action'
                 }))
         except json.JSONDecodeError:
-            self.send(text_data=json.dumps({
+            await self.send(text_data=json.dumps({
                 'error': 'Invalid JSON format'
             }))
         except ValidationError as e:
-            self.send(text_data=json.dumps({
+            await self.send(text_data=json.dumps({
                 'error': str(e)
             }))
         except Exception as e:
-            self.send(text_data=json.dumps({
+            await self.send(text_data=json.dumps({
                 'error': 'Internal server error'
             }))
+        return action
+
+    @db_call
+    def _get_chatroom(self):
+        # Una consulta (o ninguna, si está en caché) que trae solo los IDs de
+        # los participantes; el chat queda en la conexión y el resto de
+        # eventos no vuelve a consultar chats ni usuarios.
+        try:
+            product_id = int(self.chatroom_name)
+        except ValueError:
+            return None
+        return resolve_chat(product_id, self.user.id, self._query_int('chat'))
+
+    def _query_int(self, name):
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        try:
+            value = int(query[name][0])
+        except (KeyError, ValueError):
+            return None
+        return value if value >= 0 else None
+
+    async def _replay(self, last_seq):
+        messages, latest_seq = await self._missed_messages(last_seq)
+        self.last_seq = max(self.last_seq, latest_seq)
+        if messages is None:
+            # Demasiados mensajes perdidos: el cliente debe recargar el
+            # historial por REST (messages?since=...).
+            await self.send(text_data=json.dumps({
+                'action': 'resync',
+                'last_seq': self.last_seq
+            }))
+            return
+        for message in messages:
+            await self.send(text_data=json.dumps(self._message_payload(message, message.author)))
+
+    @db_call
+    def _missed_messages(self, last_seq):
+        limit = settings.CHAT_REPLAY_MAX_MESSAGES
+        messages = list(
+            GroupMessage.objects.filter(group_id=self.chatroom.id, seq__gt=last_seq)
+            .select_related('author')
+            .order_by('seq')[:limit + 1]
+        )
+        if len(messages) > limit:
+            latest_seq = ChatGroup.objects.values_list('last_seq', flat=True).get(pk=self.chatroom.id)
+            return None, latest_seq
+        return messages, messages[-1].seq if messages else last_seq
+
+    @staticmethod
+    def _message_payload(message, author):
+        return {
+            'id': message.id,
+            'seq': message.seq,
+            'body': message.body,
+            'message_type': message.message_type,
+            'file_url': message.file_url,
+            'created': message.created.isoformat(),
+            'author': {
+                'id': author.id,
+                'email': author.email
+            }
+        }
+
+    def _recipient_id(self):
+        if self.user.id == self.chatroom.seller_id:
+            return self.chatroom.buyer_id
+        return self.chatroom.seller_id
 
-    def _handle_message(self, data):
+    async def _handle_message(self, data):
         body = data.get('body')
         message_type = data.get('message_type', 'text')
         file_url = data.get('file_url')
 
         if not body and message_type == 'text':
-            self.send(text_data=json.dumps({
+            await self.send(text_data=json.dumps({
                 'error': 'Message body is required for text messages'
             }))
             return
 
         if message_type in ['image', 'file'] and not file_url:
-            self.send(text_data=json.dumps({
+            await self.send(text_data=json.dumps({
                 'error': f'File URL is required for {message_type} messages'
             }))
             return
 
+        message = await self._save_message(body, message_type, file_url)
+        metrics.chat_messages.labels(metrics.chat_label(self.chatroom.id)).inc()
+
+        event = {
+            'type': 'message_handler',
+            'message': self._message_payload(message, self.user)
+        }
+        await self._group_send(event)
+
+    async def _group_send(self, event):
+        with metrics.channel_layer_send_duration.labels(event['type']).time():
+            await self.channel_layer.group_send(self.group_name, event)
+
+    @db_call
+    @transaction.atomic
+    def _save_message(self, body, message_type, file_url):
+        # Mensaje, bandeja del chat (signals.py) y notificación se escriben juntos
         message = GroupMessage.objects.create(
             group=self.chatroom,
             author=self.user,
@@ -84,92 +278,108 @@ class ChatroomConsumer(WebsocketConsumer):
         )
 
         # Crear notificación para el otro usuario
-        recipient = self.chatroom.buyer if self.user == self.chatroom.seller else self.chatroom.seller
         ChatNotification.objects.create(
             chat_group=self.chatroom,
-            recipient=recipient,
+            recipient_id=self._recipient_id(),
             sender=self.user,
             notification_type='message',
             message=message
         )
+        return message
 
-        event = {
-            'type': 'message_handler',
-            'message': {
-                'id': message.id,
-                'body': message.body,
-                'message_type': message.message_type,
-                'file_url': message.file_url,
-                'created': message.created.isoformat(),
-                'author': {
-                    'id': message.author.id,
-                    'email': message.author.email
-                }
-            }
-        }
-        async_to_sync(self.channel_layer.group_send)(
-            self.chatroom_name, event
-        )
+    async def _handle_typing(self, data):
+        # Solo los cambios de estado llegan al grupo (ver TypingIndicator)
+        await self.typing_indicator.update(bool(data.get('is_typing', False)))
 
-    def _handle_typing(self, data):
-        is_typing = data.get('is_typing', False)
+    async def _broadcast_typing(self, is_typing):
         event = {
             'type': 'typing_handler',
             'user': {
                 'id': self.user.id,
                 'email': self.user.email
             },
-            'is_typing': is_typing
+            'is_typing': is_typing,
+            'last_seq': self.last_seq
         }
-        async_to_sync(self.channel_layer.group_send)(
-            self.chatroom_name, event
-        )
+        await self._group_send(event)
 
-    def _handle_read(self, data):
-        message_ids = data.get('message_ids', [])
+    async def _handle_read(self, data):
+        # Se validan aquí: un ID inválido dentro del lote fusionado haría
+        # fallar la escritura de todos los demás.
+        message_ids = parse_message_ids(data.get('message_ids', []))
+        if message_ids is None:
+            await self.send(text_data=json.dumps({
+                'error': 'message_ids must be a list of integers'
+            }))
+            return
         if not message_ids:
             return
 
-        messages = self.chatroom.chat_messages.filter(id__in=message_ids)
-        for message in messages:
-            message.is_read = True
-            message.read_by.add(self.user)
-            message.save()
+        # Los IDs se acumulan y se escriben juntos; con
+        # CHAT_READ_DEBOUNCE_SECONDS > 0 los eventos de lectura seguidos del
+        # mismo socket se fusionan en una sola escritura y un solo evento.
+        self.pending_read_ids.update(dict.fromkeys(message_ids))
+        delay = settings.CHAT_READ_DEBOUNCE_SECONDS
+        if delay <= 0:
+            await self._flush_reads()
+        elif self.read_flush_task is None:
+            self.read_flush_task = asyncio.ensure_future(self._flush_reads(delay))
 
-        # Crear notificación de lectura
-        recipient = self.chatroom.buyer if self.user == self.chatroom.seller else self.chatroom.seller
-        ChatNotification.objects.create(
-            chat_group=self.chatroom,
-            recipient=recipient,
-            sender=self.user,
-            notification_type='read'
-        )
+    async def _flush_reads(self, delay=0):
+        if delay:
+            await asyncio.sleep(delay)
+        self.read_flush_task = None
+        message_ids = list(self.pending_read_ids)
+        self.pending_read_ids.clear()
+        if not message_ids:
+            return
 
+        try:
+            message_ids = await self._mark_read(message_ids)
+        except Exception:
+            # Corre también como tarea del debounce, donde nadie espera su
+            # resultado: el error se registra y se avisa al cliente.
+            logger.exception(f"Error al marcar como leídos {message_ids} en el chat {self.chatroom.id}")
+            await self.send(text_data=json.dumps({
+                'error': 'Could not mark messages as read',
+                'message_ids': message_ids
+            }))
+            return
+        if not message_ids:
+            return
+
+        # Solo los que quedaron leídos ahora, no los IDs recibidos
         event = {
             'type': 'read_handler',
             'user': {
                 'id': self.user.id,
                 'email': self.user.email
             },
-            'message_ids': message_ids
+            'message_ids': message_ids,
+            'last_seq': self.last_seq
         }
-        async_to_sync(self.channel_layer.group_send)(
-            self.chatroom_name, event
-        )
+        await self._group_send(event)
+
+    @db_call
+    def _mark_read(self, message_ids):
+        return mark_messages_read(self.chatroom, self.user, message_ids)
 
-    def message_handler(self, event):
-        self.send(text_data=json.dumps(event['message']))
+    async def message_handler(self, event):
+        self.last_seq = max(self.last_seq, event['message']['seq'])
+        await self.send(text_data=json.dumps(event['message']))
 
-    def typing_handler(self, event):
-        self.send(text_data=json.dumps({
+    async def typing_handler(self, event):
+        await self.send(text_data=json.dumps({
             'action': 'typing',
             'user': event['user'],
-            'is_typing': event['is_typing']
+            'is_typing': event['is_typing'],
+            'last_seq': event['last_seq']
         }))
 
-    def read_handler(self, event):
-        self.send(text_data=json.dumps({
+    async def read_handler(self, event):
+        await self.send(text_data=json.dumps({
             'action': 'read',
             'user': event['user'],
-            'message_ids': event['message_ids']
-        }))
\ No newline at end of file
+            'message_ids': event['message_ids'],
+            'last_seq': event['last_seq']
+        }))
@@ -0,0 +1,242 @@
+"""
+Carga simulada para el chat por websocket.
+
+Abre clientes en proceso (channels.testing.WebsocketCommunicator) contra
+la aplicación ASGI del proyecto, autenticados con token como un cliente
+real: un comprador y un vendedor por ChatGroup. El comprador envía
+mensajes; el vendedor avisa que escribe, recibe cada mensaje y lo marca
+leído. Mide conexiones aceptadas, memoria por conexión, latencia de
+entrega de mensajes y de confirmaciones de lectura (desde que se envían
+hasta que el otro participante las recibe), mensajes por segundo y
+consultas SQL por mensaje.
+
+Corre contra la base configurada en DATABASES (las migraciones del
+proyecto requieren PostgreSQL).
+"""
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+import uuid
+
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.db.backends.signals import connection_created
+from rest_framework.authtoken.models import Token
+
+from drfarequipamarket.benchmarks import summarize
+from drfarequipamarket.chat.models import ChatGroup
+from drfarequipamarket.product.models import Category, Product
+from drfarequipamarket.users.models import CustomUser
+
+LOADTEST_EMAIL_DOMAIN = "chat-loadtest.example.com"
+
+
+class QueryCounter:
+    """
+    Cuenta las consultas SQL de todos los hilos mientras está activo.
+
+    El consumer consulta desde hilos del pool, cada uno con su conexión, así
+    que el contador se instala en cada conexión nueva (connection_created).
+    Fuera de start()/stop() solo deja pasar las consultas.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.active = False
+        self.lock = threading.Lock()
+        connection_created.connect(self._install, weak=False)
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.active:
+            with self.lock:
+                self.count += 1
+        return execute(sql, params, many, context)
+
+    def _install(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def start(self):
+        with self.lock:
+            self.count = 0
+        self.active = True
+
+    def stop(self):
+        self.active = False
+        return self.count
+
+
+query_counter = QueryCounter()
+
+
+@database_sync_to_async
+def create_fixtures(chats):
+    """Crea ``chats`` ChatGroups (un producto, comprador y vendedor cada uno)."""
+    run = uuid.uuid4().hex[:8]
+    category, _ = Category.objects.get_or_create(name="Chat loadtest")
+    users = CustomUser.objects.bulk_create([
+        CustomUser(
+            email=f"{role}{i}-{run}@{LOADTEST_EMAIL_DOMAIN}",
+            username=f"{role}{i}-{run}",
+        )
+        for i in range(chats)
+        for role in ("buyer", "seller")
+    ])
+    tokens = Token.objects.bulk_create([Token(key=Token.generate_key(), user=user) for user in users])
+    for user, token in zip(users, tokens):
+        user.token = token.key
+    products = Product.objects.bulk_create([
+        Product(
+            name=f"Loadtest {i}", description="Chat loadtest", price=1, currency="PEN",
+            state="NEW", category=category, vendor=users[2 * i + 1],
+        )
+        for i in range(chats)
+    ])
+    groups = ChatGroup.objects.bulk_create([
+        ChatGroup(group_name=products[i], buyer=users[2 * i], seller=users[2 * i + 1])
+        for i in range(chats)
+    ])
+    return [(group, users[2 * i], users[2 * i + 1]) for i, group in enumerate(groups)]
+
+
+@database_sync_to_async
+def delete_fixtures():
+    # CASCADE elimina productos, chats y mensajes de los usuarios de prueba.
+    CustomUser.objects.filter(email__endswith=f"@{LOADTEST_EMAIL_DOMAIN}").delete()
+    Category.objects.filter(name="Chat loadtest", product__isnull=True).delete()
+
+
+class Client:
+    def __init__(self, application, group, user):
+        self.user = user
+        self.communicator = WebsocketCommunicator(
+            application,
+            f"/ws/chatroom/{group.group_name_id}?token={user.token}",
+            headers=[(b"origin", b"http://localhost")],
+        )
+        self.connected = False
+
+    async def connect(self, timeout):
+        self.connected, _ = await self.communicator.connect(timeout=timeout)
+        return self.connected
+
+    async def send(self, payload):
+        await self.communicator.send_to(text_data=json.dumps(payload))
+
+    async def receive(self, timeout):
+        return json.loads(await self.communicator.receive_from(timeout=timeout))
+
+    async def disconnect(self):
+        if self.connected:
+            await self.communicator.disconnect()
+
+
+def asgi_application():
+    from drfarequipamarket.asgi import application
+    return application
+
+
+async def run_loadtest(chats=50, messages=20, connect_timeout=5, receive_timeout=10,
+                       connect_concurrency=100, application=None):
+    """
+    Ejecuta la prueba y devuelve un dict con conexiones aceptadas/fallidas,
+    memoria por conexión (KiB), latencias de conexión, entrega y lectura
+    (ms), mensajes por segundo y consultas SQL por mensaje.
+
+    Como mucho ``connect_concurrency`` handshakes van a la vez (una rampa,
+    como la reconexión escalonada de clientes reales); las conexiones ya
+    abiertas se mantienen hasta el final.
+    """
+    application = application or asgi_application()
+    fixtures = await create_fixtures(chats)
+    pairs = [
+        (Client(application, group, buyer), Client(application, group, seller))
+        for group, buyer, seller in fixtures
+    ]
+    clients = [client for pair in pairs for client in pair]
+    try:
+        connect_latencies = []
+        handshakes = asyncio.Semaphore(connect_concurrency)
+
+        async def connect(client):
+            async with handshakes:
+                started = time.perf_counter()
+                try:
+                    if await client.connect(connect_timeout):
+                        connect_latencies.append((time.perf_counter() - started) * 1000)
+                except asyncio.TimeoutError:
+                    pass
+
+        # tracemalloc solo durante las conexiones: mide lo que retiene cada
+        # socket abierto (consumer, colas, scope) sin frenar el resto.
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        await asyncio.gather(*(connect(client) for client in clients))
+        connect_elapsed = time.perf_counter() - started
+        memory_after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        connected = len(connect_latencies)
+
+        delivery_latencies = []
+        read_latencies = []
+        lost = 0
+
+        async def wait_for(client, match):
+            # Descarta los demás eventos del grupo (ecos, typing, lecturas de
+            # mensajes anteriores) hasta el esperado.
+            while True:
+                event = await client.receive(receive_timeout)
+                if match(event):
+                    return event
+
+        async def converse(buyer, seller):
+            nonlocal lost
+            if not (buyer.connected and seller.connected):
+                return
+            for n in range(messages):
+                body = f"{n}-{uuid.uuid4().hex[:6]}"
+                try:
+                    await seller.send({"action": "typing", "is_typing": True})
+                    sent = time.perf_counter()
+                    await buyer.send({"action": "message", "body": body})
+                    message = await wait_for(seller, lambda event: event.get("body") == body)
+                    delivery_latencies.append((time.perf_counter() - sent) * 1000)
+
+                    read_sent = time.perf_counter()
+                    await seller.send({"action": "read", "message_ids": [message["id"]]})
+                    await wait_for(
+                        buyer,
+                        lambda event: event.get("action") == "read" and message["id"] in event["message_ids"],
+                    )
+                    read_latencies.append((time.perf_counter() - read_sent) * 1000)
+                except asyncio.TimeoutError:
+                    lost += 1
+
+        query_counter.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(converse(buyer, seller) for buyer, seller in pairs))
+        messages_elapsed = time.perf_counter() - started
+        queries = query_counter.stop()
+    finally:
+        await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+        await delete_fixtures()
+
+    delivered = len(delivery_latencies)
+    return {
+        "clients": len(clients),
+        "connected": connected,
+        "connect_seconds": connect_elapsed,
+        "connect_ms": summarize(connect_latencies),
+        "memory_per_connection_kib": (memory_after - memory_before) / connected / 1024 if connected else None,
+        "messages": delivered,
+        "lost": lost,
+        "messages_per_second": delivered / messages_elapsed if messages_elapsed else 0,
+        "delivery_ms": summarize(delivery_latencies),
+        "read_ms": summarize(read_latencies),
+        # Incluye typing y read: todo lo que cuesta cada mensaje de la conversación
+        "queries": queries,
+        "queries_per_message": queries / delivered if delivered else None,
+    }
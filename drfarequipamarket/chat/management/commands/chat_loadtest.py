@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+
+from drfarequipamarket.chat.loadtest import run_loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Abre clientes websocket simulados contra el chat (en proceso) y reporta "
+        "conexiones aceptadas, memoria por conexión, mensajes por segundo, "
+        "percentiles de latencia y consultas SQL por mensaje"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chats", type=int, default=100, help="Chats simulados (2 clientes cada uno)")
+        parser.add_argument("--messages", type=int, default=20, help="Mensajes por chat")
+        parser.add_argument("--connect-timeout", type=float, default=5)
+        parser.add_argument("--receive-timeout", type=float, default=10)
+        parser.add_argument(
+            "--connect-concurrency", type=int, default=100, help="Handshakes simultáneos como máximo"
+        )
+        parser.add_argument("--json", dest="as_json", action="store_true", help="Imprime el resultado como JSON")
+
+    def handle(self, *args, chats, messages, connect_timeout, receive_timeout, connect_concurrency, as_json,
+               **options):
+        result = asyncio.run(run_loadtest(
+            chats=chats, messages=messages, connect_timeout=connect_timeout, receive_timeout=receive_timeout,
+            connect_concurrency=connect_concurrency,
+        ))
+        if as_json:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+
+        self.stdout.write(
+            f"conexiones: {result['connected']}/{result['clients']} aceptadas "
+            f"en {result['connect_seconds']:.2f} s"
+        )
+        self._latencies("conexión", result["connect_ms"])
+        if result["memory_per_connection_kib"] is not None:
+            self.stdout.write(f"  memoria por conexión: {result['memory_per_connection_kib']:.1f} KiB")
+        self.stdout.write(
+            f"mensajes: {result['messages']} entregados, {result['lost']} perdidos, "
+            f"{result['messages_per_second']:.0f} msg/s"
+        )
+        self._latencies("entrega", result["delivery_ms"])
+        self._latencies("lectura", result["read_ms"])
+        if result["queries_per_message"] is not None:
+            self.stdout.write(
+                f"consultas SQL: {result['queries']} ({result['queries_per_message']:.1f} por mensaje, "
+                "incluye typing y lectura)"
+            )
+
+    def _latencies(self, label, stats):
+        if not stats["count"]:
+            self.stdout.write(f"  {label}: sin datos")
+            return
+        self.stdout.write(
+            f"  {label} ms: p50 {stats['p50']:.1f}  p95 {stats['p95']:.1f}  "
+            f"p99 {stats['p99']:.1f}  max {stats['max']:.1f}"
+        )
+
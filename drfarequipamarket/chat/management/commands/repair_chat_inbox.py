@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from drfarequipamarket.chat.models import ChatGroup, GroupMessage
+
+INBOX_FIELDS = ("last_message_id", "buyer_unread_count", "seller_unread_count")
+
+
+def unread_from(author):
+    return Coalesce(Subquery(
+        GroupMessage.objects.filter(group=OuterRef("pk"), is_read=False, author=OuterRef(author))
+        .values("group").annotate(total=Count("id")).values("total")
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde los mensajes el último mensaje y los contadores de no "
+        "leídos de cada ChatGroup y corrige los que no coinciden"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Solo informa los chats desalineados")
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        expected = ChatGroup.objects.annotate(
+            expected_last_message_id=Subquery(
+                GroupMessage.objects.filter(group=OuterRef("pk"), is_deleted=False)
+                .order_by("-created", "-id").values("id")[:1]
+            ),
+            # Los no leídos de cada participante son los mensajes del otro
+            expected_buyer_unread_count=unread_from("seller"),
+            expected_seller_unread_count=unread_from("buyer"),
+        ).only("id", *INBOX_FIELDS).order_by("id")
+
+        checked, stale = 0, []
+        for group in expected.iterator(chunk_size=batch_size):
+            checked += 1
+            changed = False
+            for field in INBOX_FIELDS:
+                value = getattr(group, f"expected_{field}")
+                if getattr(group, field) != value:
+                    setattr(group, field, value)
+                    changed = True
+            if changed:
+                stale.append(group)
+
+        if not dry_run:
+            # bulk_update no toca updated_at: el orden de las bandejas se conserva.
+            ChatGroup.objects.bulk_update(stale, INBOX_FIELDS, batch_size=batch_size)
+
+        action = "por corregir" if dry_run else "corregidos"
+        self.stdout.write(self.style.SUCCESS(f"{checked} chats revisados, {len(stale)} {action}"))
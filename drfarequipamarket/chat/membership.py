@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import ChatGroup
+
+
+def _cache_key(product_id, user_id):
+    return f"chat:membership:{product_id}:{user_id}"
+
+
+def chats_for(product_id, user_id):
+    """
+    Chats del producto ``product_id`` en los que participa ``user_id``, como
+    tuplas ``(id, seller_id, buyer_id)``.
+
+    Es una sola consulta sin tocar la tabla de usuarios, y el resultado se
+    guarda CHAT_MEMBERSHIP_CACHE_SECONDS en la caché compartida para que
+    una ola de reconexiones no la repita. signals.py lo invalida al crear o
+    borrar un chat.
+    """
+    key = _cache_key(product_id, user_id)
+    chats = cache.get(key)
+    if chats is None:
+        chats = [
+            *ChatGroup.objects.filter(Q(seller_id=user_id) | Q(buyer_id=user_id), group_name_id=product_id)
+            .order_by('id')
+            .values_list('id', 'seller_id', 'buyer_id')
+        ]
+        cache.set(key, chats, settings.CHAT_MEMBERSHIP_CACHE_SECONDS)
+    return chats
+
+
+def resolve_chat(product_id, user_id, chat_id=None):
+    """
+    Devuelve el ChatGroup (sin consultar la base) al que ``user_id`` se
+    conecta en la sala del producto, o None si no participa.
+
+    El vendedor puede tener varios chats por producto (uno por comprador):
+    en ese caso debe indicar ``chat_id``.
+    """
+    chats = chats_for(product_id, user_id)
+    if chat_id is not None:
+        chats = [chat for chat in chats if chat[0] == chat_id]
+    if len(chats) != 1:
+        return None
+    chat_id, seller_id, buyer_id = chats[0]
+    return ChatGroup(id=chat_id, group_name_id=product_id, seller_id=seller_id, buyer_id=buyer_id)
+
+
+def invalidate_membership(chat_group):
+    cache.delete_many([
+        _cache_key(chat_group.group_name_id, chat_group.seller_id),
+        _cache_key(chat_group.group_name_id, chat_group.buyer_id),
+    ])
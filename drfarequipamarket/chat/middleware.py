@@ -0,0 +1,51 @@
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+
+from drfarequipamarket.users.authentication import resolve_token
+
+from .consumers import db_call
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """
+    Autentica el websocket con el mismo token de la API REST.
+
+    El token se toma del header ``Authorization: Token <key>`` o, para
+    navegadores (que no permiten headers en websockets), del parámetro
+    ``?token=<key>``. Con un token inválido la conexión queda como anónima.
+    Sin token se usa la sesión de Django, como antes; con token la sesión
+    ni se consulta.
+    """
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.session_inner = AuthMiddlewareStack(inner)
+
+    async def __call__(self, scope, receive, send):
+        key = self._token_key(scope)
+        if key is None:
+            return await self.session_inner(scope, receive, send)
+        scope = dict(scope, user=await self._user_for(key))
+        return await super().__call__(scope, receive, send)
+
+    @staticmethod
+    def _token_key(scope):
+        for name, value in scope.get('headers', []):
+            if name == b'authorization':
+                keyword, _, key = value.decode('latin-1').partition(' ')
+                if keyword.lower() == 'token' and key.strip():
+                    return key.strip()
+        query = parse_qs(scope.get('query_string', b'').decode())
+        return query.get('token', [None])[0] or None
+
+    @staticmethod
+    @db_call
+    def _user_for(key):
+        try:
+            return resolve_token(key)[0]
+        except AuthenticationFailed:
+            return AnonymousUser()
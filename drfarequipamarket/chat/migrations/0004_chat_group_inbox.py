@@ -0,0 +1,62 @@
+# Generated by Django 5.1.3 on 2026-10-18 08:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_inbox(apps, schema_editor):
+    ChatGroup = apps.get_model('chat', 'ChatGroup')
+    GroupMessage = apps.get_model('chat', 'GroupMessage')
+    messages = GroupMessage.objects.filter(group=OuterRef('pk'))
+
+    def unread_from(author):
+        return Coalesce(Subquery(
+            messages.filter(is_read=False, author=OuterRef(author))
+            .values('group').annotate(total=Count('id')).values('total')
+        ), 0)
+
+    # updated_at (auto_now) no cambia con update(): el orden de la bandeja se conserva.
+    ChatGroup.objects.update(
+        last_message=Subquery(messages.filter(is_deleted=False).order_by('-created', '-id').values('id')[:1]),
+        buyer_unread_count=unread_from('seller'),
+        seller_unread_count=unread_from('buyer'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_alter_chatgroup_options_chatgroup_created_at_and_more'),
+        ('product', '0009_product_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatgroup',
+            name='buyer_unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatgroup',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.groupmessage'),
+        ),
+        migrations.AddField(
+            model_name='chatgroup',
+            name='seller_unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='chatgroup',
+            index=models.Index(fields=['seller', '-updated_at'], name='chat_group_seller_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatgroup',
+            index=models.Index(fields=['buyer', '-updated_at'], name='chat_group_buyer_inbox_idx'),
+        ),
+        migrations.RunPython(populate_inbox, migrations.RunPython.noop),
+    ]
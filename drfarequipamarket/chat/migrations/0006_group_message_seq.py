@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+
+def number_messages(apps, schema_editor):
+    # Numera los mensajes existentes de cada chat por orden de creación y
+    # deja last_seq en el último número asignado.
+    ChatGroup = apps.get_model('chat', 'ChatGroup')
+    GroupMessage = apps.get_model('chat', 'GroupMessage')
+    messages = GroupMessage._meta.db_table
+    groups = ChatGroup._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE {messages} AS m SET seq = numbered.seq
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY group_id ORDER BY created, id) AS seq
+                FROM {messages}
+            ) AS numbered
+            WHERE m.id = numbered.id
+        """)
+        cursor.execute(f"""
+            UPDATE {groups} AS g SET last_seq = counts.last_seq
+            FROM (SELECT group_id, MAX(seq) AS last_seq FROM {messages} GROUP BY group_id) AS counts
+            WHERE g.id = counts.group_id
+        """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_group_message_history_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatgroup',
+            name='last_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='groupmessage',
+            name='seq',
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(number_messages, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='groupmessage',
+            name='seq',
+            field=models.PositiveBigIntegerField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='groupmessage',
+            constraint=models.UniqueConstraint(fields=('group', 'seq'), name='chat_message_group_seq_unique'),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import connection, models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from drfarequipamarket.product import models as ProductModels
@@ -12,12 +12,32 @@ class ChatGroup(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Bandeja de entrada desnormalizada: se mantiene al crear mensajes (ver
+    # signals.py) y al marcarlos leídos (ver receipts.py); el comando
+    # repair_chat_inbox la recalcula desde los mensajes.
+    last_message = models.ForeignKey(
+        'GroupMessage', null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    buyer_unread_count = models.PositiveIntegerField(default=0)
+    seller_unread_count = models.PositiveIntegerField(default=0)
+    # Último número de secuencia asignado a un mensaje del chat
+    last_seq = models.PositiveBigIntegerField(default=0)
 
     def __str__(self):
         return f"{self.group_name.name} - {self.seller.email} & {self.buyer.email}"
+
+    def unread_count_field(self, user_id):
+        """Campo con los mensajes sin leer de ``user_id`` en este chat."""
+        return 'seller_unread_count' if user_id == self.seller_id else 'buyer_unread_count'
+
     class Meta:
         unique_together = ('group_name', 'seller', 'buyer')
         ordering = ['-updated_at']
+        indexes = [
+            # Bandeja de cada participante, más reciente primero
+            models.Index(fields=['seller', '-updated_at'], name='chat_group_seller_inbox_idx'),
+            models.Index(fields=['buyer', '-updated_at'], name='chat_group_buyer_inbox_idx'),
+        ]
 
 class GroupMessage(models.Model):
     MESSAGE_TYPES = (
@@ -35,9 +55,30 @@ class GroupMessage(models.Model):
     is_read = models.BooleanField(default=False)
     read_by = models.ManyToManyField(UserModels.CustomUser, related_name='read_messages')
     is_deleted = models.BooleanField(default=False)
+    # Número de secuencia dentro del chat: 1, 2, 3... sin huecos. Permite al
+    # cliente detectar mensajes perdidos y pedir solo esos al reconectar.
+    seq = models.PositiveBigIntegerField(editable=False)
 
     def __str__(self):
         return f'{self.author.email} : {self.body}'
+
+    def save(self, *args, **kwargs):
+        if self.seq is not None:
+            return super().save(*args, **kwargs)
+        # El UPDATE bloquea la fila del chat hasta el commit, así que los
+        # mensajes simultáneos del mismo chat reciben números distintos.
+        with transaction.atomic():
+            self.seq = self._next_seq()
+            super().save(*args, **kwargs)
+
+    def _next_seq(self):
+        table = ChatGroup._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET last_seq = last_seq + 1 WHERE id = %s RETURNING last_seq",
+                [self.group_id],
+            )
+            return cursor.fetchone()[0]
     
     def clean(self):
         if not self.body.strip():
@@ -47,6 +88,14 @@ class GroupMessage(models.Model):
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            # Historial por cursor (created, id) dentro de cada chat
+            models.Index(fields=['group', 'created', 'id'], name='chat_message_group_created_idx'),
+        ]
+        constraints = [
+            # También sirve de índice para la reposición por seq al reconectar
+            models.UniqueConstraint(fields=['group', 'seq'], name='chat_message_group_seq_unique'),
+        ]
 
 class ChatNotification(models.Model):
     NOTIFICATION_TYPES = (
@@ -0,0 +1,91 @@
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import remove_query_param
+
+from drfarequipamarket.pagination import KeysetPagination
+
+
+class MessageHistoryPagination(KeysetPagination):
+    """
+    Historial de un chat por cursor sobre ``(created, id)``.
+
+    La primera página trae los ``page_size`` mensajes más recientes;
+    ``previous`` pide los anteriores ("cargar más antiguos") y ``next`` los
+    posteriores. Con ``since`` (fecha ISO 8601) devuelve lo enviado después
+    de esa fecha, del más antiguo al más nuevo, para ponerse al día tras una
+    reconexión. Dentro de cada página los mensajes van siempre en orden
+    cronológico.
+
+    A diferencia del catálogo, siempre pagina: un chat largo no se devuelve
+    entero en una sola respuesta.
+    """
+
+    page_size = 30
+    since_query_param = "since"
+    page_size_description = "Mensajes por página"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.since_query_param)
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        since = None
+        if cursor is not None:
+            backwards, key = cursor
+            queryset = queryset.filter(self._seek(key, backwards))
+        else:
+            since = self.get_since(request)
+            # Sin cursor ni since se empieza por el final de la conversación.
+            backwards = since is None
+            if since is not None:
+                queryset = queryset.filter(created__gt=since)
+
+        if backwards:
+            queryset = queryset.order_by("-created", "-id")
+        else:
+            queryset = queryset.order_by("created", "id")
+        return self.get_rows(queryset, backwards, continued=cursor is not None or since is not None)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.since_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Solo mensajes posteriores a esta fecha (ISO 8601)",
+                "schema": {"type": "string", "format": "date-time"},
+            },
+        ]
+
+    def get_since(self, request):
+        value = request.query_params.get(self.since_query_param)
+        if not value:
+            return None
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError({self.since_query_param: "Fecha inválida, se espera ISO 8601"})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def get_key(self, message):
+        return [message.created.isoformat(), message.id]
+
+    def parse_key(self, key):
+        created, message_id = key
+        created = parse_datetime(created)
+        if created is None:
+            raise ValueError(key)
+        return created, int(message_id)
+
+    def _seek(self, key, backwards):
+        created, message_id = key
+        if backwards:
+            return Q(created__lt=created) | Q(created=created, id__lt=message_id)
+        return Q(created__gt=created) | Q(created=created, id__gt=message_id)
@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ChatGroup, ChatNotification, GroupMessage
+
+
+def mark_messages_read(chat_group, user, message_ids):
+    """
+    Marca como leídos por ``user`` los mensajes ``message_ids`` del chat.
+
+    Trabaja por lotes, con un número fijo de consultas sin importar cuántos
+    mensajes sean: una lectura para validar los IDs, un bulk_create de las
+    filas de read_by (ignorando las que ya existen), un UPDATE de is_read,
+    otro del contador de no leídos del chat y una sola notificación de lectura para el otro participante, que se
+    reutiliza mientras siga sin leerse. Se ignoran los mensajes propios, los
+    de otros chats y los que ``user`` ya había leído.
+
+    Devuelve los IDs que quedaron leídos con esta llamada, que son los que
+    se anuncian al otro participante.
+    """
+    ids = list(
+        GroupMessage.objects.filter(group=chat_group, id__in=message_ids)
+        .exclude(author_id=user.id)
+        .exclude(read_by=user)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    if not ids:
+        return ids
+
+    recipient_id = chat_group.buyer_id if user.id == chat_group.seller_id else chat_group.seller_id
+    ReadBy = GroupMessage.read_by.through
+    with transaction.atomic():
+        ReadBy.objects.bulk_create(
+            [ReadBy(groupmessage_id=message_id, customuser_id=user.id) for message_id in ids],
+            ignore_conflicts=True,
+        )
+        marked = GroupMessage.objects.filter(id__in=ids, is_read=False).update(is_read=True)
+        if marked:
+            counter = chat_group.unread_count_field(user.id)
+            ChatGroup.objects.filter(pk=chat_group.pk).update(
+                **{counter: Greatest(F(counter) - marked, Value(0))}
+            )
+
+        coalesced = ChatNotification.objects.filter(
+            chat_group=chat_group,
+            recipient_id=recipient_id,
+            sender_id=user.id,
+            notification_type="read",
+            is_read=False,
+        ).update(created_at=timezone.now())
+        if not coalesced:
+            ChatNotification.objects.create(
+                chat_group=chat_group,
+                recipient_id=recipient_id,
+                sender_id=user.id,
+                notification_type="read",
+            )
+    return ids
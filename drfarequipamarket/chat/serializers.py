@@ -17,9 +17,10 @@ class ChatGroupSerializer(serializers.ModelSerializer):
         model = ChatGroup
         fields = [
             'id', 'group_name', 'seller', 'buyer',
-            'buyer_username', 'seller_username', 'last_message', 'unread_count'
+            'buyer_username', 'seller_username', 'last_message', 'unread_count',
+            'last_seq'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at', 'last_seq']
 
     def get_buyer_username(self, obj):
         return obj.buyer.username
@@ -28,14 +29,13 @@ class ChatGroupSerializer(serializers.ModelSerializer):
         return obj.seller.username
 
     def get_last_message(self, obj):
-        last_message = obj.chat_messages.filter(is_deleted=False).first()
-        if last_message:
-            return GroupMessageSerializer(last_message).data
+        if obj.last_message:
+            return GroupMessageSerializer(obj.last_message).data
         return None
 
     def get_unread_count(self, obj):
         user = self.context['request'].user
-        return obj.chat_messages.filter(is_read=False).exclude(author=user).count()
+        return getattr(obj, obj.unread_count_field(user.id))
 
 class GroupMessageSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
@@ -44,9 +44,16 @@ class GroupMessageSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = GroupMessage
-        fields = ['id', 'group', 'author', 'body', 'message_type', 'file_url', 
+        fields = ['id', 'seq', 'group', 'author', 'body', 'message_type', 'file_url', 
                  'created', 'is_read', 'read_by', 'is_deleted']
-        read_only_fields = ['author', 'created', 'is_read', 'read_by']
+        read_only_fields = ['seq', 'author', 'created', 'is_read', 'read_by']
+
+class MessageHistorySerializer(GroupMessageSerializer):
+    """
+    Mensaje del historial paginado: ``read_by`` son solo los ids de quienes
+    lo leyeron, sin anidar cada usuario en cada mensaje.
+    """
+    read_by = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
 
 class ChatNotificationSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
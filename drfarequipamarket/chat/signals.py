@@ -0,0 +1,37 @@
+from django.db.models import F, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .membership import invalidate_membership
+from .models import ChatGroup, GroupMessage
+
+
+@receiver([post_save, post_delete], sender=ChatGroup)
+def invalidate_chat_membership(sender, instance, **kwargs):
+    invalidate_membership(instance)
+
+
+@receiver(post_save, sender=GroupMessage)
+def update_inbox(sender, instance, created, **kwargs):
+    # Un mensaje nuevo pasa a ser el último del chat y suma uno a los no
+    # leídos del otro participante. Es un solo UPDATE con F(), así que dos
+    # mensajes simultáneos no se pisan el contador.
+    if not created:
+        if instance.is_deleted:
+            # Un mensaje borrado deja de mostrarse como el último del chat.
+            ChatGroup.objects.filter(pk=instance.group_id, last_message=instance).update(
+                last_message=Subquery(
+                    GroupMessage.objects.filter(group_id=instance.group_id, is_deleted=False)
+                    .order_by('-created', '-id').values('id')[:1]
+                )
+            )
+        return
+    group = instance.group
+    recipient_id = group.buyer_id if instance.author_id == group.seller_id else group.seller_id
+    counter = group.unread_count_field(recipient_id)
+    ChatGroup.objects.filter(pk=group.pk).update(
+        last_message=instance,
+        updated_at=timezone.now(),
+        **{counter: F(counter) + 1},
+    )
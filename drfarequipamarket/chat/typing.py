@@ -0,0 +1,91 @@
+import asyncio
+import time
+from collections import Counter
+
+from drfarequipamarket.metrics import typing_events
+
+
+class TypingIndicator:
+    """
+    Estado "escribiendo" de una conexión del chat.
+
+    El cliente puede enviar un evento por tecla; solo se difunde al grupo
+    cuando el estado cambia (empieza / deja de escribir), como mucho una vez
+    cada ``min_interval`` segundos. Si el estado cambia varias veces dentro
+    de ese intervalo, al final se publica solo el último, y únicamente si
+    difiere de lo que el grupo ya ve. "Escribiendo" expira solo tras
+    ``timeout`` segundos sin eventos, por si el cliente no avisa que paró.
+
+    ``broadcast`` es una corrutina que recibe el nuevo estado (bool).
+    """
+
+    def __init__(self, broadcast, timeout, min_interval, clock=time.monotonic):
+        self.broadcast = broadcast
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.clock = clock
+        self.typing = False
+        self.published = False
+        self.published_at = None
+        self.expire_task = None
+        self.flush_task = None
+        # Eventos de esta conexión; los del proceso van a metrics.typing_events
+        self.stats = Counter()
+
+    async def update(self, is_typing):
+        self._count('received')
+        self._cancel_expire()
+        if is_typing:
+            self.expire_task = asyncio.ensure_future(self._expire())
+        self.typing = is_typing
+        if not await self._publish():
+            self._count('suppressed')
+
+    async def close(self):
+        """Cancela los temporizadores y, si el grupo aún lo ve escribiendo, avisa que paró."""
+        self._cancel_expire()
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        self.typing = False
+        if self.published:
+            await self._send()
+
+    async def _publish(self):
+        if self.typing == self.published:
+            return False
+        if self.published_at is not None:
+            wait = self.published_at + self.min_interval - self.clock()
+            if wait > 0:
+                if self.flush_task is None:
+                    self.flush_task = asyncio.ensure_future(self._flush(wait))
+                return False
+        await self._send()
+        return True
+
+    async def _send(self):
+        self.published = self.typing
+        self.published_at = self.clock()
+        self._count('broadcast')
+        await self.broadcast(self.typing)
+
+    async def _flush(self, wait):
+        await asyncio.sleep(wait)
+        self.flush_task = None
+        await self._publish()
+
+    async def _expire(self):
+        await asyncio.sleep(self.timeout)
+        self.expire_task = None
+        self.typing = False
+        self._count('expired')
+        await self._publish()
+
+    def _cancel_expire(self):
+        if self.expire_task is not None:
+            self.expire_task.cancel()
+            self.expire_task = None
+
+    def _count(self, name):
+        self.stats[name] += 1
+        typing_events.labels(name).inc()
@@ -3,8 +3,13 @@ from rest_framework.response import Response
 from rest_framework import status, viewsets
 from drfarequipamarket.chat.models import ChatGroup, GroupMessage
 from drfarequipamarket.users.models import CustomUser
-from drfarequipamarket.chat.serializers import ChatGroupSerializer, GroupMessageSerializer
-from django.db.models import Q
+from drfarequipamarket.chat.pagination import MessageHistoryPagination
+from drfarequipamarket.chat.serializers import (
+    ChatGroupSerializer, GroupMessageSerializer, MessageHistorySerializer,
+)
+from django.db import transaction
+from drf_spectacular.utils import extend_schema
+from django.db.models import Prefetch, Q
 
 class ChatGroupViewSet(viewsets.ModelViewSet):
     queryset = ChatGroup.objects.all()
@@ -13,11 +18,17 @@ class ChatGroupViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         product_id = self.request.query_params.get('product')
+        # Último mensaje y contadores están desnormalizados en ChatGroup: la
+        # bandeja sale de una consulta por página (más la de read_by del
+        # último mensaje), sin consultas por chat.
+        queryset = ChatGroup.objects.select_related(
+            'buyer', 'seller', 'last_message__author'
+        ).prefetch_related('last_message__read_by')
         if product_id:
             # El vendedor no debe ver chats donde él mismo es el comprador
-            return ChatGroup.objects.filter(group_name_id=product_id, seller=user).exclude(buyer=user)
+            return queryset.filter(group_name_id=product_id, seller=user).exclude(buyer=user)
         # Si no hay producto, muestra todos los chats donde el usuario es comprador o vendedor
-        return ChatGroup.objects.filter(Q(seller=user) | Q(buyer=user))
+        return queryset.filter(Q(seller=user) | Q(buyer=user))
 
     @action(detail=True, methods=['post'])
     def send_message(self, request, pk=None):
@@ -40,21 +51,38 @@ class ChatGroupViewSet(viewsets.ModelViewSet):
         if int(author_id) not in [chat_group.seller.id, chat_group.buyer.id]:
             return Response({'detail': 'Author not a member of this chat group.'}, status=status.HTTP_403_FORBIDDEN)
 
-        message = GroupMessage.objects.create(
-            group=chat_group,
-            author=author,
-            body=body
-        )
+        # El signal de GroupMessage actualiza la bandeja en la misma transacción
+        with transaction.atomic():
+            message = GroupMessage.objects.create(
+                group=chat_group,
+                author=author,
+                body=body
+            )
 
         serializer = GroupMessageSerializer(message)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    @action(detail=True, methods=['get'])
+    # Parámetros (cursor, page_size, since) y envoltorio next/previous/results
+    # salen de MessageHistoryPagination.
+    @extend_schema(responses=MessageHistorySerializer(many=True))
+    @action(detail=True, methods=['get'], pagination_class=MessageHistoryPagination)
     def messages(self, request, pk=None):
         """
-        Get all messages in a chat group
+        Historial de mensajes del chat, en orden cronológico, paginado por
+        cursor (ver MessageHistoryPagination): sin parámetros trae los
+        mensajes más recientes.
+
+        La respuesta es siempre ``{next, previous, results}``; antes de la
+        paginación por defecto era una lista con todos los mensajes, así que
+        los clientes que la leían como lista deben pasar a ``results`` y
+        seguir ``previous`` para cargar los más antiguos.
         """
         chat_group = self.get_object()
-        messages = chat_group.chat_messages.all().order_by('created')
-        serializer = GroupMessageSerializer(messages, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        # Autores y read_by se cargan en bloque, no una consulta por mensaje;
+        # de los lectores solo hace falta el id.
+        messages = chat_group.chat_messages.select_related('author').prefetch_related(
+            Prefetch('read_by', queryset=CustomUser.objects.only('id'))
+        )
+        page = self.paginate_queryset(messages)
+        serializer = MessageHistorySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    # Comandos del proyecto que no pertenecen a una app (p. ej. benchmark_db_pool)
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'drfarequipamarket.core'
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from channels.testing import HttpCommunicator
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.authtoken.models import Token
+
+from drfarequipamarket.benchmarks import summarize
+from drfarequipamarket.chat.models import ChatGroup, GroupMessage
+from drfarequipamarket.monitoring import database_pool_stats
+from drfarequipamarket.product.models import Category, Product
+from drfarequipamarket.users.models import CustomUser
+
+BENCHMARK_EMAIL_DOMAIN = "db-pool-benchmark.example.com"
+POOL_MODES = ("off", "persistent", "pool")
+
+
+class ConnectionCounter:
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, sender, **kwargs):
+        with self.lock:
+            self.count += 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia de requests autenticados a la API (ASGI en proceso) y cuántas "
+        "conexiones a PostgreSQL se abren; con --compare repite la medición con cada "
+        "DB_POOL_MODE (off, persistent, pool)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--chats", type=int, default=10, help="Chats del usuario de prueba")
+        parser.add_argument("--path", default="/api/chatgroup/", help="Endpoint a medir (GET)")
+        parser.add_argument("--compare", action="store_true", help="Compara los tres modos en subprocesos")
+        parser.add_argument("--json", dest="as_json", action="store_true")
+
+    def handle(self, *args, compare, as_json, **options):
+        if compare:
+            self._compare(options)
+            return
+        result = self._run(**{key: options[key] for key in ("requests", "concurrency", "chats", "path")})
+        if as_json:
+            self.stdout.write(json.dumps(result))
+        else:
+            self._report(result)
+
+    def _compare(self, options):
+        results = []
+        for mode in POOL_MODES:
+            command = [
+                sys.executable, "-m", "django", "benchmark_db_pool", "--json",
+                "--requests", str(options["requests"]), "--concurrency", str(options["concurrency"]),
+                "--chats", str(options["chats"]), "--path", options["path"],
+            ]
+            env = dict(os.environ, DB_POOL_MODE=mode, DJANGO_SETTINGS_MODULE=os.environ.get(
+                "DJANGO_SETTINGS_MODULE", "drfarequipamarket.settings.local"
+            ))
+            completed = subprocess.run(command, env=env, capture_output=True, text=True)
+            lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+            if completed.returncode or not lines:
+                raise CommandError(f"Falló el modo {mode}:\n{completed.stderr[-2000:]}")
+            results.append(json.loads(lines[-1]))
+
+        self.stdout.write(f"{'modo':<11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'conexiones':>11}")
+        for result in results:
+            latency = result["latency_ms"]
+            self.stdout.write(
+                f"{result['mode']:<11} {result['requests_per_second']:>8.0f} {latency['p50']:>8.1f} "
+                f"{latency['p95']:>8.1f} {latency['p99']:>8.1f} {result['connections_opened']:>11}"
+            )
+
+    def _run(self, requests, concurrency, chats, path):
+        user, token = self._create_fixtures(chats)
+        application = get_asgi_application()
+        headers = [(b"host", b"localhost"), (b"authorization", f"Token {token}".encode())]
+        counter = ConnectionCounter()
+        latencies, errors = [], 0
+
+        async def request(slots):
+            nonlocal errors
+            async with slots:
+                communicator = HttpCommunicator(application, "GET", path, headers=headers)
+                started = time.perf_counter()
+                response = await communicator.get_response(timeout=60)
+                latencies.append((time.perf_counter() - started) * 1000)
+                # Django sigue escuchando http.disconnect tras responder
+                await communicator.send_input({"type": "http.disconnect"})
+                await communicator.wait()
+                if response["status"] != 200:
+                    errors += 1
+
+        async def run():
+            slots = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*(request(slots) for _ in range(requests)))
+
+        connection_created.connect(counter, weak=False)
+        try:
+            started = time.perf_counter()
+            asyncio.run(run())
+            elapsed = time.perf_counter() - started
+            pool = database_pool_stats()["default"].get("pool")
+        finally:
+            connection_created.disconnect(counter)
+            connections.close_all()
+            CustomUser.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}").delete()
+            Category.objects.filter(name="DB pool benchmark", product__isnull=True).delete()
+
+        return {
+            "mode": settings.DB_POOL_MODE,
+            "requests": requests,
+            "errors": errors,
+            "requests_per_second": requests / elapsed,
+            "latency_ms": summarize(latencies),
+            # Con pool, connection_created se emite también al tomar una conexión
+            # ya abierta; las conexiones reales las cuenta el pool.
+            "connections_opened": pool["connections_num"] if pool else counter.count,
+            "pool": pool,
+        }
+
+    def _create_fixtures(self, chats):
+        run = uuid.uuid4().hex[:8]
+        user = CustomUser.objects.create(email=f"buyer-{run}@{BENCHMARK_EMAIL_DOMAIN}", username=f"buyer-{run}")
+        vendor = CustomUser.objects.create(email=f"seller-{run}@{BENCHMARK_EMAIL_DOMAIN}", username=f"seller-{run}")
+        category, _ = Category.objects.get_or_create(name="DB pool benchmark")
+        for i in range(chats):
+            product = Product.objects.create(
+                name=f"DB pool {i}", description="Benchmark", price=1, currency="PEN",
+                state="NEW", category=category, vendor=vendor,
+            )
+            group = ChatGroup.objects.create(group_name=product, buyer=user, seller=vendor)
+            GroupMessage.objects.create(group=group, author=vendor, body="Hola")
+        token = Token.objects.create(user=user)
+        # Las conexiones abiertas hasta aquí no cuentan en la medición.
+        connections.close_all()
+        return user, token.key
+
+    def _report(self, result):
+        latency = result["latency_ms"]
+        self.stdout.write(
+            f"modo {result['mode']}: {result['requests']} requests ({result['errors']} con error), "
+            f"{result['requests_per_second']:.0f} req/s"
+        )
+        self.stdout.write(
+            f"  latencia ms: p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+            f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}"
+        )
+        self.stdout.write(f"  conexiones a PostgreSQL abiertas: {result['connections_opened']}")
+        if result["pool"]:
+            self.stdout.write(f"  pool: {json.dumps(result['pool'])}")
@@ -0,0 +1,80 @@
+import os
+import time
+
+from django.conf import settings
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+# Métricas de Prometheus del proceso. Con varios procesos (Daphne o
+# gunicorn con varios workers) hay que definir PROMETHEUS_MULTIPROC_DIR con
+# un directorio vacío y compartido antes de arrancarlos: cada proceso
+# escribe sus valores en archivos mmap y render_metrics los suma. Al
+# terminar un worker hay que llamar multiprocess.mark_process_dead(pid)
+# (en gunicorn, desde el hook child_exit) para que sus conexiones abiertas
+# dejen de contar.
+
+http_requests = Counter(
+    "http_requests_total", "Requests HTTP atendidos", ["method", "route", "status"],
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Latencia de los requests HTTP", ["method", "route"],
+)
+websocket_connections = Gauge(
+    "chat_websocket_connections", "Websockets del chat abiertos", multiprocess_mode="livesum",
+)
+websocket_connects = Counter(
+    "chat_websocket_connects_total", "Intentos de conexión al chat", ["result"],
+)
+websocket_disconnects = Counter(
+    "chat_websocket_disconnects_total", "Desconexiones de websockets aceptados",
+)
+websocket_receive_duration = Histogram(
+    "chat_websocket_receive_duration_seconds", "Tiempo de proceso de cada mensaje del socket", ["action"],
+)
+chat_messages = Counter(
+    "chat_messages_total", "Mensajes enviados por chat", ["chat"],
+)
+channel_layer_send_duration = Histogram(
+    "chat_channel_layer_send_duration_seconds", "Latencia de group_send en el channel layer", ["event"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+typing_events = Counter(
+    "chat_typing_events_total", "Eventos del indicador escribiendo", ["event"],
+)
+
+WEBSOCKET_ACTIONS = frozenset({"message", "typing", "read"})
+
+
+def chat_label(chat_id):
+    # Por defecto todos los chats comparten la serie; con METRICS_PER_CHAT
+    # hay una por chat y el número de series crece con los chats activos.
+    return str(chat_id) if settings.METRICS_PER_CHAT else "all"
+
+
+def render_metrics():
+    """Exposición en texto de Prometheus de todas las métricas."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+class MetricsMiddleware:
+    """
+    Cuenta y mide cada request por método, ruta y estado. La ruta es el
+    nombre de la vista en urls.py (p. ej. ``product-list`` del router) y no
+    la URL, para que los IDs no multipliquen las series.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        route = (match.view_name or match._func_path) if match else "unmatched"
+        http_request_duration.labels(request.method, route).observe(time.perf_counter() - started)
+        http_requests.labels(request.method, route, str(response.status_code)).inc()
+        return response
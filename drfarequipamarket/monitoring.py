@@ -0,0 +1,70 @@
+import hmac
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework.permissions import BasePermission, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from drfarequipamarket.metrics import render_metrics
+
+
+def database_pool_stats():
+    """
+    Estado de las conexiones de cada base configurada.
+
+    Con DB_POOL_MODE=pool incluye las estadísticas del pool de psycopg
+    (conexiones abiertas y libres, hilos esperando, esperas por timeout,
+    etc.; ver psycopg_pool.ConnectionPool.get_stats). En los otros modos
+    solo informa CONN_MAX_AGE.
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        entry = {
+            "mode": settings.DB_POOL_MODE,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+        }
+        pool = getattr(connection, "pool", None)
+        if pool is not None:
+            entry["pool"] = pool.get_stats()
+        stats[alias] = entry
+    return stats
+
+
+class DatabasePoolStatsView(APIView):
+    """Endpoint de monitoreo (solo administradores) con database_pool_stats."""
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response(database_pool_stats())
+
+
+class HasMetricsToken(BasePermission):
+    """
+    Permite el acceso con ``Authorization: Bearer <METRICS_TOKEN>``, el
+    formato que usa Prometheus (bearer_token); sin METRICS_TOKEN no permite
+    nada.
+    """
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        scheme, _, credentials = header.partition(" ")
+        return bool(token) and scheme == "Bearer" and hmac.compare_digest(credentials.encode(), token.encode())
+
+
+class MetricsView(APIView):
+    """Métricas en formato de texto de Prometheus (ver metrics.py)."""
+
+    permission_classes = [HasMetricsToken | IsAdminUser]
+
+    @extend_schema(responses={(200, "text/plain"): OpenApiTypes.STR})
+    def get(self, request):
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,131 @@
+import base64
+import binascii
+import json
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Base de la paginación por cursor (keyset) del catálogo y del chat.
+
+    Cada página se pide "después de" (o "antes de") la clave de orden de la
+    última fila vista, así que su costo no depende de cuán lejos se esté.
+    El cursor es JSON en base64 con la clave (``k``) y la dirección
+    (``b``). Las subclases deciden el orden y el filtro de la página en
+    ``paginate_queryset`` y definen ``get_key`` / ``parse_key``.
+    """
+
+    page_size = 30
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size_description = "Filas por página"
+    invalid_cursor_message = "Cursor inválido"
+
+    def get_key(self, instance):
+        """Clave de orden de ``instance``, serializable a JSON."""
+        raise NotImplementedError
+
+    def parse_key(self, key):
+        """Clave decodificada del cursor; ValueError o TypeError si no es válida."""
+        raise NotImplementedError
+
+    def get_rows(self, queryset, backwards, continued):
+        """
+        Trae una página de ``queryset`` (ya filtrado y ordenado en el sentido
+        de lectura) y calcula las claves de next/previous. ``continued``
+        indica que hay filas del otro lado del punto de partida, es decir,
+        que se llegó por un cursor o un filtro y no desde un extremo.
+        """
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+
+        self.next_key = self.previous_key = None
+        if rows:
+            first, last = self.get_key(rows[0]), self.get_key(rows[-1])
+            if backwards:
+                self.previous_key = first if has_more else None
+                self.next_key = last if continued else None
+            else:
+                self.next_key = last if has_more else None
+                self.previous_key = first if continued else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor opaco devuelto en next/previous",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"{self.page_size_description} (máximo {self.max_page_size})",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        return self.encode_cursor(self.next_key, backwards=False)
+
+    def get_previous_link(self):
+        if self.previous_key is None:
+            return None
+        return self.encode_cursor(self.previous_key, backwards=True)
+
+    def encode_cursor(self, key, backwards):
+        payload = json.dumps({"k": key, "b": int(backwards)}, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """``(backwards, key)`` del cursor del request, None si no hay; 404 si es inválido."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            key = self.parse_key(payload["k"])
+            backwards = bool(payload["b"])
+        except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        return backwards, key
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Product
+
+# Resultado por producto de set_availability / toggle_availability
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+FORBIDDEN = "forbidden"
+NOT_FOUND = "not_found"
+
+# Productos por request en la actualización en bloque
+BULK_AVAILABILITY_MAX_IDS = 100
+
+
+def set_availability(user, product_ids, is_available):
+    """
+    Marca como disponibles o vendidos los productos ``product_ids`` de
+    ``user`` con un solo UPDATE condicional (solo is_available y
+    updated_at, sin recalcular el search_vector), que ignora los productos
+    de otros vendedores y los que ya tienen ese estado. Devuelve
+    ``{id: resultado}`` en el orden recibido: UPDATED, UNCHANGED,
+    FORBIDDEN (es de otro vendedor) o NOT_FOUND.
+    """
+    product_ids = [*dict.fromkeys(product_ids)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Product._meta.db_table} SET is_available = %s, updated_at = %s "
+            "WHERE id = ANY(%s) AND vendor_id = %s AND is_available <> %s RETURNING id",
+            [is_available, timezone.now(), product_ids, user.pk, is_available],
+        )
+        updated = {row[0] for row in cursor.fetchall()}
+
+    outcomes = {product_id: UPDATED if product_id in updated else NOT_FOUND for product_id in product_ids}
+    # Solo los que no cambiaron necesitan otra consulta para saber por qué
+    remaining = [product_id for product_id in product_ids if product_id not in updated]
+    if remaining:
+        for product_id, vendor_id in Product.objects.filter(pk__in=remaining).values_list("id", "vendor_id"):
+            outcomes[product_id] = UNCHANGED if vendor_id == user.pk else FORBIDDEN
+    if updated:
+        # El UPDATE no emite post_save (ver signals.py)
+        bump_version("product")
+    return outcomes
+
+
+def toggle_availability(user, product_id):
+    """
+    Invierte la disponibilidad de ``product_id`` en la base, sin leerla
+    antes, así que dos toggles simultáneos no se pisan. Devuelve
+    ``(resultado, is_available)``; is_available es None si no se cambió.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Product._meta.db_table} SET is_available = NOT is_available, updated_at = %s "
+            "WHERE id = %s AND vendor_id = %s RETURNING is_available",
+            [timezone.now(), product_id, user.pk],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        exists = Product.objects.filter(pk=product_id).exists()
+        return (FORBIDDEN if exists else NOT_FOUND), None
+    bump_version("product")
+    return UPDATED, row[0]
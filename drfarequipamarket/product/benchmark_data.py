@@ -0,0 +1,16 @@
+"""
+Vocabulario y ubicaciones para los catálogos sintéticos de los comandos
+benchmark_search y benchmark_import.
+"""
+
+WORDS = [
+    "cámara", "réflex", "celular", "samsung", "bicicleta", "montañera", "refrigeradora",
+    "lavadora", "televisor", "portátil", "zapatillas", "guitarra", "eléctrica", "sillón",
+    "escritorio", "mochila", "impresora", "audífonos", "licuadora", "colchón",
+]
+LOCATIONS = [
+    ("Arequipa", "Arequipa", "Cayma"),
+    ("Arequipa", "Arequipa", "Yanahuara"),
+    ("Lima", "Lima", "Miraflores"),
+    ("Cusco", "Cusco", "Wanchaq"),
+]
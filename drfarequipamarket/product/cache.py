@@ -0,0 +1,165 @@
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _version_key(namespace):
+    return f"version:{namespace}"
+
+
+def get_versions(namespaces):
+    """
+    Versiones actuales de ``namespaces``. Las claves de caché las incluyen,
+    así que al incrementar una versión todas sus entradas quedan obsoletas.
+    """
+    keys = [_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Se parte de un valor basado en el reloj para que, si la clave
+            # de versión es desalojada, no se reutilicen entradas viejas.
+            cache.add(key, time.time_ns())
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_version(namespace):
+    return get_versions([namespace])[0]
+
+
+def bump_version(namespace):
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.add(_version_key(namespace), time.time_ns())
+
+
+def make_key(prefix, namespaces, params):
+    """
+    Clave de caché para ``params`` (dict serializable) bajo las versiones
+    actuales de ``namespaces``.
+    """
+    versions = ".".join(str(version) for version in get_versions(namespaces))
+    signature = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f"{prefix}:{versions}:{signature}"
+
+
+def make_etag(*parts):
+    """ETag fuerte a partir de los valores que determinan la representación."""
+    return quote_etag(hashlib.sha1(repr(parts).encode()).hexdigest())
+
+
+def image_url_window():
+    """
+    ``(ventana, inicio)`` de la firma vigente de las URLs de imágenes de
+    producto, o ``(None, None)`` si el almacenamiento no las firma.
+
+    En producción (R2) las URLs llevan una firma que vence a los
+    AWS_QUERYSTRING_EXPIRE segundos. Las respuestas que las incluyen usan la
+    ventana en su ETag y clave de caché, y nunca declaran un Last-Modified
+    anterior a su inicio, para que un cliente que revalida no siga con URLs
+    vencidas.
+    """
+    from .models import ProductImage
+
+    storage = ProductImage._meta.get_field("url").storage
+    if not getattr(storage, "querystring_auth", False):
+        return None, None
+    expire = storage.querystring_expire
+    window = int(time.time() // expire)
+    return window, window * expire
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """
+    Evalúa If-None-Match / If-Modified-Since. Si el cliente envía
+    If-None-Match, If-Modified-Since se ignora (RFC 9110).
+    """
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag in parse_etags(if_none_match)
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return bool(if_modified_since and last_modified and int(last_modified) <= if_modified_since)
+
+
+def not_modified_response(etag, last_modified=None):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+
+
+def cache_response(*namespaces, per_user=False, signed_urls=False):
+    """
+    Cachea ``response.data`` de una acción de lectura de un ViewSet, con
+    clave por endpoint + query params normalizados + versiones de
+    ``namespaces``. Envía un ETag derivado de esa clave y responde 304 sin
+    consultar ni serializar cuando el If-None-Match del cliente sigue vigente.
+    Si la vista fija Last-Modified, se guarda junto a los datos y también se
+    responde a If-Modified-Since.
+
+    Con ``per_user`` la respuesta depende del usuario (p. ej. is_favorite),
+    así que la clave incluye su id y la versión de sus favoritos. Con
+    ``signed_urls`` la respuesta trae URLs de imágenes firmadas y la clave
+    cambia con su ventana de firma (ver image_url_window).
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            scope = list(namespaces)
+            signature = {
+                "host": request.get_host(),
+                "path": request.path,
+                "query": sorted(request.query_params.lists()),
+                "accept": request.headers.get("Accept", ""),
+            }
+            if per_user:
+                signature["user"] = request.user.pk
+                scope.append(f"favorites:{request.user.pk}")
+            window_start = None
+            if signed_urls:
+                signature["url_window"], window_start = image_url_window()
+            key = make_key(f"response:{self.basename}:{self.action}", scope, signature)
+            etag = make_etag(key)
+
+            if "If-None-Match" in request.headers and is_not_modified(request, etag):
+                response = not_modified_response(etag)
+            else:
+                cached = cache.get(key)
+                if cached is None:
+                    response = method(self, request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        return response
+                    last_modified = parse_http_date_safe(response.get("Last-Modified", ""))
+                    if last_modified and window_start:
+                        last_modified = max(last_modified, window_start)
+                    cache.set(key, (response.data, last_modified), settings.RESPONSE_CACHE_TIMEOUT)
+                    set_validators(response, etag, last_modified)
+                else:
+                    data, last_modified = cached
+                    if is_not_modified(request, etag, last_modified):
+                        response = not_modified_response(etag, last_modified)
+                    else:
+                        response = Response(data)
+                        set_validators(response, etag, last_modified)
+
+            if per_user:
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .cache import make_key
+from .filters import FILTER_PARAMS, filter_products, fuzzy_search_params
+from .models import Product
+
+# Rangos de precio [mínimo, máximo); el último no tiene tope.
+PRICE_BUCKETS = [(0, 100), (100, 500), (500, 1000), (1000, 5000), (5000, None)]
+
+FACETS_SQL = """
+WITH filtered AS ({filtered})
+SELECT 'total', NULL, NULL, NULL, COUNT(*) FROM filtered
+UNION ALL
+SELECT 'category', category_id::text, category_name, NULL, COUNT(*)
+    FROM filtered GROUP BY category_id, category_name
+UNION ALL
+SELECT 'departamento', departamento, NULL, NULL, COUNT(*)
+    FROM filtered GROUP BY departamento
+UNION ALL
+SELECT 'provincia', provincia, departamento, NULL, COUNT(*)
+    FROM filtered GROUP BY departamento, provincia
+UNION ALL
+SELECT 'distrito', distrito, provincia, departamento, COUNT(*)
+    FROM filtered GROUP BY departamento, provincia, distrito
+UNION ALL
+SELECT 'state', state, NULL, NULL, COUNT(*) FROM filtered GROUP BY state
+UNION ALL
+SELECT 'currency', currency, NULL, NULL, COUNT(*) FROM filtered GROUP BY currency
+UNION ALL
+SELECT 'price', price_bucket::text, NULL, NULL, COUNT(*) FROM filtered GROUP BY price_bucket
+"""
+
+
+def _price_bucket():
+    whens = []
+    for index, (low, high) in enumerate(PRICE_BUCKETS):
+        bounds = {"price__gte": low}
+        if high is not None:
+            bounds["price__lt"] = high
+        whens.append(When(then=Value(index), **bounds))
+    return Case(*whens, output_field=IntegerField())
+
+
+def compute_facets(queryset):
+    """
+    Cuenta los productos de ``queryset`` por categoría, ubicación, estado,
+    moneda y rango de precio en una sola consulta.
+    """
+    filtered = queryset.order_by().values(
+        "category_id",
+        "departamento",
+        "provincia",
+        "distrito",
+        "state",
+        "currency",
+        category_name=F("category__name"),
+        price_bucket=_price_bucket(),
+    )
+    sql, params = filtered.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(FACETS_SQL.format(filtered=sql), params)
+        rows = cursor.fetchall()
+
+    facets = {
+        "total": 0, "category": [], "departamento": [], "provincia": [],
+        "distrito": [], "state": [], "currency": [], "price": [],
+    }
+    for facet, value, parent, grandparent, count in rows:
+        if facet == "total":
+            facets["total"] = count
+        elif facet == "category":
+            facets["category"].append({"id": int(value), "name": parent, "count": count})
+        elif facet == "provincia":
+            facets["provincia"].append({"value": value, "departamento": parent, "count": count})
+        elif facet == "distrito":
+            facets["distrito"].append(
+                {"value": value, "provincia": parent, "departamento": grandparent, "count": count}
+            )
+        elif facet == "price":
+            if value is None:
+                # Precio fuera de todos los rangos (negativo, de datos previos
+                # a la validación de ProductSerializer): no entra en la faceta.
+                continue
+            low, high = PRICE_BUCKETS[int(value)]
+            facets["price"].append({"min": low, "max": high, "count": count})
+        else:
+            facets[facet].append({"value": value, "count": count})
+
+    for facet in ("category", "departamento", "provincia", "distrito", "state", "currency"):
+        facets[facet].sort(key=lambda entry: -entry["count"])
+    facets["price"].sort(key=lambda entry: entry["min"])
+    return facets
+
+
+def product_facets(params, user):
+    """
+    Facetas para los filtros de ``params``, cacheadas por combinación de
+    filtros hasta la siguiente escritura en el catálogo.
+    """
+    signature = {name: params.get(name) for name in FILTER_PARAMS if params.get(name) is not None}
+    if signature.get("mine") == "true":
+        signature["user"] = user.pk
+    key = make_key("product:facets", ["product", "category"], signature)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filter_products(Product.objects.all(), params, user))
+        fuzzy_params = fuzzy_search_params(params)
+        if not facets["total"] and fuzzy_params is not None:
+            # Igual que el listado: sin coincidencias se busca por trigramas
+            facets = compute_facets(filter_products(Product.objects.all(), fuzzy_params, user))
+        cache.set(key, facets, settings.RESPONSE_CACHE_TIMEOUT)
+    return facets
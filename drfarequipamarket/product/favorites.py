@@ -0,0 +1,104 @@
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from drfarequipamarket.users.models import CustomUser
+
+from .cache import bump_version
+from .models import Product
+
+Favorite = CustomUser.favorite_products.through
+
+# Productos por consulta en favorite_status
+FAVORITE_STATUS_MAX_IDS = 100
+
+
+def toggle_favorite(user, product_id):
+    """
+    Agrega o quita ``product_id`` de los favoritos de ``user`` sin cargar
+    su lista: borra la fila de la tabla intermedia y, si no existía, la
+    inserta. ``Product.favorite_count`` se ajusta en el mismo UPDATE que lo
+    devuelve. Retorna ``(is_favorite, favorite_count)``, o None si el
+    producto no existe.
+
+    Como no pasa por favorite_products.add/remove, no emite m2m_changed: la
+    versión de caché de los favoritos del usuario se incrementa aquí. El
+    contador forma parte de la representación del producto, así que también
+    se actualiza updated_at: su detalle (ETag y Last-Modified) cambia al
+    instante para todos los usuarios. Los listados cacheados no se
+    invalidan por cada clic; muestran el contador nuevo cuando vence su
+    entrada (RESPONSE_CACHE_TIMEOUT) o con la siguiente escritura del catálogo.
+    """
+    with transaction.atomic():
+        removed, _ = Favorite.objects.filter(customuser_id=user.pk, product_id=product_id).delete()
+        if removed:
+            count = _add_to_count(product_id, -1)
+        elif _insert_favorite(user.pk, product_id):
+            count = _add_to_count(product_id, 1)
+        else:
+            # Producto inexistente, o otro request del mismo usuario lo
+            # agregó en paralelo (ON CONFLICT): queda como favorito.
+            count = Product.objects.filter(pk=product_id).values_list("favorite_count", flat=True).first()
+            if count is None:
+                return None
+    bump_version(f"favorites:{user.pk}")
+    return not removed, count
+
+
+def _insert_favorite(user_id, product_id):
+    # El SELECT sobre product evita la violación de FK si el producto no
+    # existe; ON CONFLICT cubre la carrera con otro toggle del mismo usuario.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Favorite._meta.db_table} (customuser_id, product_id) "
+            f"SELECT %s, id FROM {Product._meta.db_table} WHERE id = %s "
+            "ON CONFLICT DO NOTHING RETURNING id",
+            [user_id, product_id],
+        )
+        return cursor.fetchone() is not None
+
+
+def _add_to_count(product_id, delta):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Product._meta.db_table} "
+            "SET favorite_count = GREATEST(favorite_count + %s, 0), updated_at = %s "
+            "WHERE id = %s RETURNING favorite_count",
+            [delta, timezone.now(), product_id],
+        )
+        return cursor.fetchone()[0]
+
+
+def favorite_status(user, product_ids):
+    """
+    ``{id: {"is_favorite": bool, "favorite_count": int}}`` de los productos
+    existentes entre ``product_ids``, en una sola consulta.
+    """
+    rows = (
+        Product.objects.filter(pk__in=product_ids)
+        .annotate(is_favorite=Exists(Favorite.objects.filter(product=OuterRef("pk"), customuser_id=user.pk)))
+        .values_list("id", "is_favorite", "favorite_count")
+    )
+    return {
+        product_id: {"is_favorite": is_favorite, "favorite_count": favorite_count}
+        for product_id, is_favorite, favorite_count in rows
+    }
+
+
+def counted_favorites():
+    """Expresión con la cantidad real de favoritos de cada producto."""
+    return Coalesce(Subquery(
+        Favorite.objects.filter(product=OuterRef("pk"))
+        .values("product").annotate(total=Count("id")).values("total")
+    ), 0)
+
+
+def recount_favorites(product_ids):
+    """
+    Recalcula favorite_count de ``product_ids`` desde la tabla intermedia.
+    Como en toggle_favorite, no invalida los listados cacheados.
+    """
+    return Product.objects.filter(pk__in=product_ids).update(
+        favorite_count=counted_favorites(), updated_at=timezone.now()
+    )
@@ -0,0 +1,85 @@
+from .search import search_products
+
+# Query params que entiende filter_products
+FILTER_PARAMS = (
+    "category", "min_price", "max_price", "departamento", "provincia",
+    "distrito", "available", "mine", "search", "search_mode",
+)
+
+# search_mode=fuzzy: búsqueda por similitud de trigramas (ver search_products)
+FUZZY_SEARCH = "fuzzy"
+
+
+def filter_products(queryset, params, user=None):
+    """
+    Aplica los filtros del catálogo (query params de /api/product/) sobre
+    ``queryset``. Lo comparten el listado, la verificación de índices y
+    cualquier endpoint que necesite el mismo conjunto filtrado.
+    """
+    # Filtro por categoría
+    category = params.get("category")
+    if category is not None:
+        queryset = queryset.filter(category__id=category)
+
+    # Filtro por precio mínimo
+    min_price = params.get("min_price")
+    if min_price is not None:
+        try:
+            min_price_float = float(min_price)
+            queryset = queryset.filter(price__gte=min_price_float)
+        except ValueError:
+            pass
+
+    # Filtro por precio máximo
+    max_price = params.get("max_price")
+    if max_price is not None:
+        try:
+            max_price_float = float(max_price)
+            queryset = queryset.filter(price__lte=max_price_float)
+        except ValueError:
+            pass
+
+    # Filtro por departamento
+    departamento = params.get("departamento")
+    if departamento is not None:
+        queryset = queryset.filter(departamento=departamento)
+
+    # Filtro por provincia
+    provincia = params.get("provincia")
+    if provincia is not None:
+        queryset = queryset.filter(provincia=provincia)
+
+    # Filtro por distrito
+    distrito = params.get("distrito")
+    if distrito is not None:
+        queryset = queryset.filter(distrito=distrito)
+
+    # Filtro por disponibilidad
+    available = params.get("available")
+    if available in ("true", "false"):
+        queryset = queryset.filter(is_available=available == "true")
+
+    # Filtro por productos del usuario
+    mine = params.get("mine")
+    if mine == "true":
+        queryset = queryset.filter(vendor=user)
+
+    # Búsqueda de texto completo; va al final para que el respaldo por
+    # trigramas se evalúe sobre el conjunto ya filtrado.
+    product_name = params.get("search")
+    if product_name:
+        queryset = search_products(queryset, product_name, fuzzy=params.get("search_mode") == FUZZY_SEARCH)
+
+    return queryset
+
+
+def fuzzy_search_params(params):
+    """
+    ``params`` con search_mode=fuzzy si conviene reintentar la búsqueda por
+    trigramas (hay ``search`` y no se pidió ya ese modo); si no, None.
+    """
+    if not params.get("search") or params.get("search_mode") == FUZZY_SEARCH:
+        return None
+    params = params.copy()
+    params["search_mode"] = FUZZY_SEARCH
+    return params
@@ -0,0 +1,92 @@
+import io
+import math
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Variantes que se generan de cada imagen de producto: nombre -> ancho en px.
+# Los listados usan "thumb"; el detalle, "medium" o "large".
+IMAGE_VARIANTS = {
+    "thumb": 200,
+    "medium": 480,
+    "large": 1080,
+}
+# Lado mayor máximo con el que se guarda el original
+ORIGINAL_MAX_SIZE = 1600
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+VARIANTS_DIR = "product_images/variants"
+
+
+class ProcessedImage:
+    def __init__(self, original, variants):
+        self.original = original
+        self.variants = variants
+
+
+def process_image(content, name):
+    """
+    Normaliza una imagen subida y genera sus variantes.
+
+    Aplica la orientación EXIF y vuelve a codificar sin metadatos (EXIF,
+    GPS), limita el original a ORIGINAL_MAX_SIZE px y crea una versión WebP
+    por cada ancho de IMAGE_VARIANTS (sin ampliar imágenes pequeñas). Las
+    variantes se reducen en cascada desde la más grande, que es bastante más
+    rápido que reducir cada una desde el original.
+    """
+    stem = os.path.splitext(os.path.basename(name))[0]
+    image = Image.open(content)
+    # Para JPEG decodifica directamente a la escala más pequeña (1/2, 1/4,
+    # 1/8) que aún cubre ORIGINAL_MAX_SIZE: evita decodificar y luego
+    # reducir una foto de 12 MP completa.
+    scale = min(1, ORIGINAL_MAX_SIZE / max(image.size))
+    image.draft("RGB", (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+    image.load()
+    ImageOps.exif_transpose(image, in_place=True)
+
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    mode = "RGBA" if has_alpha else "RGB"
+    if image.mode != mode:
+        image = image.convert(mode)
+    image.thumbnail((ORIGINAL_MAX_SIZE, ORIGINAL_MAX_SIZE), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    if has_alpha:
+        original = _encode(image, "PNG", optimize=True)
+        original_name = f"{stem}.png"
+    else:
+        original = _encode(image, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        original_name = f"{stem}.jpg"
+
+    variants = {}
+    resized = image
+    for variant, width in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+        if resized.width > width:
+            height = max(1, round(resized.height * width / resized.width))
+            resized = resized.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        variants[variant] = ContentFile(
+            _encode(resized, "WEBP", quality=WEBP_QUALITY, method=4),
+            name=f"{stem}_{width}.webp",
+        )
+    return ProcessedImage(ContentFile(original, name=original_name), variants)
+
+
+def store_image(image, content):
+    """
+    Procesa ``content`` y guarda original y variantes en el almacenamiento
+    de ``image.url``. No guarda la fila.
+    """
+    processed = process_image(content, content.name)
+    image.url.save(processed.original.name, processed.original, save=False)
+    stem = os.path.splitext(os.path.basename(image.url.name))[0]
+    storage = image.url.storage
+    image.variants = {
+        variant: storage.save(f"{VARIANTS_DIR}/{stem}_{IMAGE_VARIANTS[variant]}.webp", file)
+        for variant, file in processed.variants.items()
+    }
+
+
+def _encode(image, image_format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
@@ -0,0 +1,181 @@
+import csv
+import json
+import logging
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from .cache import bump_version
+from .models import Category, Product
+from .serializers import ProductSerializer
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_BATCH_SIZE = 500
+# Errores detallados que se devuelven; el resto solo se cuenta.
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Resuelve la categoría desde ``context["categories"]`` (cargado una vez
+    por importación) en lugar de hacer una consulta por fila.
+    """
+
+    def to_internal_value(self, data):
+        categories = self.context["categories"]
+        try:
+            return categories[int(data)]
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class ProductImportSerializer(ProductSerializer):
+    """
+    Mismas reglas que ProductSerializer, sin imágenes y sin consultas por fila.
+    """
+
+    product_image = None
+    category = ImportCategoryField(queryset=Category.objects.all(), required=True)
+    name = serializers.CharField(required=True, max_length=100)
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def detect_format(filename, default="csv"):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension == "csv":
+        return "csv"
+    return default
+
+
+def read_csv_rows(stream):
+    # La línea 1 es el encabezado.
+    reader = csv.DictReader(stream)
+    for row in reader:
+        row.pop(None, None)  # columnas sobrantes
+        yield reader.line_num, {key: value for key, value in row.items() if value not in (None, "")}
+
+
+def read_jsonl_rows(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, serializers.ValidationError({"non_field_errors": [f"JSON inválido: {e.msg}"]})
+            continue
+        if not isinstance(row, dict):
+            row = serializers.ValidationError({"non_field_errors": ["Cada línea debe ser un objeto JSON"]})
+        yield line_number, row
+
+
+READERS = {"csv": read_csv_rows, "jsonl": read_jsonl_rows}
+
+
+def import_products(stream, vendor, file_format="csv", batch_size=IMPORT_BATCH_SIZE):
+    """
+    Importa productos de ``vendor`` desde un archivo CSV o JSONL (texto).
+
+    El archivo se lee en streaming y se procesa por lotes de ``batch_size``
+    filas: cada lote se valida con las reglas de ProductSerializer y las
+    filas válidas se insertan con un solo bulk_create. Las filas inválidas se
+    reportan con su número de línea sin abortar la importación, así que la
+    memoria usada depende del tamaño del lote y no del archivo.
+
+    Si el archivo deja de ser UTF-8 a mitad de camino, los lotes anteriores
+    ya están guardados: la importación se detiene ahí y el problema se
+    reporta como error de la línea siguiente a la última leída.
+    """
+    if file_format not in READERS:
+        raise ValueError(f"Formato no soportado: {file_format}")
+
+    report = ImportReport()
+    serializer = ProductImportSerializer(
+        context={"categories": Category.objects.in_bulk()}
+    )
+    rows = READERS[file_format](stream)
+    last_line = 0
+    try:
+        while True:
+            batch, decoded = _read_batch(rows, batch_size)
+            if batch:
+                last_line = batch[-1][0]
+            elif decoded:
+                break
+            valid = []
+            for line, row in batch:
+                try:
+                    if isinstance(row, serializers.ValidationError):
+                        raise row
+                    valid.append((line, Product(**serializer.run_validation(row), vendor=vendor)))
+                except serializers.ValidationError as e:
+                    report.add_error(line, e.detail)
+            _insert(valid, report)
+            if not decoded:
+                # El lector no puede continuar tras un error de decodificación
+                report.add_error(last_line + 1, {"non_field_errors": [
+                    "No se pudo leer el archivo desde esta línea: debe estar en UTF-8"
+                ]})
+                break
+    finally:
+        if report.created:
+            # bulk_create no emite post_save; se invalidan aquí las lecturas cacheadas.
+            bump_version("product")
+    logger.info(f"Importación de productos para usuario {vendor.id}: {report.created} creados, {report.failed} con errores")
+    return report
+
+
+def _read_batch(rows, batch_size):
+    # (filas, decodificado): se conservan las filas leídas antes del error
+    batch = []
+    try:
+        for row in islice(rows, batch_size):
+            batch.append(row)
+    except UnicodeDecodeError:
+        return batch, False
+    return batch, True
+
+
+def _insert(valid, report):
+    if not valid:
+        return
+    try:
+        with transaction.atomic():
+            Product.objects.bulk_create([product for _, product in valid])
+        report.created += len(valid)
+    except DatabaseError:
+        # Algún valor pasó la validación pero no la base de datos: se reintenta
+        # fila por fila para atribuir el error a su línea.
+        for line, product in valid:
+            try:
+                with transaction.atomic():
+                    product.save(force_insert=True)
+                report.created += 1
+            except DatabaseError as e:
+                report.add_error(line, {"non_field_errors": [str(e).strip()]})
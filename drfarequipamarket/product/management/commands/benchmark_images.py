@@ -0,0 +1,48 @@
+import io
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from drfarequipamarket.product.images import process_image
+
+
+class Command(BaseCommand):
+    help = "Mide el procesamiento de imágenes de productos (original normalizado + variantes WebP)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=30)
+        parser.add_argument("--width", type=int, default=4000)
+        parser.add_argument("--height", type=int, default=3000)
+
+    def handle(self, *args, images, width, height, **options):
+        source = self._photo(width, height)
+        self.stdout.write(f"imagen de entrada: {width}x{height} JPEG, {len(source) / 1024:.0f} KiB")
+
+        timings = []
+        for _ in range(images):
+            started = time.perf_counter()
+            processed = process_image(io.BytesIO(source), "foto.jpg")
+            timings.append((time.perf_counter() - started) * 1000)
+
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f"{images} imágenes: {1000 * images / sum(timings):.1f} imágenes/s, "
+            f"p50 {statistics.median(timings):.0f} ms, p95 {p95:.0f} ms"
+        )
+        self.stdout.write(f"{'archivo':<22}{'KiB':>10}")
+        self.stdout.write(f"{processed.original.name:<22}{processed.original.size / 1024:>10.1f}")
+        for variant in processed.variants.values():
+            self.stdout.write(f"{variant.name:<22}{variant.size / 1024:>10.1f}")
+
+    def _photo(self, width, height):
+        # Ruido sobre un degradado: se comprime parecido a una foto real.
+        rng = random.Random(42)
+        image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+        noise = Image.frombytes("RGB", (width // 4, height // 4), rng.randbytes(width // 4 * height // 4 * 3))
+        image = Image.blend(image, noise.resize((width, height)), 0.3)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=90)
+        return buffer.getvalue()
@@ -0,0 +1,78 @@
+import csv
+import json
+import random
+import resource
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from drfarequipamarket.product.benchmark_data import LOCATIONS, WORDS
+from drfarequipamarket.product.importers import IMPORT_BATCH_SIZE, import_products
+from drfarequipamarket.product.models import Category
+from drfarequipamarket.users.models import CustomUser
+
+FIELDS = ["name", "description", "price", "currency", "state", "category",
+          "departamento", "provincia", "distrito"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide filas/segundo y memoria máxima de la importación masiva de productos "
+        "sobre un archivo sintético (se revierte al terminar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--format", dest="file_format", choices=["csv", "jsonl"], default="csv")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument(
+            "--invalid-ratio", type=float, default=0.01, help="Fracción de filas con precio inválido"
+        )
+
+    def handle(self, *args, rows, file_format, batch_size, invalid_ratio, **options):
+        with transaction.atomic():
+            vendor = CustomUser.objects.create_user(
+                email="benchmark-import@example.com", password=None, username="benchmark-import"
+            )
+            categories = [Category.objects.create(name=f"Benchmark import {i}").id for i in range(10)]
+
+            with tempfile.NamedTemporaryFile("w+", suffix=f".{file_format}", newline="") as stream:
+                self._write(stream, rows, file_format, categories, invalid_ratio)
+                stream.seek(0)
+                rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                started = time.perf_counter()
+                report = import_products(stream, vendor, file_format=file_format, batch_size=batch_size)
+                elapsed = time.perf_counter() - started
+                rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+            self.stdout.write(f"filas: {rows}  creadas: {report.created}  con errores: {report.failed}")
+            self.stdout.write(f"tiempo: {elapsed:.2f} s  ({rows / elapsed:,.0f} filas/s)")
+            # ru_maxrss está en KiB en Linux; solo crece, así que el aumento
+            # es lo que la importación sumó al pico del proceso.
+            self.stdout.write(f"memoria máxima: {rss_after / 1024:.1f} MiB (+{(rss_after - rss_before) / 1024:.1f} MiB)")
+            transaction.set_rollback(True)
+
+    def _write(self, stream, count, file_format, categories, invalid_ratio):
+        rng = random.Random(42)
+        writer = csv.DictWriter(stream, fieldnames=FIELDS) if file_format == "csv" else None
+        if writer:
+            writer.writeheader()
+        for _ in range(count):
+            departamento, provincia, distrito = rng.choice(LOCATIONS)
+            row = {
+                "name": " ".join(rng.sample(WORDS, 3)),
+                "description": " ".join(rng.choices(WORDS, k=20)),
+                "price": "gratis" if rng.random() < invalid_ratio else rng.randint(10, 5000),
+                "currency": "PEN",
+                "state": "NEW",
+                "category": rng.choice(categories),
+                "departamento": departamento,
+                "provincia": provincia,
+                "distrito": distrito,
+            }
+            if writer:
+                writer.writerow(row)
+            else:
+                stream.write(json.dumps(row, ensure_ascii=False) + "\n")
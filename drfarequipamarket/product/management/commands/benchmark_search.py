@@ -0,0 +1,79 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from drfarequipamarket.product.benchmark_data import LOCATIONS, WORDS
+from drfarequipamarket.product.models import Category, Product
+from drfarequipamarket.product.search import search_products
+from drfarequipamarket.users.models import CustomUser
+
+QUERIES = ["camara", "cámara réflex", "bicicleta montañera", "celular", "Miraflores", "refrigeradra"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la búsqueda por vector de texto con el filtro name__icontains "
+        "sobre un catálogo sintético (se revierte al terminar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--limit", type=int, default=12, help="Tamaño de página leído en cada consulta")
+
+    def handle(self, *args, products, repeat, limit, **options):
+        with transaction.atomic():
+            self._populate(products)
+            self.stdout.write(f"{'consulta':<22}{'modo':<10}{'filas':>8}{'p50 ms':>10}{'p95 ms':>10}")
+            for term in QUERIES:
+                paths = {
+                    "icontains": lambda: Product.objects.filter(name__icontains=term),
+                    # Como el listado: trigramas solo si la primera página sale vacía
+                    "search": lambda: (
+                        list(search_products(Product.objects.all(), term)[:limit])
+                        or search_products(Product.objects.all(), term, fuzzy=True)
+                    ),
+                }
+                for mode, build in paths.items():
+                    timings = []
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        rows = list(build()[:limit])
+                        timings.append((time.perf_counter() - started) * 1000)
+                    p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+                    self.stdout.write(
+                        f"{term:<22}{mode:<10}{len(rows):>8}{statistics.median(timings):>10.2f}{p95:>10.2f}"
+                    )
+            transaction.set_rollback(True)
+
+    def _populate(self, count):
+        rng = random.Random(42)
+        vendor = CustomUser.objects.create_user(
+            email="benchmark-search@example.com", password=None, username="benchmark-search"
+        )
+        categories = [Category.objects.create(name=f"Benchmark {i}") for i in range(10)]
+        batch = []
+        for i in range(count):
+            departamento, provincia, distrito = rng.choice(LOCATIONS)
+            batch.append(Product(
+                name=" ".join(rng.sample(WORDS, 3)),
+                description=" ".join(rng.choices(WORDS, k=20)),
+                price=rng.randint(10, 5000),
+                currency="PEN",
+                state="NEW",
+                category=rng.choice(categories),
+                vendor=vendor,
+                departamento=departamento,
+                provincia=provincia,
+                distrito=distrito,
+            ))
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Product._meta.db_table}")
+        self.stdout.write(f"{count} productos sintéticos creados")
@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from drfarequipamarket.product.filters import filter_products
+from drfarequipamarket.product.models import Product
+from drfarequipamarket.users.models import CustomUser
+
+# Combinaciones de query params soportadas por /api/product/
+FILTER_COMBINATIONS = [
+    {"category": "1"},
+    {"category": "1", "min_price": "100", "max_price": "500"},
+    {"min_price": "100", "max_price": "500"},
+    {"departamento": "Arequipa"},
+    {"departamento": "Arequipa", "provincia": "Arequipa"},
+    {"departamento": "Arequipa", "provincia": "Arequipa", "distrito": "Cayma"},
+    {"distrito": "Cayma"},
+    {"category": "1", "departamento": "Arequipa", "provincia": "Arequipa", "distrito": "Cayma"},
+    {"available": "true", "min_price": "100", "max_price": "500"},
+    {"available": "true", "category": "1", "max_price": "500"},
+    {"mine": "true"},
+    {"mine": "true", "available": "true"},
+    {"search": "camara"},
+]
+
+
+def table_scans(plan, table):
+    """Devuelve los nodos del plan que leen ``table``."""
+    scans = [plan] if plan.get("Relation Name") == table else []
+    for child in plan.get("Plans", []):
+        scans.extend(table_scans(child, table))
+    return scans
+
+
+def scan_indexes(node):
+    """Nombres de los índices leídos en el subárbol de ``node``."""
+    indexes = {node["Index Name"]} if node.get("Index Name") else set()
+    for child in node.get("Plans", []):
+        indexes |= scan_indexes(child)
+    return indexes
+
+
+class Command(BaseCommand):
+    help = "Verifica con EXPLAIN que cada combinación de filtros del catálogo puede usar un índice"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--planner-costs",
+            action="store_true",
+            help="No desactivar enable_seqscan: muestra el plan que elegiría PostgreSQL con los datos actuales",
+        )
+
+    def handle(self, *args, planner_costs, **options):
+        table = Product._meta.db_table
+        # Basta con un usuario con pk para construir el filtro "mine".
+        user = CustomUser(pk=0)
+        failures = []
+        with transaction.atomic():
+            if not planner_costs:
+                # Con enable_seqscan desactivado, un Seq Scan en el plan
+                # significa que ningún índice sirve para esa combinación.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for params in FILTER_COMBINATIONS:
+                queryset = filter_products(Product.objects.all(), params, user)
+                plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+                label = "&".join(f"{key}={value}" for key, value in params.items())
+                scans = table_scans(plan, table)
+                if all(scan["Node Type"] != "Seq Scan" for scan in scans):
+                    indexes = set().union(*(scan_indexes(scan) for scan in scans))
+                    self.stdout.write(f"OK        {label}  [{', '.join(sorted(indexes))}]")
+                else:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f"SEQ SCAN  {label}"))
+
+        if failures and not planner_costs:
+            raise CommandError(f"{len(failures)} combinaciones de filtros sin índice: {', '.join(failures)}")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from drfarequipamarket.product.images import store_image
+from drfarequipamarket.product.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las variantes (thumb/medium/large) de las imágenes de productos "
+        "que aún no las tienen, p. ej. las subidas antes de existir o desde el admin"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None)
+
+    def handle(self, *args, limit, **options):
+        images = ProductImage.objects.ready().filter(variants={}).exclude(url="").order_by("id")
+        if limit:
+            images = images[:limit]
+        done = failed = 0
+        for image in images.iterator(chunk_size=100):
+            previous_name = image.url.name
+            try:
+                with image.url.open("rb") as content:
+                    content.name = previous_name
+                    store_image(image, content)
+                # save() emite post_save: invalida cachés y actualiza el producto.
+                image.save(update_fields=["url", "variants"])
+                done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Imagen {image.id}: {e}")
+                continue
+            # El original normalizado se guardó con otro nombre; el anterior
+            # ya no lo referencia ninguna fila.
+            if image.url.name != previous_name:
+                try:
+                    image.url.storage.delete(previous_name)
+                except Exception as e:
+                    self.stderr.write(f"Imagen {image.id}: no se pudo borrar {previous_name}: {e}")
+        self.stdout.write(self.style.SUCCESS(f"{done} imágenes procesadas, {failed} con errores"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from drfarequipamarket.product.importers import (
+    IMPORT_BATCH_SIZE, IMPORT_FORMATS, detect_format, import_products,
+)
+from drfarequipamarket.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Importa productos de un vendedor desde un archivo CSV o JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--vendor", required=True, help="Email del vendedor")
+        parser.add_argument("--format", dest="file_format", choices=IMPORT_FORMATS)
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, path, vendor, file_format, batch_size, **options):
+        try:
+            vendor = CustomUser.objects.get(email=vendor)
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No existe el usuario {vendor}")
+
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            report = import_products(
+                stream, vendor, file_format=file_format or detect_format(path), batch_size=batch_size
+            )
+
+        for error in report.errors:
+            self.stderr.write(f"línea {error['line']}: {error['errors']}")
+        if report.failed > len(report.errors):
+            self.stderr.write(f"... y {report.failed - len(report.errors)} filas más con errores")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.created} productos creados, {report.failed} filas con errores"
+        ))
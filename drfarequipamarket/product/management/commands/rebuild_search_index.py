@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from drfarequipamarket.product.cache import bump_version
+from drfarequipamarket.product.models import Product
+
+
+class Command(BaseCommand):
+    help = "Recalcula Product.search_vector por lotes (tras cambiar la configuración de búsqueda o restaurar datos)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, batch_size, **options):
+        table = Product._meta.db_table
+        last_id, total = 0, 0
+        while True:
+            # Reasignar el nombre dispara el trigger que recalcula el vector.
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE {table} SET name = name
+                    WHERE id IN (
+                        SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s
+                    )
+                    RETURNING id
+                    """,
+                    [last_id, batch_size],
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            last_id = max(ids)
+            total += len(ids)
+            self.stdout.write(f"{total} productos indexados")
+        # El UPDATE no emite señales; las búsquedas cacheadas se invalidan aquí.
+        bump_version("product")
+        self.stdout.write(self.style.SUCCESS(f"Índice de búsqueda reconstruido: {total} productos"))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from drfarequipamarket.product.cache import bump_version
+from drfarequipamarket.product.favorites import counted_favorites
+from drfarequipamarket.product.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde la tabla de favoritos el favorite_count de cada producto "
+        "y corrige los que no coinciden"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Solo informa los productos desalineados")
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        expected = (
+            Product.objects.annotate(expected_favorite_count=counted_favorites())
+            .only("id", "favorite_count", "updated_at").order_by("id")
+        )
+
+        checked, stale = 0, []
+        now = timezone.now()
+        for product in expected.iterator(chunk_size=batch_size):
+            checked += 1
+            if product.favorite_count != product.expected_favorite_count:
+                product.favorite_count = product.expected_favorite_count
+                # Cambia la representación: nuevos ETag / Last-Modified
+                product.updated_at = now
+                stale.append(product)
+
+        if stale and not dry_run:
+            # bulk_update no emite post_save: se invalidan a mano las
+            # respuestas cacheadas del catálogo.
+            Product.objects.bulk_update(stale, ["favorite_count", "updated_at"], batch_size=batch_size)
+            bump_version("product")
+
+        action = "por corregir" if dry_run else "corregidos"
+        self.stdout.write(self.style.SUCCESS(f"{checked} productos revisados, {len(stale)} {action}"))
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from drfarequipamarket.product.models import ProductImage
+from drfarequipamarket.product.uploads import mark_failed
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca como fallidas (o elimina) las imágenes que siguen pendientes de "
+        "subir tras un tiempo, p. ej. porque el proceso se reinició con la subida en cola"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, default=30,
+            help="Minutos desde su creación para considerar colgada una subida",
+        )
+        parser.add_argument("--delete", action="store_true", help="Eliminar las filas en lugar de marcarlas")
+
+    def handle(self, *args, older_than, delete, **options):
+        # El contenido solo vivía en la memoria del proceso que las encoló:
+        # no se pueden reintentar, el vendedor debe volver a subirlas.
+        stale = ProductImage.objects.filter(
+            status=ProductImage.STATUS_PENDING,
+            created_at__lt=timezone.now() - timedelta(minutes=older_than),
+        )
+        if delete:
+            # delete() emite post_delete: invalida cachés y actualiza el producto.
+            swept, _ = stale.delete()
+            action = "eliminadas"
+        else:
+            swept = mark_failed(stale)
+            action = "marcadas como fallidas"
+        self.stdout.write(self.style.SUCCESS(f"{swept} imágenes pendientes {action}"))
@@ -0,0 +1,85 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:58
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations, models
+
+
+# unaccent() es STABLE; este envoltorio IMMUTABLE permite indexar expresiones.
+UNACCENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION product_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent($1) $$;
+"""
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE OR REPLACE FUNCTION product_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('spanish', product_unaccent(coalesce(NEW.name, ''))), 'A') ||
+        setweight(to_tsvector('spanish', product_unaccent(coalesce(
+            (SELECT name FROM product_category WHERE id = NEW.category_id), ''))), 'B') ||
+        setweight(to_tsvector('spanish', product_unaccent(
+            concat_ws(' ', NEW.departamento, NEW.provincia, NEW.distrito))), 'B') ||
+        setweight(to_tsvector('spanish', product_unaccent(coalesce(NEW.description, ''))), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER product_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description, category_id, departamento, provincia, distrito
+    ON product_product
+    FOR EACH ROW EXECUTE FUNCTION product_search_vector_update();
+
+CREATE OR REPLACE FUNCTION product_category_search_update() RETURNS trigger AS $$
+BEGIN
+    IF NEW.name IS DISTINCT FROM OLD.name THEN
+        UPDATE product_product SET category_id = category_id WHERE category_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER product_category_search_trigger
+    AFTER UPDATE OF name ON product_category
+    FOR EACH ROW EXECUTE FUNCTION product_category_search_update();
+
+UPDATE product_product SET name = name;
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS product_category_search_trigger ON product_category;
+DROP FUNCTION IF EXISTS product_category_search_update();
+DROP TRIGGER IF EXISTS product_search_vector_trigger ON product_product;
+DROP FUNCTION IF EXISTS product_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0004_product_price_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        TrigramExtension(),
+        migrations.RunSQL(UNACCENT_FUNCTION, "DROP FUNCTION IF EXISTS product_unaccent(text);"),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(models.Func(models.F('name'), function='product_unaccent'), name='gin_trgm_ops'), name='product_name_trgm_idx'),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 08:16
+
+import drfarequipamarket.product.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0007_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Subiendo'), ('ready', 'Lista'), ('failed', 'Error al subir')], default='ready', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='url',
+            field=models.ImageField(blank=True, storage=drfarequipamarket.product.models.product_image_storage, upload_to='product_images/'),
+        ),
+    ]
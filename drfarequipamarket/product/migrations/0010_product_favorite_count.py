@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+COUNT_FAVORITES = """
+UPDATE product_product AS product
+SET favorite_count = favorites.total
+FROM (
+    SELECT product_id, COUNT(*) AS total
+    FROM users_customuser_favorite_products
+    GROUP BY product_id
+) AS favorites
+WHERE favorites.product_id = product.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0009_product_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0002_customuser_favorite_products'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(COUNT_FAVORITES, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-favorite_count', '-id'], name='product_favorite_count_idx'),
+        ),
+    ]
@@ -1,9 +1,12 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.core.files.storage import storages
+from drfarequipamarket.profiling import instrument_storage
 from drfarequipamarket.users import models as UserModels
 from drfarequipamarket.users.models import CustomUser
 from drfarequipamarket.product import models as ProductModels
-from storages.backends.s3boto3 import S3Boto3Storage
 
 
 class Category(models.Model):
@@ -34,6 +37,18 @@ class District(models.Model):
         return self.name
 
 
+class ProductQuerySet(models.QuerySet):
+    def with_listing_relations(self):
+        """
+        Carga en bloque las relaciones que usa ProductSerializer para que
+        los listados no hagan una consulta por producto. Solo se incluyen
+        las imágenes ya subidas.
+        """
+        return self.select_related("vendor").prefetch_related(
+            models.Prefetch("product_image", queryset=ProductImage.objects.ready())
+        )
+
+
 class Product(models.Model):
     # Constants
     PRODUCT_STATE = [
@@ -62,17 +77,93 @@ class Product(models.Model):
     provincia = models.CharField(max_length=100, blank=True, null=True)
     distrito = models.CharField(max_length=100, blank=True, null=True)
 
+    # También se actualiza cuando cambian sus imágenes (ver signals.py);
+    # es la base de los ETag / Last-Modified del producto.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Usuarios que lo tienen en favoritos; lo mantienen favorites.py y
+    # signals.py, y reconcile_favorite_counts lo corrige si se desalinea.
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Lo mantiene un trigger de PostgreSQL (migración 0005) a partir del
+    # nombre, descripción, categoría y ubicación.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Clave de la paginación keyset ordenada por precio
+            models.Index(fields=["price", "id"], name="product_price_id_idx"),
+            # Combinaciones de filtros de filter_products; se verifican con
+            # el comando check_product_indexes.
+            models.Index(fields=["category", "price"], name="product_category_price_idx"),
+            models.Index(
+                fields=["departamento", "provincia", "distrito"], name="product_location_idx"
+            ),
+            models.Index(fields=["distrito"], name="product_distrito_idx"),
+            models.Index(fields=["vendor", "is_available"], name="product_vendor_available_idx"),
+            # Orden "más deseados" (ordering=-favorite_count)
+            models.Index(fields=["-favorite_count", "-id"], name="product_favorite_count_idx"),
+            models.Index(
+                fields=["price", "id"],
+                condition=models.Q(is_available=True),
+                name="product_available_price_idx",
+            ),
+            models.Index(
+                fields=["category", "price"],
+                condition=models.Q(is_available=True),
+                name="product_available_cat_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="product_search_vector_idx"),
+            GinIndex(
+                OpClass(models.Func(models.F("name"), function="product_unaccent"), name="gin_trgm_ops"),
+                name="product_name_trgm_idx",
+            ),
+        ]
+
     def __str__(self):
         return str(self.id) + " - " + self.name
 
 
+def product_image_storage():
+    # Alias "product_images" de settings.STORAGES (R2 en producción); sus
+    # llamadas cuentan en el perfil del request (ver profiling.py)
+    return instrument_storage(storages["product_images"])
+
+
+class ProductImageQuerySet(models.QuerySet):
+    def ready(self):
+        return self.filter(status=ProductImage.STATUS_READY)
+
+
 class ProductImage(models.Model):
+    # Las imágenes enviadas al crear un producto se suben en segundo plano
+    # (ver product.uploads); hasta entonces url está vacío.
+    STATUS_PENDING = "pending"
+    STATUS_READY = "ready"
+    STATUS_FAILED = "failed"
+    STATUSES = [
+        (STATUS_PENDING, "Subiendo"),
+        (STATUS_READY, "Lista"),
+        (STATUS_FAILED, "Error al subir"),
+    ]
+
     name = models.CharField(max_length=100, blank=True)
     alternative_text = models.CharField(max_length=100, blank=True)
-    url = models.ImageField(upload_to='product_images/', storage=S3Boto3Storage())
+    url = models.ImageField(upload_to='product_images/', storage=product_image_storage, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_READY)
+    # Rutas en el almacenamiento de las versiones reducidas en WebP, por
+    # nombre de variante (ver product.images.IMAGE_VARIANTS).
+    variants = models.JSONField(default=dict, blank=True)
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name="product_image"
     )
+    # Permite detectar subidas pendientes que quedaron colgadas (ver
+    # sweep_pending_images).
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ProductImageQuerySet.as_manager()
 
     def __str__(self):
         return self.name or f"Image for product {self.product.id}"
@@ -0,0 +1,107 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from drfarequipamarket.pagination import KeysetPagination
+
+
+class ProductKeysetPagination(KeysetPagination):
+    """
+    Paginación por cursor (keyset) para el catálogo de productos.
+
+    En lugar de OFFSET, cada página se pide "después de" (o "antes de") la
+    clave de ordenamiento de la última fila vista, así que el costo de una
+    página es el mismo en la página 1 que en la 1000. La clave siempre
+    termina en ``id`` para que el orden sea total y estable. Si el queryset
+    viene de una búsqueda (anotación ``rank``) y no se pidió otro orden, se
+    pagina por relevancia: ``(-rank, -id)``.
+
+    Es opcional: solo se activa cuando el cliente envía ``cursor`` o
+    ``page_size``; sin ellos el listado conserva su respuesta original.
+    """
+
+    page_size = 12
+    page_size_description = "Productos por página"
+    ordering_query_param = "ordering"
+    default_ordering = "-id"
+    orderings = {
+        "id": ("id",),
+        "-id": ("-id",),
+        "price": ("price", "id"),
+        "-price": ("-price", "-id"),
+        "-favorite_count": ("-favorite_count", "-id"),
+    }
+    rank_ordering = ("-rank", "-id")
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset)
+
+        cursor = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        if cursor is None:
+            backwards, key = False, None
+        else:
+            backwards, key = cursor
+            queryset = queryset.filter(self._seek(key, backwards))
+            if backwards:
+                queryset = queryset.order_by(*[_invert(field) for field in self.ordering])
+
+        return self.get_rows(queryset, backwards, continued=key is not None)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Orden del catálogo: " + ", ".join(self.orderings),
+                "schema": {"type": "string", "enum": list(self.orderings)},
+            },
+        ]
+
+    def get_ordering(self, request, queryset):
+        ordering = request.query_params.get(self.ordering_query_param)
+        if ordering is None and "rank" in queryset.query.annotations:
+            return self.rank_ordering
+        return self.orderings.get(ordering, self.orderings[self.default_ordering])
+
+    def get_key(self, instance):
+        return [getattr(instance, field.lstrip("-")) for field in self.ordering]
+
+    def parse_key(self, key):
+        # Enteros (id, precio, favoritos) o flotantes (rank de búsqueda)
+        key = list(key)
+        valid = all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in key)
+        if not valid or len(key) != len(self.ordering):
+            raise ValueError(key)
+        return key
+
+    def _seek(self, key, backwards):
+        # (a, b) > (ka, kb)  <=>  a > ka OR (a = ka AND b > kb)
+        clauses = []
+        for position, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != backwards
+            lookup = f"{name}__lt" if descending else f"{name}__gt"
+            equal = {
+                previous.lstrip("-"): key[index]
+                for index, previous in enumerate(self.ordering[:position])
+            }
+            clauses.append(Q(**equal, **{lookup: key[position]}))
+        return reduce(or_, clauses)
+
+
+def _invert(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
@@ -0,0 +1,51 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, FloatField, Func, TextField, Value
+from django.db.models.functions import Cast
+
+# Configuración de texto de PostgreSQL usada por el trigger que mantiene
+# Product.search_vector (ver migración 0005).
+SEARCH_CONFIG = "spanish"
+
+
+class Unaccent(Func):
+    """
+    Versión IMMUTABLE de unaccent() creada en la migración 0005 para poder
+    usarla en índices de expresión.
+    """
+
+    function = "product_unaccent"
+    output_field = TextField()
+
+
+def search_products(queryset, term, fuzzy=False):
+    """
+    Busca productos por nombre, descripción, categoría y ubicación.
+
+    Usa el vector de búsqueda (stemming en español, sin tildes) ordenado por
+    relevancia. Con ``fuzzy`` usa en cambio similitud de trigramas sobre el
+    nombre, que tolera errores de tipeo ("camra" -> "cámara"); quien llama
+    recurre a ese modo cuando la búsqueda normal no trae resultados (ver
+    ProductViewSet.list y product_facets). En ambos modos el resultado
+    tiene la anotación ``rank``.
+    """
+    if not fuzzy:
+        query = SearchQuery(Unaccent(Value(term)), config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=_exact(SearchRank(F("search_vector"), query)))
+            .order_by("-rank", "-id")
+        )
+
+    return (
+        queryset.annotate(unaccented_name=Unaccent(F("name")))
+        .filter(unaccented_name__trigram_word_similar=Unaccent(Value(term)))
+        .annotate(rank=_exact(TrigramWordSimilarity(Unaccent(Value(term)), "unaccented_name")))
+        .order_by("-rank", "-id")
+    )
+
+
+def _exact(rank):
+    # ts_rank y word_similarity devuelven real; como double precision el
+    # valor llega sin redondeo a Python y sirve de clave en el cursor de
+    # ProductKeysetPagination.
+    return Cast(rank, FloatField())
@@ -1,7 +1,11 @@
+from django.conf import settings
+from PIL import Image, UnidentifiedImageError
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from typing import Optional
+from .availability import BULK_AVAILABILITY_MAX_IDS
 from .models import Category, Product, ProductImage, District, Message, Chat
+from .uploads import queue_product_images
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -12,10 +16,31 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class ProductImageSerializer(serializers.ModelSerializer):
     url = serializers.ImageField(use_url=True)
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductImage
-        fields = ("url",)
+        fields = ("id", "url", "status", "variants")
+        read_only_fields = ("id", "status")
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Con ?image_variant=thumb (p. ej. en grillas) url apunta a esa
+        # variante si ya existe; el original sigue disponible en variants.
+        variant = self.context.get('image_variant')
+        if variant and variant in data['variants']:
+            data['url'] = data['variants'][variant]
+        return data
+
+    @extend_schema_field(serializers.DictField(child=serializers.URLField()))
+    def get_variants(self, obj: ProductImage) -> dict:
+        request = self.context.get('request')
+        storage = obj.url.storage
+        variants = {}
+        for variant, path in obj.variants.items():
+            url = storage.url(path)
+            variants[variant] = request.build_absolute_uri(url) if request else url
+        return variants
 
     def create(self, validated_data):
         # Generar nombre y texto alternativo automáticamente
@@ -24,12 +49,28 @@ class ProductImageSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+def validate_image_upload(image_file):
+    if image_file.size > settings.PRODUCT_IMAGE_MAX_UPLOAD_SIZE:
+        limit = settings.PRODUCT_IMAGE_MAX_UPLOAD_SIZE // (1024 * 1024)
+        raise serializers.ValidationError({'product_image': f"{image_file.name}: supera el máximo de {limit} MB"})
+    try:
+        # Solo lee la cabecera; la imagen se decodifica al procesarla.
+        with Image.open(image_file) as image:
+            image_format = image.format
+    except (UnidentifiedImageError, OSError):
+        image_format = None
+    finally:
+        image_file.seek(0)
+    if image_format not in ('JPEG', 'PNG', 'WEBP', 'GIF', 'MPO'):
+        raise serializers.ValidationError({'product_image': f"{image_file.name}: no es una imagen válida"})
+
+
 class ProductSerializer(serializers.ModelSerializer):
     product_image = ProductImageSerializer(many=True, required=False)
     category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), required=True)
     name = serializers.CharField(required=True)
     description = serializers.CharField(required=True)
-    price = serializers.IntegerField(required=True)
+    price = serializers.IntegerField(required=True, min_value=0)
     state = serializers.CharField(required=True)
     currency = serializers.CharField(required=True)
     vendor_id = serializers.SerializerMethodField()
@@ -41,32 +82,56 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        exclude = ("vendor",)
+        exclude = ("vendor", "search_vector")
 
     @extend_schema_field(serializers.IntegerField(allow_null=True))
     def get_vendor_id(self, obj: Product) -> Optional[int]:
-        return obj.vendor.id if obj.vendor else None
+        return obj.vendor_id
 
     @extend_schema_field(serializers.CharField(allow_null=True))
     def get_vendor_username(self, obj: Product) -> Optional[str]:
-        return obj.vendor.username if obj.vendor else None
-
-    def get_is_favorite(self, obj):
-        request = self.context.get('request', None)
-        user = getattr(request, 'user', None)
-        if user and user.is_authenticated:
-            return obj in user.favorite_products.all()
-        return False
+        return obj.vendor.username if obj.vendor_id else None
+
+    def get_is_favorite(self, obj) -> bool:
+        return obj.id in self._get_favorite_ids()
+
+    def _get_favorite_ids(self):
+        # El contexto es compartido por todas las filas de un listado
+        # (many=True), así que los favoritos se consultan una sola vez.
+        if 'favorite_ids' not in self.context:
+            request = self.context.get('request', None)
+            user = getattr(request, 'user', None)
+            favorite_ids = set()
+            if user and user.is_authenticated:
+                favorite_ids = set(user.favorite_products.values_list('id', flat=True))
+            self.context['favorite_ids'] = favorite_ids
+        return self.context['favorite_ids']
+
+    def validate(self, attrs):
+        request = self.context.get('request')
+        if request:
+            for image_file in request.FILES.getlist('product_image'):
+                validate_image_upload(image_file)
+        return attrs
 
     def create(self, validated_data):
         request = self.context.get('request')
         product_images_files = request.FILES.getlist('product_image') if request else []
         product = Product.objects.create(**validated_data)
-        for image_file in product_images_files:
-            ProductImage.objects.create(product=product, url=image_file)
+        # Las imágenes se suben en segundo plano; la respuesta las muestra
+        # como "pending" y el cliente consulta su estado en /images/.
+        queue_product_images(product, product_images_files)
         return product
 
 
+# Serializer para la actualización en bloque de disponibilidad
+class BulkAvailabilitySerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), min_length=1, max_length=BULK_AVAILABILITY_MAX_IDS
+    )
+    is_available = serializers.BooleanField()
+
+
 # Serializer para District
 class DistrictSerializer(serializers.ModelSerializer):
     class Meta:
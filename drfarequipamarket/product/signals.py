@@ -0,0 +1,65 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from drfarequipamarket.users.models import CustomUser
+
+from .cache import bump_version
+from .favorites import recount_favorites
+from .models import Category, District, Product, ProductImage
+
+# Namespace de versión de caché de cada modelo (ver product.cache)
+CACHE_NAMESPACES = {
+    Product: "product",
+    ProductImage: "product_image",
+    Category: "category",
+    District: "district",
+}
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=District)
+def invalidate_cached_reads(sender, **kwargs):
+    bump_version(CACHE_NAMESPACES[sender])
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def touch_product(sender, instance, **kwargs):
+    # Los cambios de imágenes cuentan como modificación del producto.
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=CustomUser.favorite_products.through)
+def invalidate_favorites(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # product.favorite_products.clear(): los usuarios solo se conocen
+        # antes de borrar las filas.
+        user_ids = sender.objects.filter(product=instance).values_list("customuser_id", flat=True)
+    elif action in ("post_add", "post_remove", "post_clear"):
+        user_ids = (pk_set or []) if reverse else [instance.pk]
+    else:
+        return
+    for user_id in user_ids:
+        bump_version(f"favorites:{user_id}")
+
+
+@receiver(m2m_changed, sender=CustomUser.favorite_products.through)
+def update_favorite_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    # toggle_favorite ajusta favorite_count por su cuenta; esto mantiene el
+    # contador cuando se usa favorite_products.add/remove/clear.
+    if reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            recount_favorites([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        recount_favorites(pk_set)
+    elif action == "pre_clear":
+        # Cada fila borrada es un favorito menos de su producto
+        product_ids = [*sender.objects.filter(customuser=instance).values_list("product_id", flat=True)]
+        if product_ids:
+            Product.objects.filter(pk__in=product_ids).update(
+                favorite_count=Greatest(F("favorite_count") - 1, 0), updated_at=timezone.now()
+            )
@@ -0,0 +1,108 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+
+from .cache import bump_version
+from .images import store_image
+from .models import ProductImage
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+# Futures en curso. Los agrega el hilo del request y los quitan los
+# callbacks del pool desde sus propios hilos: todo acceso va con el lock.
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PRODUCT_IMAGE_UPLOAD_WORKERS,
+                thread_name_prefix="product-image-upload",
+            )
+        return _executor
+
+
+def queue_product_images(product, files):
+    """
+    Registra una ProductImage pendiente por archivo y deja el procesamiento
+    (variantes, ver product.images) y la subida al almacenamiento en manos
+    del pool de hilos, para que la petición que crea el producto no espere
+    a R2. Las subidas empiezan cuando la transacción
+    actual se confirma y cada imagen pasa a "ready" (o "failed") al terminar.
+    """
+    images = []
+    for upload in files:
+        # El archivo de la petición se cierra (y borra, si está en disco)
+        # al terminar la respuesta; el hilo trabaja con una copia.
+        content = ContentFile(upload.read(), name=upload.name)
+        image = ProductImage.objects.create(
+            product=product,
+            status=ProductImage.STATUS_PENDING,
+            name=f"Product Image {product.id}",
+            alternative_text=f"Image for product {product.id}",
+        )
+        transaction.on_commit(lambda image=image, content=content: _submit(image.pk, content))
+        images.append(image)
+    return images
+
+
+def _submit(image_id, content):
+    future = get_executor().submit(upload_product_image, image_id, content)
+    with _pending_lock:
+        _pending.add(future)
+    future.add_done_callback(_forget)
+    return future
+
+
+def _forget(future):
+    with _pending_lock:
+        _pending.discard(future)
+
+
+def upload_product_image(image_id, content):
+    try:
+        image = ProductImage.objects.filter(pk=image_id).first()
+        if image is None:
+            # El producto se eliminó antes de que la subida empezara.
+            return
+        store_image(image, content)
+        image.status = ProductImage.STATUS_READY
+        # post_save invalida las cachés y actualiza updated_at del producto.
+        image.save()
+    except Exception:
+        # Cualquier error (también al leer la fila o al guardarla) deja la
+        # imagen en "failed"; si no, quedaría "pending" para siempre.
+        logger.exception(f"Error al subir la imagen {image_id}")
+        mark_failed(ProductImage.objects.filter(pk=image_id))
+    finally:
+        # Cada hilo del pool abre su propia conexión; no se deja abierta.
+        connection.close()
+
+
+def mark_failed(images):
+    """Pasa a "failed" las imágenes pendientes de ``images``; devuelve cuántas."""
+    try:
+        failed = images.filter(status=ProductImage.STATUS_PENDING).update(status=ProductImage.STATUS_FAILED)
+    except Exception:
+        logger.exception("No se pudo marcar como fallidas las imágenes pendientes")
+        return 0
+    if failed:
+        # update() no emite post_save (ver signals.py)
+        bump_version("product_image")
+    return failed
+
+
+def wait_for_uploads(timeout=None):
+    """Espera las subidas en curso (tests, comandos y apagado ordenado)."""
+    with _pending_lock:
+        pending = list(_pending)
+    wait(pending, timeout=timeout)
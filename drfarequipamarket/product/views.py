@@ -2,10 +2,17 @@ from django.shortcuts import render, get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.utils.urls import replace_query_param
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+import io
 import logging
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
@@ -13,8 +20,24 @@ from drfarequipamarket.chat.models import ChatGroup
 from drfarequipamarket.chat.serializers import ChatGroupSerializer
 from drfarequipamarket.users.models import CustomUser
 
-from .models import Category, Product, District, Chat, Message
-from .serializers import CategorySerializer, ProductSerializer, DistrictSerializer, ChatSerializer, MessageSerializer
+from .models import Category, Product, ProductImage, District, Chat, Message
+from .pagination import ProductKeysetPagination
+from .cache import (
+    cache_response, get_version, image_url_window, is_not_modified, make_etag, not_modified_response,
+    set_validators,
+)
+from .availability import (
+    FORBIDDEN, NOT_FOUND, UPDATED, set_availability, toggle_availability as toggle_product_availability,
+)
+from .facets import product_facets
+from .favorites import FAVORITE_STATUS_MAX_IDS, favorite_status, toggle_favorite
+from .images import IMAGE_VARIANTS
+from .importers import IMPORT_FORMATS, detect_format, import_products
+from .filters import FILTER_PARAMS, FUZZY_SEARCH, filter_products, fuzzy_search_params
+from .serializers import (
+    BulkAvailabilitySerializer, CategorySerializer, ProductSerializer, ProductImageSerializer, DistrictSerializer,
+    ChatSerializer, MessageSerializer,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +46,14 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
 
+    @cache_response("category")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response("category")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
 class ProductViewSet(viewsets.ModelViewSet):
     """
@@ -33,64 +64,27 @@ class ProductViewSet(viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser, JSONParser)
+    pagination_class = ProductKeysetPagination
 
-    def get_queryset(self):
-        queryset = Product.objects.all()
-        
-        # Filtro por nombre del producto
-        product_name = self.request.query_params.get("search")
-        if product_name is not None:
-            queryset = queryset.filter(name__icontains=product_name)
-        
-        # Filtro por categoría
-        category = self.request.query_params.get("category")
-        if category is not None:
-            queryset = queryset.filter(category__id=category)
-        
-        # Filtro por precio mínimo
-        min_price = self.request.query_params.get("min_price")
-        if min_price is not None:
-            try:
-                min_price_float = float(min_price)
-                queryset = queryset.filter(price__gte=min_price_float)
-            except ValueError:
-                pass
-        
-        # Filtro por precio máximo
-        max_price = self.request.query_params.get("max_price")
-        if max_price is not None:
-            try:
-                max_price_float = float(max_price)
-                queryset = queryset.filter(price__lte=max_price_float)
-            except ValueError:
-                pass
-        
-        # Filtro por departamento
-        departamento = self.request.query_params.get("departamento")
-        if departamento is not None:
-            queryset = queryset.filter(departamento=departamento)
-        
-        # Filtro por provincia
-        provincia = self.request.query_params.get("provincia")
-        if provincia is not None:
-            queryset = queryset.filter(provincia=provincia)
-        
-        # Filtro por distrito
-        distrito = self.request.query_params.get("distrito")
-        if distrito is not None:
-            queryset = queryset.filter(distrito=distrito)
-        
-        # Filtro por productos del usuario
-        mine = self.request.query_params.get("mine")
-        if mine == "true":
-            queryset = queryset.filter(vendor=self.request.user)
-        
-        return queryset
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['image_variant'] = self.request.query_params.get('image_variant')
+        return context
+
+    def get_queryset(self, params=None):
+        if params is None:
+            params = self.request.query_params
+        return filter_products(Product.objects.with_listing_relations(), params, self.request.user)
 
     @extend_schema(
         parameters=[
             OpenApiParameter(
-                "search", OpenApiTypes.STR, OpenApiParameter.QUERY, description="Buscar productos por nombre"
+                "search", OpenApiTypes.STR, OpenApiParameter.QUERY, description="Buscar productos por nombre, descripción, categoría o ubicación"
+            ),
+            OpenApiParameter(
+                "search_mode", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description="fuzzy: buscar por similitud (tolera errores de tipeo). Se usa solo si la búsqueda normal no trae resultados",
+                enum=["fuzzy"],
             ),
             OpenApiParameter(
                 "category", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Filtrar por ID de categoría"
@@ -110,16 +104,69 @@ class ProductViewSet(viewsets.ModelViewSet):
             OpenApiParameter(
                 "distrito", OpenApiTypes.STR, OpenApiParameter.QUERY, description="Filtrar por distrito"
             ),
+            OpenApiParameter(
+                "available", OpenApiTypes.STR, OpenApiParameter.QUERY, description="Filtrar por disponibilidad (true/false)"
+            ),
             OpenApiParameter(
                 "mine", OpenApiTypes.STR, OpenApiParameter.QUERY, description="Filtrar productos del usuario actual (true/false)"
-            )
+            ),
+            OpenApiParameter(
+                "image_variant", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description="Variante de imagen para product_image.url (thumb, medium, large)",
+                enum=[*IMAGE_VARIANTS],
+            ),
         ],
         responses=ProductSerializer,
     )
+    @cache_response("product", "product_image", "category", per_user=True, signed_urls=True)
     def list(self, request):
-        queryset = self.get_queryset()
-        serializer = ProductSerializer(queryset, many=True)
-        return Response(serializer.data)
+        # Con ?cursor= o ?page_size= se pagina por keyset; sin ellos se
+        # devuelve la lista completa como antes, con el mismo orden.
+        page = self.paginate_queryset(self.get_queryset())
+        rows = page if page is not None else self._ordered_rows(self.get_queryset())
+
+        # Si la búsqueda no encontró nada en la primera página se reintenta
+        # por trigramas; los enlaces next/previous conservan search_mode.
+        fuzzy_params = fuzzy_search_params(request.query_params)
+        if not rows and fuzzy_params is not None and "cursor" not in request.query_params:
+            page = self.paginate_queryset(self.get_queryset(fuzzy_params))
+            if page is not None:
+                self.paginator.base_url = replace_query_param(self.paginator.base_url, "search_mode", FUZZY_SEARCH)
+            rows = page if page is not None else self._ordered_rows(self.get_queryset(fuzzy_params))
+
+        serializer = self.get_serializer(rows, many=True)
+        if page is not None:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response(serializer.data)
+        # Las filas ya están cargadas: Last-Modified no cuesta otra consulta.
+        last_modified = max((product.updated_at for product in rows), default=None)
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+    def _ordered_rows(self, queryset):
+        # ?ordering= (o la relevancia de la búsqueda) también vale sin paginar
+        return list(queryset.order_by(*self.paginator.get_ordering(self.request, queryset)))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name, OpenApiTypes.STR, OpenApiParameter.QUERY)
+            for name in FILTER_PARAMS
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path=r"facets",
+    )
+    def facets(self, request):
+        """
+        Endpoint que retorna, para los filtros actuales, la cantidad de productos
+        por categoría, departamento/provincia/distrito, estado, moneda y rango de precio
+        """
+        return Response(product_facets(request.query_params, request.user))
 
     @action(
         methods=["get"],
@@ -130,8 +177,8 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Endpoint que retorna productos por categoría
         """
-        serializer = ProductSerializer(
-            self.queryset.filter(category__id=category), many=True
+        serializer = self.get_serializer(
+            Product.objects.with_listing_relations().filter(category__id=category), many=True
         )
         return Response(serializer.data)
     
@@ -193,6 +240,71 @@ class ProductViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(vendor=self.request.user)
 
+    @extend_schema(
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {
+                    "file": {"type": "string", "format": "binary"},
+                    "file_format": {"type": "string", "enum": [*IMPORT_FORMATS]},
+                },
+                "required": ["file"],
+            }
+        },
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path=r"import",
+        url_name="import_products",
+        parser_classes=(MultiPartParser,),
+    )
+    def import_products(self, request):
+        """
+        Endpoint que crea en bloque los productos del usuario a partir de un
+        archivo CSV o JSONL (una fila por producto, category por ID).
+        Las filas inválidas se reportan con su número de línea.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "El campo 'file' es requerido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"detail": f"Formato no soportado. Use: {', '.join(IMPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            # Un archivo que no es UTF-8 se reporta como error de fila, con
+            # los productos de los lotes anteriores ya creados.
+            report = import_products(stream, request.user, file_format=file_format)
+        finally:
+            stream.detach()
+
+        response_status = status.HTTP_201_CREATED if report.created else status.HTTP_400_BAD_REQUEST
+        return Response(report.as_dict(), status=response_status)
+
+    @extend_schema(responses=ProductImageSerializer(many=True))
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path=r"(?P<pk>\d+)/images",
+        url_name="product_images",
+    )
+    def list_product_images(self, request, pk=None):
+        """
+        Endpoint que retorna todas las imágenes de un producto con su estado
+        de subida (pending, ready o failed), para consultar tras crearlo
+        """
+        product = get_object_or_404(Product.objects.only("id"), pk=pk)
+        images = ProductImage.objects.filter(product=product).order_by("id")
+        serializer = ProductImageSerializer(images, many=True, context={'request': request})
+        return Response(serializer.data)
+
     @action(
         methods=["get"],
         detail=False,
@@ -202,8 +314,8 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Endpoint que retorna productos por vendedor
         """
-        serializer = ProductSerializer(
-            self.queryset.filter(vendor=self.request.user), many=True
+        serializer = self.get_serializer(
+            Product.objects.with_listing_relations().filter(vendor=self.request.user), many=True
         )
         return Response(serializer.data)
 
@@ -215,16 +327,44 @@ class ProductViewSet(viewsets.ModelViewSet):
     )
     def mark_as_favorite(self, request, pk=None):
         """
-        Endpoint que marca un producto como favorito
+        Endpoint que marca o desmarca un producto como favorito
         """
-        product = self.get_object()
-        user = request.user
-        if product in user.favorite_products.all():
-            user.favorite_products.remove(product)
-            return Response({"detail": "Producto eliminado de favoritos"})
-        else:
-            user.favorite_products.add(product)
-            return Response({"detail": "Producto agregado a favoritos"})
+        result = toggle_favorite(request.user, int(pk))
+        if result is None:
+            raise Http404
+        is_favorite, favorite_count = result
+        detail = "Producto agregado a favoritos" if is_favorite else "Producto eliminado de favoritos"
+        return Response({"detail": detail, "is_favorite": is_favorite, "favorite_count": favorite_count})
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "ids", OpenApiTypes.STR, OpenApiParameter.QUERY, required=True,
+                description=f"IDs de productos separados por coma (máximo {FAVORITE_STATUS_MAX_IDS})",
+            ),
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path=r"favorite/status",
+        url_name="favorite_status",
+    )
+    def favorite_status(self, request):
+        """
+        Endpoint que indica, para varios productos a la vez, si son favoritos
+        del usuario y cuántos usuarios los tienen en favoritos
+        """
+        try:
+            ids = [int(value) for value in request.query_params.get("ids", "").split(",") if value.strip()]
+        except ValueError:
+            return Response({"detail": "'ids' debe ser una lista de enteros separados por coma"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not ids or len(ids) > FAVORITE_STATUS_MAX_IDS:
+            return Response({"detail": f"Envíe entre 1 y {FAVORITE_STATUS_MAX_IDS} IDs en 'ids'"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(favorite_status(request.user, ids))
 
     @action(
         methods=["get"],
@@ -236,11 +376,38 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Endpoint que retorna los productos favoritos del usuario
         """
-        serializer = ProductSerializer(
-            self.request.user.favorite_products.all(), many=True, context={'request': request}
+        serializer = self.get_serializer(
+            self.request.user.favorite_products.with_listing_relations(), many=True
         )
         return Response(serializer.data)
 
+    @extend_schema(request=BulkAvailabilitySerializer, responses=OpenApiTypes.OBJECT)
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path=r"availability",
+        url_name="bulk_availability",
+    )
+    def bulk_availability(self, request):
+        """
+        Endpoint que marca varios productos del usuario como disponibles o
+        vendidos en una sola operación. Devuelve el resultado de cada ID:
+        updated, unchanged (ya tenía ese estado), forbidden (es de otro
+        vendedor) o not_found
+        """
+        serializer = BulkAvailabilitySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        is_available = serializer.validated_data["is_available"]
+        outcomes = set_availability(request.user, serializer.validated_data["ids"], is_available)
+
+        updated = [product_id for product_id, outcome in outcomes.items() if outcome == UPDATED]
+        logger.info(f"Productos {updated} marcados con is_available={is_available} por usuario {request.user.id}")
+        return Response({
+            "is_available": is_available,
+            "updated": len(updated),
+            "results": [{"id": product_id, "outcome": outcome} for product_id, outcome in outcomes.items()],
+        })
+
     @action(
         methods=["post"],
         detail=False,
@@ -251,40 +418,18 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Endpoint que marca un producto como vendido
         """
-        try:
-            product = self.get_object()
-            
-            # Verificar que el usuario es el vendedor del producto
-            if product.vendor != request.user:
-                return Response(
-                    {"detail": "No tienes permisos para cambiar el estado de este producto"}, 
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            # Verificar que el producto no esté ya vendido
-            if not product.is_available:
-                return Response(
-                    {"detail": "Este producto ya está marcado como vendido"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            product.is_available = False
-            product.save()
-            
-            logger.info(f"Producto {product.id} marcado como vendido por usuario {request.user.id}")
-            
-            return Response({
-                "detail": "Producto marcado como vendido exitosamente",
-                "product_id": product.id,
-                "is_available": product.is_available
-            })
-            
-        except Exception as e:
-            logger.error(f"Error al marcar producto como vendido: {str(e)}")
-            return Response(
-                {"detail": "Error interno del servidor"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        product_id = int(pk)
+        outcome = set_availability(request.user, [product_id], False)[product_id]
+        if outcome != UPDATED:
+            return self._availability_error(outcome, "Este producto ya está marcado como vendido")
+
+        logger.info(f"Producto {product_id} marcado como vendido por usuario {request.user.id}")
+
+        return Response({
+            "detail": "Producto marcado como vendido exitosamente",
+            "product_id": product_id,
+            "is_available": False
+        })
 
     @action(
         methods=["post"],
@@ -296,40 +441,18 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Endpoint que marca un producto como disponible
         """
-        try:
-            product = self.get_object()
-            
-            # Verificar que el usuario es el vendedor del producto
-            if product.vendor != request.user:
-                return Response(
-                    {"detail": "No tienes permisos para cambiar el estado de este producto"}, 
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            # Verificar que el producto no esté ya disponible
-            if product.is_available:
-                return Response(
-                    {"detail": "Este producto ya está marcado como disponible"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            product.is_available = True
-            product.save()
-            
-            logger.info(f"Producto {product.id} marcado como disponible por usuario {request.user.id}")
-            
-            return Response({
-                "detail": "Producto marcado como disponible exitosamente",
-                "product_id": product.id,
-                "is_available": product.is_available
-            })
-            
-        except Exception as e:
-            logger.error(f"Error al marcar producto como disponible: {str(e)}")
-            return Response(
-                {"detail": "Error interno del servidor"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        product_id = int(pk)
+        outcome = set_availability(request.user, [product_id], True)[product_id]
+        if outcome != UPDATED:
+            return self._availability_error(outcome, "Este producto ya está marcado como disponible")
+
+        logger.info(f"Producto {product_id} marcado como disponible por usuario {request.user.id}")
+
+        return Response({
+            "detail": "Producto marcado como disponible exitosamente",
+            "product_id": product_id,
+            "is_available": True
+        })
 
     @action(
         methods=["post"],
@@ -341,38 +464,11 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Endpoint que alterna el estado de disponibilidad de un producto
         """
-        try:
-            product = self.get_object()
-            
-            # Verificar que el usuario es el vendedor del producto
-            if product.vendor != request.user:
-                return Response(
-                    {"detail": "No tienes permisos para cambiar el estado de este producto"}, 
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            # Alternar el estado
-            old_status = "disponible" if product.is_available else "vendido"
-            product.is_available = not product.is_available
-            new_status = "disponible" if product.is_available else "vendido"
-            product.save()
-            
-            logger.info(f"Producto {product.id} cambiado de {old_status} a {new_status} por usuario {request.user.id}")
-            
-            return Response({
-                "detail": f"Producto cambiado de {old_status} a {new_status} exitosamente",
-                "product_id": product.id,
-                "is_available": product.is_available,
-                "old_status": old_status,
-                "new_status": new_status
-            })
-            
-        except Exception as e:
-            logger.error(f"Error al alternar disponibilidad del producto: {str(e)}")
-            return Response(
-                {"detail": "Error interno del servidor"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        product_id = int(pk)
+        outcome, is_available = toggle_product_availability(request.user, product_id)
+        if outcome != UPDATED:
+            return self._availability_error(outcome)
+        return self._availability_changed(request, product_id, is_available)
 
     @action(
         methods=["patch"],
@@ -384,66 +480,89 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Endpoint que actualiza el estado de disponibilidad de un producto
         """
-        try:
-            product = self.get_object()
-            
-            # Verificar que el usuario es el vendedor del producto
-            if product.vendor != request.user:
-                return Response(
-                    {"detail": "No tienes permisos para cambiar el estado de este producto"}, 
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            # Obtener el nuevo estado del request
-            new_availability = request.data.get('is_available')
-            
-            if new_availability is None:
-                return Response(
-                    {"detail": "El campo 'is_available' es requerido"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            if not isinstance(new_availability, bool):
-                return Response(
-                    {"detail": "El campo 'is_available' debe ser un valor booleano"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Verificar si el estado realmente cambió
-            if product.is_available == new_availability:
-                status_text = "disponible" if new_availability else "vendido"
-                return Response(
-                    {"detail": f"El producto ya está marcado como {status_text}"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Actualizar el estado
-            old_status = "disponible" if product.is_available else "vendido"
-            product.is_available = new_availability
-            new_status = "disponible" if new_availability else "vendido"
-            product.save()
-            
-            logger.info(f"Producto {product.id} cambiado de {old_status} a {new_status} por usuario {request.user.id}")
-            
-            return Response({
-                "detail": f"Producto cambiado de {old_status} a {new_status} exitosamente",
-                "product_id": product.id,
-                "is_available": product.is_available,
-                "old_status": old_status,
-                "new_status": new_status
-            })
-            
-        except Exception as e:
-            logger.error(f"Error al actualizar disponibilidad del producto: {str(e)}")
+        # Obtener el nuevo estado del request
+        new_availability = request.data.get('is_available')
+
+        if new_availability is None:
+            return Response(
+                {"detail": "El campo 'is_available' es requerido"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not isinstance(new_availability, bool):
+            return Response(
+                {"detail": "El campo 'is_available' debe ser un valor booleano"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        product_id = int(pk)
+        outcome = set_availability(request.user, [product_id], new_availability)[product_id]
+        if outcome != UPDATED:
+            status_text = "disponible" if new_availability else "vendido"
+            return self._availability_error(outcome, f"El producto ya está marcado como {status_text}")
+        return self._availability_changed(request, product_id, new_availability)
+
+    def _availability_error(self, outcome, unchanged_detail=None):
+        if outcome == NOT_FOUND:
+            raise Http404
+        if outcome == FORBIDDEN:
             return Response(
-                {"detail": "Error interno del servidor"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"detail": "No tienes permisos para cambiar el estado de este producto"},
+                status=status.HTTP_403_FORBIDDEN
             )
+        return Response({"detail": unchanged_detail}, status=status.HTTP_400_BAD_REQUEST)
+
+    def _availability_changed(self, request, product_id, is_available):
+        old_status = "vendido" if is_available else "disponible"
+        new_status = "disponible" if is_available else "vendido"
+
+        logger.info(f"Producto {product_id} cambiado de {old_status} a {new_status} por usuario {request.user.id}")
+
+        return Response({
+            "detail": f"Producto cambiado de {old_status} a {new_status} exitosamente",
+            "product_id": product_id,
+            "is_available": is_available,
+            "old_status": old_status,
+            "new_status": new_status
+        })
 
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = self.get_serializer(instance, context={'request': request})
-        return Response(serializer.data)
+        # Los validadores salen de una consulta liviana (updated_at y
+        # favorite_count) antes de cargar y serializar el producto con sus
+        # imágenes.
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        validators = (
+            self.get_queryset()
+            .filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            .values_list("updated_at", "favorite_count")
+            .first()
+        )
+        if validators is None:
+            raise Http404
+        updated_at, favorite_count = validators
+        user = request.user
+        # Como en cache_response: las URLs de las imágenes dependen del host,
+        # de la variante pedida y de la ventana de firma.
+        url_window, window_start = image_url_window()
+        etag = make_etag("product", kwargs[lookup_url_kwarg], updated_at.isoformat(), favorite_count,
+                         user.pk, get_version(f"favorites:{user.pk}"),
+                         request.get_host(), request.query_params.get('image_variant'), url_window)
+        last_modified = max(int(updated_at.timestamp()), window_start or 0)
+
+        if is_not_modified(request, etag, last_modified):
+            response = not_modified_response(etag, last_modified)
+        else:
+            key = f"product:detail:{etag}"
+            data = cache.get(key)
+            if data is None:
+                instance = self.get_object()
+                serializer = self.get_serializer(instance)
+                data = serializer.data
+                cache.set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+            response = Response(data)
+            set_validators(response, etag, last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 # ViewSet para District
 class DistrictViewSet(viewsets.ViewSet):
@@ -454,6 +573,7 @@ class DistrictViewSet(viewsets.ViewSet):
     permission_classes = [AllowAny]
 
     @extend_schema(responses=DistrictSerializer)
+    @cache_response("district")
     def list(self, request):
         serializer = DistrictSerializer(self.queryset, many=True)
         return Response(serializer.data)
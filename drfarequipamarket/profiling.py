@@ -0,0 +1,193 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Perfil del request o evento del websocket en curso. sync_to_async copia
+# el contexto al hilo que ejecuta la consulta, así que las consultas hechas
+# desde db_call (chat) o desde la vista se anotan en el mismo perfil.
+_current_profile = ContextVar("request_profile", default=None)
+
+# Operaciones del storage que van por red (S3/R2). url() no está: con
+# dominio propio o firma local no sale del proceso.
+STORAGE_METHODS = ("save", "open", "delete", "exists", "size", "listdir", "get_modified_time")
+
+
+class RequestProfile:
+    """Tiempos de un request HTTP o de un mensaje del websocket."""
+
+    __slots__ = (
+        "name", "started", "total_ms", "queries", "query_ms",
+        "storage_calls", "storage_ms", "render_ms", "in_storage",
+    )
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.total_ms = None
+        self.queries = 0
+        self.query_ms = 0.0
+        self.storage_calls = 0
+        self.storage_ms = 0.0
+        self.render_ms = 0.0
+        self.in_storage = False
+
+    @property
+    def finished(self):
+        return self.total_ms is not None
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        return ", ".join([
+            f'db;dur={self.query_ms:.1f};desc="{self.queries} consultas"',
+            f'storage;dur={self.storage_ms:.1f};desc="{self.storage_calls} llamadas"',
+            f"render;dur={self.render_ms:.1f}",
+            f"total;dur={self.total_ms:.1f}",
+        ])
+
+    def summary(self):
+        return (
+            f"{self.total_ms:.1f} ms; {self.queries} consultas ({self.query_ms:.1f} ms), "
+            f"{self.storage_calls} llamadas al storage ({self.storage_ms:.1f} ms), "
+            f"render {self.render_ms:.1f} ms"
+        )
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+@contextmanager
+def profiled(name):
+    """
+    Mide el bloque como un request llamado ``name``; si tarda más de
+    PERF_SLOW_REQUEST_MS queda en el log. Con PERF_INSTRUMENTATION
+    desactivado no hace nada y entrega None.
+    """
+    if not settings.PERF_INSTRUMENTATION:
+        yield None
+        return
+    profile = RequestProfile(name)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+        profile.finish()
+        if profile.total_ms >= settings.PERF_SLOW_REQUEST_MS:
+            logger.warning("Request lento %s: %s", profile.name, profile.summary())
+
+
+def time_query(execute, sql, params, many, context):
+    """execute_wrapper de Django que anota cada consulta en el perfil actual."""
+    profile = _current_profile.get()
+    if profile is None or profile.finished:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        profile.queries += 1
+        profile.query_ms += duration
+        if duration >= settings.PERF_SLOW_QUERY_MS:
+            logger.warning("Consulta lenta (%.1f ms) en %s: %s", duration, profile.name, sql)
+
+
+def install_query_timer(sender=None, connection=None, **kwargs):
+    # Con el pool de psycopg connection_created se emite en cada préstamo
+    # de la conexión: el wrapper se agrega una sola vez.
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+connection_created.connect(install_query_timer)
+
+
+def instrument_storage(storage):
+    """
+    Envuelve (una sola vez) las operaciones de red de ``storage`` para
+    que cuenten en el perfil actual. Las llamadas anidadas (save consulta
+    exists) se miden solo en la externa.
+    """
+    if getattr(storage, "_profiled", False):
+        return storage
+    for method_name in STORAGE_METHODS:
+        method = getattr(storage, method_name, None)
+        if method is not None:
+            setattr(storage, method_name, _timed_storage_call(method))
+    storage._profiled = True
+    return storage
+
+
+def _timed_storage_call(method):
+    @wraps(method)
+    def call(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None or profile.finished or profile.in_storage:
+            return method(*args, **kwargs)
+        profile.in_storage = True
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            profile.in_storage = False
+            profile.storage_calls += 1
+            profile.storage_ms += (time.perf_counter() - started) * 1000
+
+    return call
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer que anota el tiempo de serialización en el perfil."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        profile = _current_profile.get()
+        if profile is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            profile.render_ms += (time.perf_counter() - started) * 1000
+
+
+class PerformanceMiddleware:
+    """
+    Perfil por request: consultas SQL, llamadas al storage, render y
+    latencia total. Los agrega en la cabecera Server-Timing (si
+    PERF_SERVER_TIMING) y deja en el log los requests y consultas que
+    superan PERF_SLOW_REQUEST_MS y PERF_SLOW_QUERY_MS, con el nombre de la
+    vista. Va primero en MIDDLEWARE para que el total lo cubra todo.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Conexiones abiertas antes de importar este módulo
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(connection=connection)
+
+    def __call__(self, request):
+        with profiled(f"{request.method} {request.path}") as profile:
+            response = self.get_response(request)
+        if settings.PERF_SERVER_TIMING:
+            response["Server-Timing"] = profile.server_timing()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.name = f"{request.method} {request.path} ({request.resolver_match.view_name})"
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
     
     # Third party apps
     # "cloudinary_storage",  # Eliminando cloudinary_storage
@@ -64,9 +65,12 @@ INSTALLED_APPS = [
     "drfarequipamarket.users.apps.UsersConfig",
     "drfarequipamarket.product.apps.ProductConfig",
     "drfarequipamarket.chat.apps.ChatConfig",
+    "drfarequipamarket.core.apps.CoreConfig",
 ]
 
 MIDDLEWARE = [
+    "drfarequipamarket.profiling.PerformanceMiddleware",
+    "drfarequipamarket.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -100,12 +104,161 @@ TEMPLATES = [
 # WSGI_APPLICATION = "drfarequipamarket.wsgi.application"
 ASGI_APPLICATION = "drfarequipamarket.asgi.application"
 
-CHANNEL_LAYERS = {
-    'default': {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
+# Conexiones a PostgreSQL (las usan DATABASES de local.py y production.py):
+#   DB_POOL_MODE=off: una conexión nueva por request o evento del chat.
+#   persistent: cada hilo reutiliza su conexión hasta DB_CONN_MAX_AGE segundos.
+#     Sirve a los hilos de larga vida (consumers del chat); bajo ASGI cada
+#     request HTTP corre en un hilo nuevo y abre su propia conexión igual.
+#   pool: pool de psycopg 3 compartido por todos los hilos del proceso
+#     (requests de Daphne y consumers del chat) con entre DB_POOL_MIN_SIZE y
+#     DB_POOL_MAX_SIZE conexiones; un hilo espera hasta DB_POOL_TIMEOUT
+#     segundos por una libre. Es el modo recomendado con ASGI.
+# En persistent y pool cada conexión se verifica antes de reutilizarla.
+DB_POOL_MODE = config('DB_POOL_MODE', default='off')
+
+if DB_POOL_MODE == 'pool':
+    DATABASE_CONNECTION = {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True}
+    DATABASE_POOL_OPTIONS = {
+        'pool': {
+            'name': 'pmarket',
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            # Segundos que una conexión ociosa (por encima de min_size) sigue abierta
+            'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        }
+    }
+elif DB_POOL_MODE == 'persistent':
+    DATABASE_CONNECTION = {
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+    }
+    DATABASE_POOL_OPTIONS = {}
+else:
+    DATABASE_CONNECTION = {'CONN_MAX_AGE': 0}
+    DATABASE_POOL_OPTIONS = {}
+
+# Caché: Redis (o un servidor compatible) si REDIS_URL está definido;
+# memoria local del proceso en otro caso (desarrollo y tests).
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'pmarket',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'pmarket',
+        }
     }
+
+# Tiempo máximo (segundos) de las respuestas cacheadas con product.cache.cache_response;
+# las escrituras las invalidan antes mediante contadores de versión.
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=600, cast=int)
+
+# Las imágenes de productos usan su propio alias de almacenamiento (Cloudflare R2
+# por defecto); PRODUCT_IMAGE_STORAGE permite cambiarlo, p. ej. a
+# django.core.files.storage.FileSystemStorage en desarrollo.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    'product_images': {
+        'BACKEND': config('PRODUCT_IMAGE_STORAGE', default='storages.backends.s3boto3.S3Boto3Storage'),
+    },
 }
 
+# Tamaño máximo (bytes) de cada imagen subida al crear un producto
+PRODUCT_IMAGE_MAX_UPLOAD_SIZE = config('PRODUCT_IMAGE_MAX_UPLOAD_SIZE', default=10 * 1024 * 1024, cast=int)
+
+# Hilos que suben en segundo plano las imágenes recibidas al crear un producto
+PRODUCT_IMAGE_UPLOAD_WORKERS = config('PRODUCT_IMAGE_UPLOAD_WORKERS', default=4, cast=int)
+
+# Channel layer del chat. En memoria solo funciona con un único proceso de
+# Daphne; con varios procesos (o instancias) hace falta Redis para que los
+# eventos lleguen a sockets conectados en otro proceso.
+#   CHANNEL_LAYER_BACKEND: memory | redis | redis_pubsub
+#   CHANNEL_REDIS_HOSTS: URLs separadas por coma; con varias, los canales y
+#       grupos se reparten (sharding) entre ellas. Por defecto REDIS_URL.
+CHANNEL_REDIS_HOSTS = [
+    host.strip()
+    for host in config('CHANNEL_REDIS_HOSTS', default=REDIS_URL).split(',')
+    if host.strip()
+]
+CHANNEL_LAYER_BACKEND = config('CHANNEL_LAYER_BACKEND', default='redis' if CHANNEL_REDIS_HOSTS else 'memory')
+
+if CHANNEL_LAYER_BACKEND == 'memory':
+    CHANNEL_LAYERS = {
+        'default': {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        }
+    }
+else:
+    _channel_hosts = [
+        {
+            'address': host,
+            # Conexiones máximas del pool por host y event loop
+            'max_connections': config('CHANNEL_REDIS_MAX_CONNECTIONS', default=50, cast=int),
+        }
+        for host in CHANNEL_REDIS_HOSTS
+    ]
+    if CHANNEL_LAYER_BACKEND == 'redis_pubsub':
+        # Pub/sub: sin colas por canal (los mensajes a sockets desconectados
+        # se pierden), menor latencia y menos trabajo en Redis.
+        CHANNEL_LAYERS = {
+            'default': {
+                'BACKEND': 'channels_redis.pubsub.RedisPubSubChannelLayer',
+                'CONFIG': {
+                    'hosts': _channel_hosts,
+                    'prefix': config('CHANNEL_LAYER_PREFIX', default='pmarket'),
+                },
+            }
+        }
+    else:
+        CHANNEL_LAYERS = {
+            'default': {
+                'BACKEND': 'channels_redis.core.RedisChannelLayer',
+                'CONFIG': {
+                    'hosts': _channel_hosts,
+                    'prefix': config('CHANNEL_LAYER_PREFIX', default='pmarket'),
+                    # Mensajes en cola por canal antes de descartar (ChannelFull)
+                    'capacity': config('CHANNEL_LAYER_CAPACITY', default=100, cast=int),
+                    # Segundos que un mensaje espera en cola a ser leído
+                    'expiry': config('CHANNEL_LAYER_EXPIRY', default=60, cast=int),
+                    # Segundos tras los que un canal sale de un grupo si no
+                    # se hizo group_discard (p. ej. el proceso murió)
+                    'group_expiry': config('CHANNEL_LAYER_GROUP_EXPIRY', default=86400, cast=int),
+                },
+            }
+        }
+
+
+# Segundos durante los que el chat acumula los eventos "read" de un socket
+# antes de escribirlos juntos; 0 los procesa al recibirlos.
+CHAT_READ_DEBOUNCE_SECONDS = config('CHAT_READ_DEBOUNCE_SECONDS', default=0, cast=float)
+
+# Indicador "escribiendo": se apaga solo tras CHAT_TYPING_TIMEOUT_SECONDS sin
+# eventos del cliente, y cada conexión lo difunde como mucho una vez cada
+# CHAT_TYPING_MIN_INTERVAL_SECONDS.
+CHAT_TYPING_TIMEOUT_SECONDS = config('CHAT_TYPING_TIMEOUT_SECONDS', default=5, cast=float)
+CHAT_TYPING_MIN_INTERVAL_SECONDS = config('CHAT_TYPING_MIN_INTERVAL_SECONDS', default=1, cast=float)
+
+# Máximo de mensajes que el chat reenvía al reconectar con ?last_seq=N; si
+# se perdieron más, el cliente recibe "resync" y recarga el historial.
+CHAT_REPLAY_MAX_MESSAGES = config('CHAT_REPLAY_MAX_MESSAGES', default=200, cast=int)
+
+# Segundos que se cachea quién participa en cada chat al conectar el websocket
+CHAT_MEMBERSHIP_CACHE_SECONDS = config('CHAT_MEMBERSHIP_CACHE_SECONDS', default=60, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -151,11 +304,15 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "drfarequipamarket.users.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "DEFAULT_RENDERER_CLASSES": [
+        "drfarequipamarket.profiling.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 12,
     'DEFAULT_PARSER_CLASSES': [
@@ -167,6 +324,29 @@ REST_FRAMEWORK = {
 
 SPECTACULAR_SETTINGS = {"TITLE": "AQP Market API"}
 
+# Caché en memoria de tokens de autenticación (API y websockets), ver
+# users.authentication. Un token borrado en otro proceso sigue valiendo ahí
+# hasta TOKEN_CACHE_TIMEOUT segundos; 0 desactiva la caché.
+TOKEN_CACHE_TIMEOUT = config('TOKEN_CACHE_TIMEOUT', default=30, cast=int)
+TOKEN_CACHE_MAX_ENTRIES = config('TOKEN_CACHE_MAX_ENTRIES', default=10000, cast=int)
+
+# Perfil por request HTTP y por mensaje del chat (ver profiling.py): número
+# y tiempo de consultas, llamadas al storage, render y latencia total, en la
+# cabecera Server-Timing. Se registran en el log los requests y consultas
+# que tarden al menos PERF_SLOW_REQUEST_MS / PERF_SLOW_QUERY_MS.
+PERF_INSTRUMENTATION = config('PERF_INSTRUMENTATION', default=True, cast=bool)
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=True, cast=bool)
+PERF_SLOW_REQUEST_MS = config('PERF_SLOW_REQUEST_MS', default=500, cast=float)
+PERF_SLOW_QUERY_MS = config('PERF_SLOW_QUERY_MS', default=100, cast=float)
+
+# Métricas de Prometheus en /api/monitoring/metrics/ (ver metrics.py), para
+# administradores o con "Authorization: Bearer <METRICS_TOKEN>". Con varios
+# procesos, definir PROMETHEUS_MULTIPROC_DIR en el entorno. Con
+# METRICS_PER_CHAT los mensajes se cuentan por chat: una serie por chat, sin
+# límite, así que solo conviene activarlo para depurar.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_PER_CHAT = config('METRICS_PER_CHAT', default=False, cast=bool)
+
 AUTH_USER_MODEL = "users.CustomUser"
 # Configuración de dj-rest-auth
 REST_AUTH = {
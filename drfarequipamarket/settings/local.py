@@ -19,9 +19,10 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432', cast=int),
-        'CONN_MAX_AGE': 0,
+        **DATABASE_CONNECTION,
         'OPTIONS': {
             'connect_timeout': 10,
+            **DATABASE_POOL_OPTIONS,
         }
     }
 }
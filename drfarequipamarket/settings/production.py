@@ -31,6 +31,7 @@ DJANGO_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -64,9 +65,10 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432', cast=int),
-        'CONN_MAX_AGE': 0,
+        **DATABASE_CONNECTION,
         'OPTIONS': {
             'connect_timeout': 10,
+            **DATABASE_POOL_OPTIONS,
         }
     }
 }
@@ -0,0 +1,53 @@
+"""
+Proceso de chat independiente para test_chat_channel_layer.py.
+
+Conecta un ChatroomConsumer como el usuario indicado usando el channel layer
+configurado por entorno, lee acciones JSON por stdin (una por línea), las
+envía por el websocket e imprime por stdout cada evento recibido.
+"""
+import asyncio
+import json
+import sys
+
+import django
+
+django.setup()
+
+from channels.db import database_sync_to_async  # noqa: E402
+from channels.routing import URLRouter  # noqa: E402
+from channels.testing import WebsocketCommunicator  # noqa: E402
+
+from drfarequipamarket.chat.routing import websocket_urlpatterns  # noqa: E402
+from drfarequipamarket.users.models import CustomUser  # noqa: E402
+
+
+def emit(payload):
+    sys.stdout.write(json.dumps(payload) + "\n")
+    sys.stdout.flush()
+
+
+async def main(chatroom_name, user_id):
+    user = await database_sync_to_async(CustomUser.objects.get)(pk=user_id)
+    communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/chatroom/{chatroom_name}")
+    communicator.scope["user"] = user
+    connected, _ = await communicator.connect()
+    emit({"ready": connected})
+
+    loop = asyncio.get_running_loop()
+
+    async def forward_input():
+        while line := await loop.run_in_executor(None, sys.stdin.readline):
+            await communicator.send_to(text_data=line.strip())
+        await communicator.disconnect()
+
+    async def forward_events():
+        while True:
+            emit(json.loads(await communicator.receive_from(timeout=60)))
+
+    reader = asyncio.ensure_future(forward_events())
+    await forward_input()
+    reader.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1], int(sys.argv[2])))
@@ -0,0 +1,94 @@
+import io
+
+import pytest
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from PIL import Image
+from rest_framework.test import APIClient
+
+from drfarequipamarket.chat.models import ChatGroup
+from drfarequipamarket.product.models import Category, Product, ProductImage
+from drfarequipamarket.users.authentication import token_cache
+from drfarequipamarket.users.models import CustomUser
+
+
+@pytest.fixture(autouse=True)
+def local_image_storage(monkeypatch, tmp_path):
+    # Las imágenes se guardan en R2 (S3Boto3Storage); en los tests se usa disco local.
+    storage = FileSystemStorage(location=tmp_path, base_url="/media/")
+    monkeypatch.setattr(ProductImage._meta.get_field("url"), "storage", storage)
+    return storage
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    token_cache.clear()
+    yield
+    cache.clear()
+    token_cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return CustomUser.objects.create_user(
+        email="comprador@example.com", password="secreto123", username="comprador"
+    )
+
+
+@pytest.fixture
+def vendor(db):
+    return CustomUser.objects.create_user(
+        email="vendedor@example.com", password="secreto123", username="vendedor"
+    )
+
+
+@pytest.fixture
+def category(db):
+    return Category.objects.create(name="Electrónica")
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def make_products(vendor, category):
+    def make(count, images=2, **fields):
+        products = []
+        for i in range(count):
+            values = {
+                "name": f"Producto {i}",
+                "description": "Descripción de prueba",
+                "price": 100 + i,
+                "currency": "PEN",
+                "state": "NEW",
+                "category": category,
+                "vendor": vendor,
+            }
+            values.update(fields)
+            product = Product.objects.create(**values)
+            for j in range(images):
+                ProductImage.objects.create(product=product, url=f"product_images/{product.id}_{j}.jpg")
+            products.append(product)
+        return products
+
+    return make
+
+
+@pytest.fixture
+def chat_group(make_products, user, vendor):
+    return ChatGroup.objects.create(group_name=make_products(1, images=0)[0], buyer=user, seller=vendor)
+
+
+@pytest.fixture
+def jpeg_bytes():
+    def make(size=(640, 480), **options):
+        buffer = io.BytesIO()
+        Image.new("RGB", size, "red").save(buffer, "JPEG", **options)
+        return buffer.getvalue()
+
+    return make
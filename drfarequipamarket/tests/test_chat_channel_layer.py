@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from django.db import connection
+
+from drfarequipamarket.chat.models import ChatGroup
+
+fakeredis = pytest.importorskip("fakeredis")
+
+PROCESS_SCRIPT = Path(__file__).with_name("chat_process.py")
+REPO_ROOT = PROCESS_SCRIPT.parents[2]
+
+
+@pytest.fixture
+def fake_redis_url():
+    # Servidor compatible con Redis en un hilo, accesible por TCP desde
+    # otros procesos.
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+class ChatProcess:
+    def __init__(self, env, chat_group, user):
+        self.process = subprocess.Popen(
+            [sys.executable, str(PROCESS_SCRIPT), str(chat_group.group_name_id), str(user.id)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env, cwd=REPO_ROOT,
+        )
+
+    def send(self, payload):
+        self.process.stdin.write(json.dumps(payload) + "\n")
+        self.process.stdin.flush()
+
+    def receive(self):
+        while True:
+            line = self.process.stdout.readline()
+            assert line, "el proceso de chat terminó"
+            # Los settings imprimen avisos al arrancar; solo interesan los eventos.
+            if line.startswith("{"):
+                return json.loads(line)
+
+    def stop(self):
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("backend", ["redis", "redis_pubsub"])
+def test_events_cross_process_boundaries(backend, fake_redis_url, make_products, user, vendor):
+    chat_group = ChatGroup.objects.create(group_name=make_products(1, images=0)[0], buyer=user, seller=vendor)
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(REPO_ROOT),
+        DJANGO_SETTINGS_MODULE="drfarequipamarket.settings.local",
+        DB_NAME=connection.settings_dict["NAME"],
+        CHANNEL_LAYER_BACKEND=backend,
+        CHANNEL_REDIS_HOSTS=fake_redis_url,
+    )
+    buyer, seller = ChatProcess(env, chat_group, user), ChatProcess(env, chat_group, vendor)
+    try:
+        assert buyer.receive() == {"ready": True}
+        assert seller.receive() == {"ready": True}
+
+        buyer.send({"action": "message", "body": "Hola desde otro proceso"})
+        message = seller.receive()
+        assert message["body"] == "Hola desde otro proceso"
+        assert buyer.receive()["id"] == message["id"]
+
+        seller.send({"action": "typing", "is_typing": True})
+        assert buyer.receive() == {
+            "action": "typing", "user": {"id": vendor.id, "email": vendor.email}, "is_typing": True,
+            "last_seq": message["seq"],
+        }
+        seller.receive()
+
+        seller.send({"action": "read", "message_ids": [message["id"]]})
+        read = buyer.receive()
+        assert read["action"] == "read" and read["message_ids"] == [message["id"]]
+    finally:
+        buyer.stop()
+        seller.stop()
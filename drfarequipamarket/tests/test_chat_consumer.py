@@ -0,0 +1,130 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+
+from drfarequipamarket.chat.loadtest import run_loadtest
+from drfarequipamarket.chat.models import ChatGroup, ChatNotification, GroupMessage
+from drfarequipamarket.chat.routing import websocket_urlpatterns
+
+application = URLRouter(websocket_urlpatterns)
+
+
+def communicator(chat_group, user, query=""):
+    client = WebsocketCommunicator(application, f"/ws/chatroom/{chat_group.group_name_id}{query}")
+    client.scope["user"] = user
+    return client
+
+
+async def receive(client):
+    return json.loads(await client.receive_from(timeout=5))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_message_typing_and_read_reach_both_participants(chat_group, user, vendor):
+    @async_to_sync
+    async def scenario():
+        buyer, seller = communicator(chat_group, user), communicator(chat_group, vendor)
+        assert (await buyer.connect())[0]
+        assert (await seller.connect())[0]
+
+        await buyer.send_to(text_data=json.dumps({"action": "message", "body": "¿Sigue disponible?"}))
+        message = await receive(seller)
+        assert message["body"] == "¿Sigue disponible?"
+        assert message["author"] == {"id": user.id, "email": user.email}
+        assert message["seq"] == 1
+        assert (await receive(buyer))["id"] == message["id"]
+
+        await seller.send_to(text_data=json.dumps({"action": "typing", "is_typing": True}))
+        typing = await receive(buyer)
+        assert typing == {
+            "action": "typing", "user": {"id": vendor.id, "email": vendor.email}, "is_typing": True,
+            "last_seq": message["seq"],
+        }
+        await receive(seller)
+
+        await seller.send_to(text_data=json.dumps({"action": "read", "message_ids": [message["id"]]}))
+        read = await receive(buyer)
+        assert read["action"] == "read" and read["message_ids"] == [message["id"]]
+        await receive(seller)
+
+        await seller.send_to(text_data="no es json")
+        assert await receive(seller) == {"error": "Invalid JSON format"}
+
+        await buyer.disconnect()
+        await seller.disconnect()
+        return message["id"]
+
+    message_id = scenario()
+
+    message = GroupMessage.objects.get(pk=message_id)
+    assert message.is_read and list(message.read_by.all()) == [vendor]
+    assert ChatNotification.objects.filter(recipient=vendor, notification_type="message").count() == 1
+    assert ChatNotification.objects.filter(recipient=user, notification_type="read").count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reconnect_replays_only_missed_messages(chat_group, user, vendor, settings):
+    for i in range(4):
+        GroupMessage.objects.create(group=chat_group, author=user, body=f"Mensaje {i}")
+
+    @async_to_sync
+    async def reconnect(last_seq):
+        client = communicator(chat_group, vendor, f"?last_seq={last_seq}")
+        assert (await client.connect())[0]
+        received = []
+        while not await client.receive_nothing(timeout=0.2):
+            received.append(await receive(client))
+        await client.disconnect()
+        return received
+
+    replayed = reconnect(2)
+    assert [(event["seq"], event["body"]) for event in replayed] == [(3, "Mensaje 2"), (4, "Mensaje 3")]
+    assert reconnect(4) == []
+
+    settings.CHAT_REPLAY_MAX_MESSAGES = 2
+    assert reconnect(0) == [{"action": "resync", "last_seq": 4}]
+
+
+@pytest.mark.django_db
+def test_sequence_numbers_are_per_chat(chat_group, make_products, user, vendor):
+    other = ChatGroup.objects.create(group_name=make_products(1, images=0)[0], buyer=user, seller=vendor)
+    seqs = [
+        GroupMessage.objects.create(group=group, author=user, body="Hola").seq
+        for group in (chat_group, chat_group, other, chat_group)
+    ]
+
+    assert seqs == [1, 2, 1, 3]
+    chat_group.refresh_from_db()
+    assert chat_group.last_seq == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_outsiders_and_anonymous_users_are_rejected(chat_group, django_user_model):
+    outsider = django_user_model.objects.create_user(email="otro@example.com", password="x", username="otro")
+
+    @async_to_sync
+    async def connect(user):
+        client = communicator(chat_group, user)
+        connected, _ = await client.connect()
+        await client.disconnect()
+        return connected
+
+    assert connect(outsider) is False
+    assert connect(AnonymousUser()) is False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest_harness_reports_latencies():
+    result = async_to_sync(run_loadtest)(chats=3, messages=2)
+
+    assert result["connected"] == result["clients"] == 6
+    assert result["messages"] == 6 and result["lost"] == 0
+    assert result["delivery_ms"]["p95"] >= result["delivery_ms"]["p50"] > 0
+    assert result["read_ms"]["count"] == 6
+    assert result["queries_per_message"] > 0
+    assert result["memory_per_connection_kib"] > 0
+    assert not ChatGroup.objects.exists()
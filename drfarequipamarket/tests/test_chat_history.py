@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from drf_spectacular.generators import SchemaGenerator
+
+from drfarequipamarket.chat.models import GroupMessage
+from drfarequipamarket.chat.pagination import MessageHistoryPagination
+
+
+@pytest.fixture
+def conversation(chat_group, user, vendor):
+    # Diez mensajes con un segundo de diferencia, alternando autores
+    start = timezone.now() - timedelta(hours=1)
+    messages = []
+    for i in range(10):
+        message = GroupMessage.objects.create(
+            group=chat_group, author=user if i % 2 else vendor, body=f"Mensaje {i}"
+        )
+        GroupMessage.objects.filter(pk=message.pk).update(created=start + timedelta(seconds=i))
+        message.read_by.add(user, vendor)
+        messages.append(message)
+    return messages
+
+
+def bodies(response):
+    return [message["body"] for message in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_history_pages_backwards_from_latest(api_client, chat_group, conversation):
+    url = f"/api/chatgroup/{chat_group.id}/messages/"
+
+    first = api_client.get(url, {"page_size": 4})
+    assert bodies(first) == [f"Mensaje {i}" for i in range(6, 10)]
+    assert first.data["next"] is None
+
+    older = api_client.get(first.data["previous"])
+    assert bodies(older) == [f"Mensaje {i}" for i in range(2, 6)]
+
+    oldest = api_client.get(older.data["previous"])
+    assert bodies(oldest) == ["Mensaje 0", "Mensaje 1"]
+    assert oldest.data["previous"] is None
+
+    # Desde una página antigua, next vuelve hacia las recientes
+    assert bodies(api_client.get(oldest.data["next"])) == [f"Mensaje {i}" for i in range(2, 6)]
+
+
+@pytest.mark.django_db
+def test_since_returns_only_newer_messages(api_client, chat_group, conversation):
+    conversation[6].refresh_from_db()
+    response = api_client.get(
+        f"/api/chatgroup/{chat_group.id}/messages/",
+        {"since": conversation[6].created.isoformat(), "page_size": 2},
+    )
+
+    assert bodies(response) == ["Mensaje 7", "Mensaje 8"]
+    assert bodies(api_client.get(response.data["next"])) == ["Mensaje 9"]
+
+
+@pytest.mark.django_db
+def test_invalid_since_and_cursor_are_rejected(api_client, chat_group):
+    url = f"/api/chatgroup/{chat_group.id}/messages/"
+    assert api_client.get(url, {"since": "ayer"}).status_code == 400
+    assert api_client.get(url, {"cursor": "no-es-un-cursor"}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_history_queries_do_not_grow_with_messages(api_client, chat_group, conversation):
+    url = f"/api/chatgroup/{chat_group.id}/messages/"
+
+    def queries(params):
+        with CaptureQueriesContext(connection) as captured:
+            assert api_client.get(url, params).status_code == 200
+        return len(captured)
+
+    assert queries({"page_size": 2}) == queries({"page_size": 10}) == queries({})
+
+
+@pytest.mark.django_db
+def test_history_is_paginated_by_default(api_client, chat_group, user, vendor, conversation, monkeypatch):
+    monkeypatch.setattr(MessageHistoryPagination, "page_size", 4)
+    response = api_client.get(f"/api/chatgroup/{chat_group.id}/messages/")
+
+    assert bodies(response) == [f"Mensaje {i}" for i in range(6, 10)]
+    assert response.data["previous"] is not None
+    # Lectores como ids, sin anidar los usuarios
+    assert sorted(response.data["results"][0]["read_by"]) == sorted([user.id, vendor.id])
+
+
+def test_history_schema_declares_each_parameter_once():
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    operation = schema["paths"]["/api/chatgroup/{id}/messages/"]["get"]
+
+    names = [parameter["name"] for parameter in operation["parameters"]]
+    assert sorted(names) == ["cursor", "id", "page_size", "since"]
+    response = operation["responses"]["200"]["content"]["application/json"]["schema"]
+    assert response["$ref"].endswith("/PaginatedMessageHistoryList")
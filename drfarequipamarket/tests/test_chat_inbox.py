@@ -0,0 +1,81 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from drfarequipamarket.chat.models import ChatGroup, GroupMessage
+from drfarequipamarket.chat.receipts import mark_messages_read
+
+
+def inbox_of(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_send_and_read_keep_inbox_counters(chat_group, api_client, user, vendor):
+    for body in ("Hola", "¿Sigue disponible?"):
+        response = api_client.post(
+            f"/api/chatgroup/{chat_group.id}/send_message/", {"author_id": user.id, "body": body}
+        )
+        assert response.status_code == 201
+
+    chat_group.refresh_from_db()
+    assert chat_group.last_message.body == "¿Sigue disponible?"
+    assert (chat_group.seller_unread_count, chat_group.buyer_unread_count) == (2, 0)
+
+    [row] = inbox_of(vendor).get("/api/chatgroup/").data["results"]
+    assert row["unread_count"] == 2
+    assert row["last_message"]["body"] == "¿Sigue disponible?"
+
+    mark_messages_read(chat_group, vendor, [chat_group.last_message_id])
+    chat_group.refresh_from_db()
+    assert chat_group.seller_unread_count == 1
+
+
+@pytest.mark.django_db
+def test_inbox_queries_do_not_grow_with_chats(make_products, user, vendor):
+    def inbox_queries():
+        with CaptureQueriesContext(connection) as queries:
+            assert inbox_of(user).get("/api/chatgroup/").status_code == 200
+        return len(queries)
+
+    def add_chats(count):
+        for product in make_products(count, images=0):
+            group = ChatGroup.objects.create(group_name=product, buyer=user, seller=vendor)
+            GroupMessage.objects.create(group=group, author=vendor, body="Hola")
+
+    add_chats(1)
+    baseline = inbox_queries()
+    add_chats(5)
+    assert inbox_queries() == baseline
+
+
+@pytest.mark.django_db
+def test_deleted_last_message_falls_back_to_previous(chat_group, user):
+    first = GroupMessage.objects.create(group=chat_group, author=user, body="Primero")
+    last = GroupMessage.objects.create(group=chat_group, author=user, body="Segundo")
+
+    last.is_deleted = True
+    last.save()
+
+    chat_group.refresh_from_db()
+    assert chat_group.last_message == first
+
+
+@pytest.mark.django_db
+def test_repair_command_recomputes_inbox(chat_group, user, vendor):
+    GroupMessage.objects.create(group=chat_group, author=user, body="Hola")
+    last = GroupMessage.objects.create(group=chat_group, author=vendor, body="Buenas")
+    ChatGroup.objects.update(last_message=None, buyer_unread_count=7, seller_unread_count=0)
+
+    call_command("repair_chat_inbox", "--dry-run")
+    chat_group.refresh_from_db()
+    assert chat_group.buyer_unread_count == 7
+
+    call_command("repair_chat_inbox")
+    chat_group.refresh_from_db()
+    assert chat_group.last_message == last
+    assert (chat_group.buyer_unread_count, chat_group.seller_unread_count) == (1, 1)
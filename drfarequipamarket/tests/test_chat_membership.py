@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from drfarequipamarket.chat.membership import resolve_chat
+from drfarequipamarket.chat.models import ChatGroup, ChatNotification, GroupMessage
+from drfarequipamarket.chat.routing import websocket_urlpatterns
+
+
+@pytest.fixture
+def second_buyer(django_user_model):
+    return django_user_model.objects.create_user(email="otro@example.com", password="x", username="otro")
+
+
+@pytest.mark.django_db
+def test_membership_is_one_query_then_cached(chat_group, user, vendor, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        chat = resolve_chat(chat_group.group_name_id, user.id)
+    with django_assert_num_queries(0):
+        assert resolve_chat(chat_group.group_name_id, user.id).id == chat.id
+
+    assert (chat.seller_id, chat.buyer_id) == (vendor.id, user.id)
+    assert resolve_chat(chat_group.group_name_id, 999999) is None
+
+
+@pytest.mark.django_db
+def test_new_chat_invalidates_cached_membership(chat_group, vendor, second_buyer):
+    product_id = chat_group.group_name_id
+    assert resolve_chat(product_id, vendor.id).id == chat_group.id
+
+    other = ChatGroup.objects.create(group_name_id=product_id, buyer=second_buyer, seller=vendor)
+
+    # Con dos chats en el producto el vendedor debe elegir uno
+    assert resolve_chat(product_id, vendor.id) is None
+    assert resolve_chat(product_id, vendor.id, other.id).id == other.id
+
+
+@pytest.mark.django_db
+def test_message_path_does_not_touch_users(chat_group, user):
+    chat = resolve_chat(chat_group.group_name_id, user.id)
+
+    with CaptureQueriesContext(connection) as queries:
+        message = GroupMessage.objects.create(group=chat, author=user, body="Hola")
+        ChatNotification.objects.create(
+            chat_group=chat, recipient_id=chat.seller_id, sender=user, notification_type="message", message=message
+        )
+
+    assert not [query for query in queries if "users_customuser" in query["sql"]]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_chats_of_the_same_product_are_isolated(chat_group, user, vendor, second_buyer):
+    other = ChatGroup.objects.create(group_name_id=chat_group.group_name_id, buyer=second_buyer, seller=vendor)
+    application = URLRouter(websocket_urlpatterns)
+
+    def communicator(member, query=""):
+        client = WebsocketCommunicator(application, f"/ws/chatroom/{chat_group.group_name_id}{query}")
+        client.scope["user"] = member
+        return client
+
+    @async_to_sync
+    async def scenario():
+        ambiguous = communicator(vendor)
+        assert not (await ambiguous.connect())[0]
+
+        seller = communicator(vendor, f"?chat={chat_group.id}")
+        first_buyer, other_buyer = communicator(user), communicator(second_buyer)
+        for client in (seller, first_buyer, other_buyer):
+            assert (await client.connect())[0]
+
+        await first_buyer.send_to(text_data=json.dumps({"action": "message", "body": "Hola"}))
+        assert json.loads(await seller.receive_from(timeout=5))["body"] == "Hola"
+        assert await other_buyer.receive_nothing(timeout=0.3)
+
+        for client in (seller, first_buyer, other_buyer):
+            await client.disconnect()
+
+    scenario()
+    assert other.chat_messages.count() == 0
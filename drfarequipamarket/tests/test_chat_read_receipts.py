@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import DatabaseError
+
+from drfarequipamarket.chat import consumers
+from drfarequipamarket.chat.models import ChatNotification, GroupMessage
+from drfarequipamarket.chat.receipts import mark_messages_read
+from drfarequipamarket.chat.routing import websocket_urlpatterns
+
+
+def send_messages(chat_group, author, count):
+    return [
+        GroupMessage.objects.create(group=chat_group, author=author, body=f"Mensaje {i}").id
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("count", [1, 50])
+def test_mark_read_uses_constant_queries(chat_group, user, vendor, count, django_assert_num_queries):
+    ids = send_messages(chat_group, user, count)
+
+    # savepoint + select IDs + insert read_by + update is_read
+    # + update del contador + update/insert de la notificación + release
+    with django_assert_num_queries(8):
+        assert sorted(mark_messages_read(chat_group, vendor, ids)) == sorted(ids)
+
+    assert GroupMessage.objects.filter(id__in=ids, is_read=True).count() == count
+    assert GroupMessage.read_by.through.objects.filter(customuser=vendor).count() == count
+
+
+@pytest.mark.django_db
+def test_mark_read_is_idempotent_and_coalesces_notifications(chat_group, user, vendor):
+    ids = send_messages(chat_group, user, 3)
+    own = send_messages(chat_group, vendor, 1)
+
+    mark_messages_read(chat_group, vendor, ids[:2])
+    # Solo el que faltaba: los ya leídos y los propios no se vuelven a marcar
+    assert mark_messages_read(chat_group, vendor, ids + own) == ids[2:]
+    assert mark_messages_read(chat_group, vendor, ids) == []
+
+    assert GroupMessage.read_by.through.objects.filter(customuser=vendor).count() == 3
+    assert not GroupMessage.objects.get(pk=own[0]).is_read
+    assert ChatNotification.objects.filter(recipient=user, notification_type="read").count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_debounce_merges_rapid_read_events(chat_group, user, vendor, settings):
+    settings.CHAT_READ_DEBOUNCE_SECONDS = 0.2
+    ids = send_messages(chat_group, user, 4)
+
+    @async_to_sync
+    async def scenario():
+        seller = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/chatroom/{chat_group.group_name_id}")
+        seller.scope["user"] = vendor
+        assert (await seller.connect())[0]
+        await seller.send_to(text_data=json.dumps({"action": "read", "message_ids": ids[:2]}))
+        await seller.send_to(text_data=json.dumps({"action": "read", "message_ids": ids[1:]}))
+        event = json.loads(await seller.receive_from(timeout=5))
+        assert await seller.receive_nothing(timeout=0.3)
+        await seller.disconnect()
+        return event
+
+    event = scenario()
+
+    assert event["action"] == "read" and event["message_ids"] == ids
+    assert GroupMessage.objects.filter(id__in=ids, is_read=True).count() == 4
+    assert ChatNotification.objects.filter(recipient=user, notification_type="read").count() == 1
+
+
+def seller_scenario(chat_group, vendor, events, replies):
+    @async_to_sync
+    async def scenario():
+        seller = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/chatroom/{chat_group.group_name_id}")
+        seller.scope["user"] = vendor
+        assert (await seller.connect())[0]
+        for event in events:
+            await seller.send_to(text_data=json.dumps({"action": "read", "message_ids": event}))
+        received = [json.loads(await seller.receive_from(timeout=5)) for _ in range(replies)]
+        assert await seller.receive_nothing(timeout=0.3)
+        await seller.disconnect()
+        return received
+
+    return scenario()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_debounced_reads_reject_invalid_ids_and_announce_only_new_reads(chat_group, user, vendor, settings):
+    settings.CHAT_READ_DEBOUNCE_SECONDS = 0.2
+    ids = send_messages(chat_group, user, 3)
+    mark_messages_read(chat_group, vendor, ids[:1])
+
+    error, read = seller_scenario(chat_group, vendor, [ids[:2], ["uno"], [ids[2], 999999]], replies=2)
+
+    # El evento inválido se rechaza sin arruinar el lote de los demás
+    assert error == {"error": "message_ids must be a list of integers"}
+    assert read["action"] == "read" and read["message_ids"] == ids[1:]
+    assert GroupMessage.objects.filter(id__in=ids, is_read=True).count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_debounced_flush_is_reported_to_the_client(chat_group, user, vendor, settings, monkeypatch):
+    settings.CHAT_READ_DEBOUNCE_SECONDS = 0.1
+    ids = send_messages(chat_group, user, 2)
+
+    def broken_mark_read(*args):
+        raise DatabaseError("conexión perdida")
+
+    monkeypatch.setattr(consumers, "mark_messages_read", broken_mark_read)
+
+    [error] = seller_scenario(chat_group, vendor, [ids], replies=1)
+
+    assert error == {"error": "Could not mark messages as read", "message_ids": ids}
+    assert not GroupMessage.objects.filter(id__in=ids, is_read=True).exists()
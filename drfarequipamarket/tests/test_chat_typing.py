@@ -0,0 +1,73 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+
+from drfarequipamarket.chat.typing import TypingIndicator
+
+
+def run_indicator(scenario, timeout=5, min_interval=0.1):
+    sent = []
+
+    async def broadcast(is_typing):
+        sent.append(is_typing)
+
+    @async_to_sync
+    async def run():
+        indicator = TypingIndicator(broadcast, timeout=timeout, min_interval=min_interval)
+        await scenario(indicator, sent)
+        await indicator.close()
+        return indicator
+
+    return sent, run()
+
+
+def test_keystroke_burst_broadcasts_only_transitions():
+    async def scenario(indicator, sent):
+        for _ in range(20):
+            await indicator.update(True)
+        await asyncio.sleep(0.15)
+        await indicator.update(False)
+
+    sent, indicator = run_indicator(scenario)
+
+    assert sent == [True, False]
+    assert indicator.stats["received"] == 21
+    assert indicator.stats["suppressed"] == 19
+    assert indicator.stats["broadcast"] == 2
+
+
+def test_changes_within_interval_are_coalesced():
+    async def scenario(indicator, sent):
+        await indicator.update(True)
+        # Para y vuelve a escribir antes de que pase el intervalo: el grupo
+        # ya lo ve escribiendo, así que no se publica nada más.
+        await indicator.update(False)
+        await indicator.update(True)
+        await asyncio.sleep(0.15)
+        assert sent == [True]
+        # Un cambio dentro del intervalo se publica al cumplirse.
+        await indicator.update(False)
+        await asyncio.sleep(0.15)
+        assert sent == [True, False]
+
+    run_indicator(scenario, min_interval=0.1)
+
+
+def test_typing_expires_without_events():
+    async def scenario(indicator, sent):
+        await indicator.update(True)
+        await asyncio.sleep(0.2)
+
+    sent, indicator = run_indicator(scenario, timeout=0.05, min_interval=0)
+
+    assert sent == [True, False]
+    assert indicator.stats["expired"] == 1
+
+
+def test_close_clears_published_typing():
+    async def scenario(indicator, sent):
+        await indicator.update(True)
+
+    sent, _ = run_indicator(scenario)
+
+    assert sent == [True, False]
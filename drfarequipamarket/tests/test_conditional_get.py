@@ -0,0 +1,113 @@
+import time
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from drfarequipamarket.product import cache as cache_module
+from drfarequipamarket.product.models import ProductImage
+
+
+def _get(client, url, **headers):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, headers=headers)
+    return response, len(ctx.captured_queries)
+
+
+def test_product_detail_honours_if_none_match(api_client, make_products):
+    product = make_products(1)[0]
+    url = f"/api/product/{product.id}/"
+    first, _ = _get(api_client, url)
+    assert first.status_code == 200
+    assert first["ETag"].startswith('"')
+
+    again, queries = _get(api_client, url, If_None_Match=first["ETag"])
+    assert again.status_code == 304
+    assert queries == 1
+    assert again.content == b""
+
+    product.price = 999
+    product.save()
+    changed, _ = _get(api_client, url, If_None_Match=first["ETag"])
+    assert changed.status_code == 200
+    assert changed.json()["price"] == 999
+
+
+def test_product_detail_honours_if_modified_since(api_client, make_products):
+    product = make_products(1, images=0)[0]
+    url = f"/api/product/{product.id}/"
+    first, _ = _get(api_client, url)
+    assert first["Last-Modified"] == http_date(int(product.updated_at.timestamp()))
+
+    not_modified, _ = _get(api_client, url, If_Modified_Since=first["Last-Modified"])
+    assert not_modified.status_code == 304
+    stale, _ = _get(api_client, url, If_Modified_Since=http_date(0))
+    assert stale.status_code == 200
+
+
+def test_image_changes_roll_up_into_the_product(api_client, make_products):
+    product = make_products(1, images=0)[0]
+    before = product.updated_at
+    url = f"/api/product/{product.id}/"
+    first, _ = _get(api_client, url)
+
+    ProductImage.objects.create(product=product, url="product_images/otra.jpg")
+    product.refresh_from_db()
+    assert product.updated_at > before
+
+    changed, _ = _get(api_client, url, If_None_Match=first["ETag"])
+    assert changed.status_code == 200
+    assert len(changed.json()["product_image"]) == 1
+
+
+def test_missing_product_is_404(api_client):
+    assert api_client.get("/api/product/123456/").status_code == 404
+
+
+def test_product_list_sends_last_modified(api_client, make_products):
+    products = make_products(3, images=0)
+    first, _ = _get(api_client, "/api/product/")
+    newest = max(p.updated_at for p in products)
+    assert first["Last-Modified"] == http_date(int(newest.timestamp()))
+
+    not_modified, queries = _get(api_client, "/api/product/", If_Modified_Since=first["Last-Modified"])
+    assert not_modified.status_code == 304
+    assert queries == 0
+
+
+def test_product_detail_varies_by_image_variant_and_host(api_client, make_products):
+    [product] = make_products(1, images=0)
+    ProductImage.objects.create(
+        product=product, url="product_images/foto.jpg", variants={"thumb": "product_images/variants/foto_200.webp"},
+    )
+    url = f"/api/product/{product.id}/"
+
+    original = api_client.get(url)
+    thumb = api_client.get(url, {"image_variant": "thumb"})
+    other_host = api_client.get(url, HTTP_HOST="cdn.example.com")
+
+    assert original.data["product_image"][0]["url"] == "http://testserver/media/product_images/foto.jpg"
+    assert thumb.data["product_image"][0]["url"] == "http://testserver/media/product_images/variants/foto_200.webp"
+    assert other_host.data["product_image"][0]["url"] == "http://cdn.example.com/media/product_images/foto.jpg"
+    assert len({original["ETag"], thumb["ETag"], other_host["ETag"]}) == 3
+    # El orden inverso tampoco reutiliza la entrada cacheada
+    assert api_client.get(url).data["product_image"][0]["url"].endswith("foto.jpg")
+    assert api_client.get(url, {"image_variant": "thumb"}, HTTP_IF_NONE_MATCH=original["ETag"]).status_code == 200
+
+
+def test_signed_image_urls_expire_cached_validators(api_client, make_products, local_image_storage, monkeypatch):
+    # Como R2 en producción: URLs firmadas que vencen a la hora
+    local_image_storage.querystring_auth = True
+    local_image_storage.querystring_expire = 3600
+    now = 1_800_000_000.0
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=lambda: now, time_ns=time.time_ns))
+    product = make_products(1)[0]
+
+    for url in (f"/api/product/{product.id}/", "/api/product/"):
+        first, _ = _get(api_client, url)
+        assert _get(api_client, url, If_None_Match=first["ETag"])[0].status_code == 304
+
+        now += 3600
+        for headers in ({"If_None_Match": first["ETag"]}, {"If_Modified_Since": first["Last-Modified"]}):
+            assert _get(api_client, url, **headers)[0].status_code == 200
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+REPO_ROOT = Path(__file__).parents[2]
+
+
+@pytest.mark.django_db
+def test_pool_stats_are_admin_only(api_client, django_user_model):
+    assert api_client.get("/api/monitoring/db-pool/").status_code == 403
+
+    admin = django_user_model.objects.create_superuser(email="admin@example.com", password="x", username="admin")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    response = client.get("/api/monitoring/db-pool/")
+
+    assert response.status_code == 200
+    assert response.data["default"]["mode"] == "off"
+    assert "pool" not in response.data["default"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pool_mode_reuses_a_bounded_set_of_connections():
+    # La configuración de la base se fija al arrancar: el modo pool se prueba
+    # en otro proceso, contra la base de tests.
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="drfarequipamarket.settings.local",
+        DB_NAME=connection.settings_dict["NAME"],
+        DB_POOL_MODE="pool",
+        DB_POOL_MAX_SIZE="4",
+    )
+    completed = subprocess.run(
+        [sys.executable, "-m", "django", "benchmark_db_pool", "--json",
+         "--requests", "40", "--concurrency", "8", "--chats", "2"],
+        env=env, cwd=REPO_ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    result = json.loads([line for line in completed.stdout.splitlines() if line.startswith("{")][-1])
+
+    assert result["mode"] == "pool" and result["errors"] == 0
+    assert result["pool"]["pool_max"] == 4
+    assert result["connections_opened"] <= 4
@@ -0,0 +1,152 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from drfarequipamarket.chat.routing import websocket_urlpatterns
+from drfarequipamarket.metrics import chat_label
+
+REPO_ROOT = Path(__file__).parents[2]
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+def test_requests_are_counted_by_route(api_client):
+    before = sample("http_requests_total", method="GET", route="chatgroup-list", status="200")
+    missing_before = sample("http_requests_total", method="GET", route="unmatched", status="404")
+
+    api_client.get("/api/chatgroup/")
+    api_client.get("/api/chatgroup/")
+    api_client.get("/no-existe/")
+
+    assert sample("http_requests_total", method="GET", route="chatgroup-list", status="200") == before + 2
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404") == missing_before + 1
+    assert sample("http_request_duration_seconds_count", method="GET", route="chatgroup-list") >= 2
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_requires_admin_or_token(api_client, settings):
+    settings.METRICS_TOKEN = "secreto-metricas"
+    client = APIClient()
+
+    assert api_client.get("/api/monitoring/metrics/").status_code == 403
+    assert client.get("/api/monitoring/metrics/", HTTP_AUTHORIZATION="Bearer otro").status_code == 401
+
+    response = client.get("/api/monitoring/metrics/", HTTP_AUTHORIZATION="Bearer secreto-metricas")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    body = response.content.decode()
+    assert "# TYPE http_requests_total counter" in body
+    assert "chat_websocket_connections" in body
+
+    settings.METRICS_TOKEN = ""
+    assert client.get("/api/monitoring/metrics/", HTTP_AUTHORIZATION="Bearer ").status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_websocket_activity_is_measured(chat_group, user, vendor, django_user_model):
+    outsider = django_user_model.objects.create_user(email="otro@example.com", password="x", username="otro")
+    # Sin METRICS_PER_CHAT todos los chats comparten la serie
+    chat = "all"
+    before = {
+        "accepted": sample("chat_websocket_connects_total", result="accepted"),
+        "rejected": sample("chat_websocket_connects_total", result="rejected"),
+        "open": sample("chat_websocket_connections"),
+        "messages": sample("chat_messages_total", chat=chat),
+        "sends": sample("chat_channel_layer_send_duration_seconds_count", event="message_handler"),
+        "receives": sample("chat_websocket_receive_duration_seconds_count", action="message"),
+        "invalid": sample("chat_websocket_receive_duration_seconds_count", action="invalid"),
+    }
+    application = URLRouter(websocket_urlpatterns)
+
+    def communicator(member):
+        client = WebsocketCommunicator(application, f"/ws/chatroom/{chat_group.group_name_id}")
+        client.scope["user"] = member
+        return client
+
+    @async_to_sync
+    async def scenario():
+        rejected = communicator(outsider)
+        assert not (await rejected.connect())[0]
+        await rejected.disconnect()
+
+        buyer, seller = communicator(user), communicator(vendor)
+        assert (await buyer.connect())[0]
+        assert (await seller.connect())[0]
+        open_connections = sample("chat_websocket_connections")
+
+        await buyer.send_to(text_data=json.dumps({"action": "message", "body": "Hola"}))
+        await seller.receive_from(timeout=5)
+        await buyer.receive_from(timeout=5)
+        await buyer.send_to(text_data=json.dumps({"action": "bailar"}))
+        await buyer.receive_from(timeout=5)
+
+        await buyer.disconnect()
+        await seller.disconnect()
+        return open_connections
+
+    assert scenario() == before["open"] + 2
+    assert sample("chat_websocket_connections") == before["open"]
+    assert sample("chat_websocket_connects_total", result="accepted") == before["accepted"] + 2
+    assert sample("chat_websocket_connects_total", result="rejected") == before["rejected"] + 1
+    assert sample("chat_messages_total", chat=chat) == before["messages"] + 1
+    assert sample("chat_channel_layer_send_duration_seconds_count", event="message_handler") == before["sends"] + 1
+    assert sample("chat_websocket_receive_duration_seconds_count", action="message") == before["receives"] + 1
+    assert sample("chat_websocket_receive_duration_seconds_count", action="invalid") == before["invalid"] + 1
+
+
+def test_multiprocess_mode_aggregates_worker_processes(tmp_path):
+    # PROMETHEUS_MULTIPROC_DIR se lee al importar prometheus_client, así que
+    # se prueba en un proceso aparte que a su vez lanza dos "workers".
+    script = textwrap.dedent("""
+        import multiprocessing
+        import django
+        django.setup()
+        from prometheus_client import multiprocess
+        from drfarequipamarket import metrics
+
+        def worker():
+            metrics.http_requests.labels("GET", "product-list", "200").inc()
+            metrics.websocket_connections.inc()
+
+        if __name__ == "__main__":
+            processes = [multiprocessing.Process(target=worker) for _ in range(2)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+                multiprocess.mark_process_dead(process.pid)
+            print(metrics.render_metrics().decode())
+    """)
+    env = dict(
+        os.environ,
+        PROMETHEUS_MULTIPROC_DIR=str(tmp_path),
+        DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "drfarequipamarket.settings.local"),
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    lines = completed.stdout.splitlines()
+    assert 'http_requests_total{method="GET",route="product-list",status="200"} 2.0' in lines
+    # Gauge "livesum": los procesos terminados dejan de contar
+    assert "chat_websocket_connections 0.0" in lines
+
+
+def test_per_chat_labels_are_opt_in(settings):
+    assert chat_label(7) == "all"
+    settings.METRICS_PER_CHAT = True
+    assert chat_label(7) == "7"
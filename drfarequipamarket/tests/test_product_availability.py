@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from drfarequipamarket.product.models import Product
+
+
+@pytest.fixture
+def vendor_client(vendor):
+    client = APIClient()
+    client.force_authenticate(user=vendor)
+    return client
+
+
+def availability(*products):
+    return [Product.objects.get(pk=product.pk).is_available for product in products]
+
+
+@pytest.mark.django_db
+def test_bulk_update_reports_each_product(vendor_client, user, make_products):
+    available, sold = make_products(2, images=0)
+    Product.objects.filter(pk=sold.pk).update(is_available=False)
+    [foreign] = make_products(1, images=0, vendor=user)
+    before = Product.objects.get(pk=available.pk).updated_at
+
+    with CaptureQueriesContext(connection) as queries:
+        response = vendor_client.post(
+            "/api/product/availability/",
+            {"ids": [available.id, sold.id, foreign.id, 999999, available.id], "is_available": False},
+            format="json",
+        )
+
+    assert response.status_code == 200
+    assert response.data == {
+        "is_available": False,
+        "updated": 1,
+        "results": [
+            {"id": available.id, "outcome": "updated"},
+            {"id": sold.id, "outcome": "unchanged"},
+            {"id": foreign.id, "outcome": "forbidden"},
+            {"id": 999999, "outcome": "not_found"},
+        ],
+    }
+    # Un UPDATE condicional y un SELECT para clasificar los que no cambiaron
+    assert len(queries) == 2
+    assert availability(available, sold, foreign) == [False, False, True]
+    assert Product.objects.get(pk=available.pk).updated_at > before
+
+
+@pytest.mark.django_db
+def test_bulk_update_invalidates_cached_catalog(vendor_client, make_products):
+    [product] = make_products(1, images=0)
+    assert vendor_client.get("/api/product/").data[0]["is_available"] is True
+
+    vendor_client.post("/api/product/availability/", {"ids": [product.id], "is_available": False}, format="json")
+
+    assert vendor_client.get("/api/product/").data[0]["is_available"] is False
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("payload", [
+    {"ids": [], "is_available": True},
+    {"ids": list(range(1, 102)), "is_available": True},
+    {"ids": ["uno"], "is_available": True},
+    {"ids": [1]},
+])
+def test_bulk_update_validates_payload(vendor_client, payload):
+    assert vendor_client.post("/api/product/availability/", payload, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_single_product_endpoints(vendor_client, api_client, make_products):
+    [product] = make_products(1, images=0)
+    url = f"/api/product/{product.id}"
+
+    sold = vendor_client.post(f"{url}/sold/")
+    assert sold.data == {
+        "detail": "Producto marcado como vendido exitosamente", "product_id": product.id, "is_available": False,
+    }
+    again = vendor_client.post(f"{url}/sold/")
+    assert again.status_code == 400
+    assert again.data["detail"] == "Este producto ya está marcado como vendido"
+
+    assert vendor_client.post(f"{url}/available/").data["is_available"] is True
+    assert vendor_client.post(f"{url}/available/").status_code == 400
+
+    with CaptureQueriesContext(connection) as queries:
+        toggled = vendor_client.post(f"{url}/toggle/")
+    assert len(queries) == 1
+    assert toggled.data == {
+        "detail": "Producto cambiado de disponible a vendido exitosamente",
+        "product_id": product.id,
+        "is_available": False,
+        "old_status": "disponible",
+        "new_status": "vendido",
+    }
+    assert availability(product) == [False]
+
+    updated = vendor_client.patch(f"{url}/availability/", {"is_available": True}, format="json")
+    assert updated.data["new_status"] == "disponible"
+    assert vendor_client.patch(f"{url}/availability/", {"is_available": True}, format="json").status_code == 400
+    assert vendor_client.patch(f"{url}/availability/", {"is_available": "si"}, format="json").status_code == 400
+
+    # Solo el vendedor puede cambiarlo
+    for path in ("sold", "toggle"):
+        assert api_client.post(f"{url}/{path}/").status_code == 403
+    assert availability(product) == [True]
+
+    assert vendor_client.post("/api/product/999999/toggle/").status_code == 404
+    assert vendor_client.post("/api/product/999999/sold/").status_code == 404
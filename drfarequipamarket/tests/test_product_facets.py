@@ -0,0 +1,75 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from drfarequipamarket.product.models import Category
+
+
+def _facets(client, **params):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/api/product/facets/", params)
+    assert response.status_code == 200
+    return response.json(), len(ctx.captured_queries)
+
+
+def test_facets_count_every_dimension_in_one_query(api_client, make_products, category):
+    make_products(3, images=0, price=50, departamento="Arequipa", provincia="Arequipa", distrito="Cayma")
+    make_products(2, images=0, price=700, currency="USD", state="USED/A",
+                  departamento="Arequipa", provincia="Arequipa", distrito="Yanahuara")
+    other = Category.objects.create(name="Hogar")
+    make_products(1, images=0, price=6000, category=other, departamento="Lima", provincia="Lima", distrito="Miraflores")
+
+    facets, queries = _facets(api_client)
+
+    assert queries == 1
+    assert facets["total"] == 6
+    assert facets["category"] == [
+        {"id": category.id, "name": "Electrónica", "count": 5},
+        {"id": other.id, "name": "Hogar", "count": 1},
+    ]
+    assert facets["departamento"] == [{"value": "Arequipa", "count": 5}, {"value": "Lima", "count": 1}]
+    assert {"value": "Cayma", "provincia": "Arequipa", "departamento": "Arequipa", "count": 3} in facets["distrito"]
+    assert {"value": "USED/A", "count": 2} in facets["state"]
+    assert {"value": "USD", "count": 2} in facets["currency"]
+    assert facets["price"] == [
+        {"min": 0, "max": 100, "count": 3},
+        {"min": 500, "max": 1000, "count": 2},
+        {"min": 5000, "max": None, "count": 1},
+    ]
+
+
+def test_facets_respect_current_filters(api_client, make_products):
+    make_products(2, images=0, departamento="Arequipa")
+    make_products(4, images=0, departamento="Lima")
+    facets, _ = _facets(api_client, departamento="Lima", max_price=101)
+    assert facets["total"] == 2
+    assert facets["departamento"] == [{"value": "Lima", "count": 2}]
+
+
+def test_facets_are_cached_until_the_catalogue_changes(api_client, make_products):
+    product = make_products(2, images=0)[0]
+    _facets(api_client)
+    cached, queries = _facets(api_client)
+    assert queries == 0
+    assert cached["total"] == 2
+
+    product.delete()
+    fresh, queries = _facets(api_client)
+    assert queries == 1
+    assert fresh["total"] == 1
+
+
+def test_products_with_negative_prices_do_not_break_facets(api_client, make_products, category):
+    # Filas creadas antes de validar price >= 0
+    make_products(1, images=0, price=-5)
+    make_products(1, images=0, price=50)
+
+    facets, _ = _facets(api_client)
+
+    assert facets["total"] == 2
+    assert facets["price"] == [{"min": 0, "max": 100, "count": 1}]
+
+    response = api_client.post("/api/product/", {
+        "name": "Silla", "description": "Madera", "price": -1, "currency": "PEN",
+        "state": "NEW", "category": category.id,
+    }, format="json")
+    assert response.status_code == 400
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from drfarequipamarket.product.models import Product
+
+
+def favorite_counts(*products):
+    return [Product.objects.get(pk=product.pk).favorite_count for product in products]
+
+
+@pytest.mark.django_db
+def test_toggle_updates_favorite_count(api_client, user, make_products):
+    [product] = make_products(1, images=0)
+
+    added = api_client.post(f"/api/product/{product.id}/favorite/")
+    assert added.status_code == 200
+    assert added.data == {"detail": "Producto agregado a favoritos", "is_favorite": True, "favorite_count": 1}
+    assert [*user.favorite_products.all()] == [product]
+    assert api_client.get(f"/api/product/{product.id}/").data["is_favorite"] is True
+
+    removed = api_client.post(f"/api/product/{product.id}/favorite/")
+    assert removed.data == {"detail": "Producto eliminado de favoritos", "is_favorite": False, "favorite_count": 0}
+    assert not user.favorite_products.exists()
+    assert favorite_counts(product) == [0]
+    assert api_client.get(f"/api/product/{product.id}/").data["is_favorite"] is False
+
+    assert api_client.post("/api/product/999999/favorite/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_toggle_does_not_load_the_favorites_list(api_client, user, make_products):
+    product, *others = make_products(51, images=0)
+
+    def toggle_queries():
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.post(f"/api/product/{product.id}/favorite/").status_code == 200
+        return len(queries)
+
+    adding_first = toggle_queries()
+    removing = toggle_queries()
+    user.favorite_products.add(*others)
+    adding_with_fifty = toggle_queries()
+
+    # SAVEPOINT, DELETE, INSERT, UPDATE ... RETURNING y RELEASE
+    assert adding_first == adding_with_fifty == 5
+    assert removing == 4
+
+
+@pytest.mark.django_db
+def test_m2m_changes_keep_counts_in_sync(user, vendor, make_products):
+    first, second = make_products(2, images=0)
+
+    user.favorite_products.add(first, second)
+    vendor.favorite_products.add(first)
+    assert favorite_counts(first, second) == [2, 1]
+
+    user.favorite_products.remove(second)
+    user.favorite_products.remove(second)
+    assert favorite_counts(first, second) == [2, 0]
+
+    user.favorite_products.clear()
+    assert favorite_counts(first, second) == [1, 0]
+
+    first.favorite_products.clear()
+    assert favorite_counts(first, second) == [0, 0]
+
+
+@pytest.mark.django_db
+def test_favorite_status_checks_many_products_at_once(api_client, user, vendor, make_products):
+    first, second, third = make_products(3, images=0)
+    user.favorite_products.add(first)
+    vendor.favorite_products.add(first, third)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(f"/api/product/favorite/status/?ids={first.id},{second.id},{third.id},999999")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        str(first.id): {"is_favorite": True, "favorite_count": 2},
+        str(second.id): {"is_favorite": False, "favorite_count": 0},
+        str(third.id): {"is_favorite": False, "favorite_count": 1},
+    }
+    assert len(queries) == 1
+
+    assert api_client.get("/api/product/favorite/status/?ids=1,dos").status_code == 400
+    assert api_client.get("/api/product/favorite/status/").status_code == 400
+    too_many = ",".join(str(i) for i in range(1, 102))
+    assert api_client.get(f"/api/product/favorite/status/?ids={too_many}").status_code == 400
+
+
+@pytest.mark.django_db
+def test_catalog_can_be_sorted_by_favorite_count(api_client, user, vendor, make_products):
+    least, most, middle = make_products(3, images=0)
+    user.favorite_products.add(most, middle)
+    vendor.favorite_products.add(most)
+
+    response = api_client.get("/api/product/?ordering=-favorite_count&page_size=2")
+
+    assert [row["id"] for row in response.data["results"]] == [most.id, middle.id]
+    assert [row["favorite_count"] for row in response.data["results"]] == [2, 1]
+    assert [row["id"] for row in api_client.get(response.data["next"]).data["results"]] == [least.id]
+
+
+@pytest.mark.django_db
+def test_reconcile_command_fixes_drifted_counts(user, make_products):
+    first, second = make_products(2, images=0)
+    user.favorite_products.add(first)
+    Product.objects.filter(pk=first.pk).update(favorite_count=7)
+    Product.objects.filter(pk=second.pk).update(favorite_count=3)
+
+    out = StringIO()
+    call_command("reconcile_favorite_counts", "--dry-run", stdout=out)
+    assert "2 productos revisados, 2 por corregir" in out.getvalue()
+    assert favorite_counts(first, second) == [7, 3]
+
+    out = StringIO()
+    call_command("reconcile_favorite_counts", "--batch-size", "1", stdout=out)
+    assert "2 productos revisados, 2 corregidos" in out.getvalue()
+    assert favorite_counts(first, second) == [1, 0]
+
+
+@pytest.mark.django_db
+def test_other_users_see_the_new_count(api_client, vendor, make_products):
+    [product] = make_products(1, images=0)
+    # Last-Modified tiene resolución de segundos
+    Product.objects.filter(pk=product.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+    other = APIClient()
+    other.force_authenticate(user=vendor)
+    detail = other.get(f"/api/product/{product.id}/")
+    listing = other.get("/api/product/")
+    assert detail.data["favorite_count"] == listing.data[0]["favorite_count"] == 0
+    assert api_client.get("/api/product/").data[0]["is_favorite"] is False
+
+    api_client.post(f"/api/product/{product.id}/favorite/")
+
+    # El detalle cambia al instante
+    assert other.get(f"/api/product/{product.id}/", HTTP_IF_NONE_MATCH=detail["ETag"]).status_code == 200
+    assert other.get(f"/api/product/{product.id}/", HTTP_IF_MODIFIED_SINCE=detail["Last-Modified"]).status_code == 200
+    assert other.get(f"/api/product/{product.id}/").data["favorite_count"] == 1
+    # Los listados cacheados de otros usuarios no se invalidan por cada clic...
+    assert other.get("/api/product/", HTTP_IF_NONE_MATCH=listing["ETag"]).status_code == 304
+    # ...pero el de quien marcó el favorito sí
+    assert api_client.get("/api/product/").data[0]["favorite_count"] == 1
+    # Los demás ven el contador nuevo cuando vence su entrada
+    cache.clear()
+    assert other.get("/api/product/").data[0]["favorite_count"] == 1
@@ -0,0 +1,114 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.utils import timezone
+
+from drfarequipamarket.product import uploads
+from drfarequipamarket.product.models import ProductImage
+from drfarequipamarket.product.uploads import wait_for_uploads
+
+
+@pytest.fixture
+def create_product(api_client, category, jpeg_bytes):
+    def create(images):
+        files = [
+            SimpleUploadedFile(f"foto{i}.jpg", jpeg_bytes(), content_type="image/jpeg") for i in range(images)
+        ]
+        return api_client.post("/api/product/", {
+            "name": "Cámara réflex",
+            "description": "Con lente 18-55",
+            "price": 1200,
+            "currency": "PEN",
+            "state": "USED/A",
+            "category": category.id,
+            "product_image": files,
+        }, format="multipart")
+
+    return create
+
+
+@pytest.mark.django_db(transaction=True)
+def test_images_upload_in_background_and_report_status(api_client, create_product):
+    response = create_product(images=3)
+
+    assert response.status_code == 201
+    product_id = response.json()["id"]
+    wait_for_uploads(timeout=10)
+
+    images = api_client.get(f"/api/product/{product_id}/images/").json()
+    assert [image["status"] for image in images] == ["ready"] * 3
+    assert all(image["url"].startswith("http://testserver/media/product_images/foto") for image in images)
+    listed = api_client.get(f"/api/product/{product_id}/").json()["product_image"]
+    assert len(listed) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_uploads_run_concurrently(create_product, local_image_storage, monkeypatch):
+    # Cada subida espera a las otras dos: solo termina si corren en paralelo.
+    barrier = threading.Barrier(3, timeout=5)
+    original_save = local_image_storage._save
+
+    def slow_save(name, content):
+        barrier.wait()
+        return original_save(name, content)
+
+    monkeypatch.setattr(local_image_storage, "_save", slow_save)
+
+    response = create_product(images=3)
+    wait_for_uploads(timeout=10)
+
+    statuses = ProductImage.objects.filter(product_id=response.json()["id"]).values_list("status", flat=True)
+    assert list(statuses) == ["ready"] * 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_upload_is_marked_and_hidden_from_listing(api_client, create_product, local_image_storage, monkeypatch):
+    def broken_save(name, content):
+        raise OSError("R2 no disponible")
+
+    monkeypatch.setattr(local_image_storage, "_save", broken_save)
+
+    response = create_product(images=1)
+    product_id = response.json()["id"]
+    assert len(response.json()["product_image"]) == 1
+    wait_for_uploads(timeout=10)
+
+    images = api_client.get(f"/api/product/{product_id}/images/").json()
+    assert [(image["status"], image["url"]) for image in images] == [("failed", None)]
+    assert api_client.get(f"/api/product/{product_id}/").json()["product_image"] == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_image_is_marked_failed_when_saving_the_row_fails(make_products, monkeypatch):
+    def broken_save(self, *args, **kwargs):
+        raise DatabaseError("conexión perdida")
+
+    [product] = make_products(1, images=0)
+    image = ProductImage.objects.create(product=product, status=ProductImage.STATUS_PENDING)
+    monkeypatch.setattr(ProductImage, "save", broken_save)
+    uploads._submit(image.pk, ContentFile(b"no importa", name="foto.jpg"))
+    wait_for_uploads(timeout=10)
+
+    image.refresh_from_db()
+    assert image.status == ProductImage.STATUS_FAILED
+
+
+@pytest.mark.django_db
+def test_sweep_marks_or_deletes_stale_pending_images(make_products):
+    [product] = make_products(1, images=0)
+    stale, recent = [ProductImage.objects.create(product=product, status=ProductImage.STATUS_PENDING) for _ in range(2)]
+    ProductImage.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(hours=1))
+
+    out = StringIO()
+    call_command("sweep_pending_images", stdout=out)
+    assert "1 imágenes pendientes marcadas como fallidas" in out.getvalue()
+    assert [ProductImage.objects.get(pk=image.pk).status for image in (stale, recent)] == ["failed", "pending"]
+
+    call_command("sweep_pending_images", "--older-than", "0", "--delete", stdout=StringIO())
+    assert list(ProductImage.objects.values_list("status", flat=True)) == ["failed"]
@@ -0,0 +1,99 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from drfarequipamarket.product.images import IMAGE_VARIANTS, ORIGINAL_MAX_SIZE, process_image
+from drfarequipamarket.product.models import ProductImage
+from drfarequipamarket.product.uploads import queue_product_images, wait_for_uploads
+
+
+def _open(content):
+    content.seek(0)
+    return Image.open(content)
+
+
+def test_process_image_caps_size_and_builds_webp_variants(jpeg_bytes):
+    processed = process_image(io.BytesIO(jpeg_bytes((4000, 3000))), "foto.jpg")
+
+    original = _open(processed.original)
+    assert original.format == "JPEG"
+    assert max(original.size) == ORIGINAL_MAX_SIZE
+    for variant, width in IMAGE_VARIANTS.items():
+        image = _open(processed.variants[variant])
+        assert image.format == "WEBP"
+        assert image.size == (width, width * 3 // 4)
+
+
+def test_process_image_applies_orientation_and_strips_exif(jpeg_bytes):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotar 90°
+    exif[0x010F] = "Cámara con GPS"
+    processed = process_image(io.BytesIO(jpeg_bytes((300, 100), exif=exif)), "foto.jpg")
+
+    original = _open(processed.original)
+    assert original.size == (100, 300)
+    assert not original.getexif()
+    # Las imágenes pequeñas no se amplían.
+    assert _open(processed.variants["large"]).size == (100, 300)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upload_stores_variants_and_list_can_request_thumbnails(api_client, make_products, jpeg_bytes):
+    product = make_products(1, images=0)[0]
+    [image] = queue_product_images(product, [SimpleUploadedFile("foto.jpg", jpeg_bytes())])
+    wait_for_uploads(timeout=10)
+
+    image.refresh_from_db()
+    assert image.status == ProductImage.STATUS_READY
+    assert set(image.variants) == set(IMAGE_VARIANTS)
+    listed = api_client.get("/api/product/").json()[0]["product_image"][0]
+    assert listed["url"].endswith(".jpg")
+    assert listed["variants"]["thumb"].endswith("_200.webp")
+    thumbs = api_client.get("/api/product/", {"image_variant": "thumb"}).json()[0]["product_image"][0]
+    assert thumbs["url"] == listed["variants"]["thumb"]
+
+
+def _create(client, category, content):
+    return client.post("/api/product/", {
+        "name": "Cámara", "description": "Réflex", "price": 100, "currency": "PEN",
+        "state": "NEW", "category": category.id,
+        "product_image": [SimpleUploadedFile("foto.jpg", content, content_type="image/jpeg")],
+    }, format="multipart")
+
+
+@pytest.mark.django_db
+def test_create_rejects_files_that_are_not_images(api_client, category):
+    response = _create(api_client, category, b"no soy una imagen")
+
+    assert response.status_code == 400
+    assert "no es una imagen válida" in response.json()["error"]
+    assert not ProductImage.objects.exists()
+
+
+@pytest.mark.django_db
+def test_create_rejects_images_over_the_size_cap(api_client, category, settings, jpeg_bytes):
+    settings.PRODUCT_IMAGE_MAX_UPLOAD_SIZE = 1024
+
+    response = _create(api_client, category, jpeg_bytes((1000, 1000), quality=100))
+
+    assert response.status_code == 400
+    assert "supera el máximo" in response.json()["error"]
+    assert not ProductImage.objects.exists()
+
+
+@pytest.mark.django_db
+def test_generate_variants_replaces_the_old_original(make_products, local_image_storage, jpeg_bytes):
+    [product] = make_products(1, images=0)
+    old_name = local_image_storage.save("product_images/antigua.jpg", io.BytesIO(jpeg_bytes((2000, 1500))))
+    image = ProductImage.objects.create(product=product, url=old_name)
+
+    call_command("generate_image_variants", stdout=io.StringIO(), stderr=io.StringIO())
+
+    image.refresh_from_db()
+    assert set(image.variants) == set(IMAGE_VARIANTS)
+    assert image.url.name != old_name
+    assert local_image_storage.exists(image.url.name)
+    assert not local_image_storage.exists(old_name)
@@ -0,0 +1,132 @@
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from drfarequipamarket.product import importers
+from drfarequipamarket.product.importers import import_products
+from drfarequipamarket.product.models import Product
+
+HEADER = "name,description,price,currency,state,category,distrito\n"
+
+
+def csv_file(category, rows):
+    lines = [HEADER] + [row.format(category=category.id) + "\n" for row in rows]
+    return io.StringIO("".join(lines))
+
+
+@pytest.mark.django_db
+def test_import_csv_reports_row_errors_without_aborting(vendor, category):
+    stream = csv_file(category, [
+        "Cámara,Réflex,1200,PEN,NEW,{category},Cayma",
+        "Sin precio,Algo,,PEN,NEW,{category},",
+        "Bicicleta,Montañera,800,PEN,USED/A,999999,",
+        "Celular,Samsung,500,USD,NEW,{category},Yanahuara",
+    ])
+
+    report = import_products(stream, vendor, file_format="csv")
+
+    assert report.created == 2
+    assert report.failed == 2
+    assert [error["line"] for error in report.errors] == [3, 4]
+    assert "price" in report.errors[0]["errors"]
+    assert "category" in report.errors[1]["errors"]
+    products = Product.objects.filter(vendor=vendor).order_by("id")
+    assert [p.name for p in products] == ["Cámara", "Celular"]
+    assert products[0].distrito == "Cayma"
+    assert products[0].search_vector is not None
+
+
+@pytest.mark.django_db
+def test_import_uses_one_insert_per_batch(vendor, category, django_assert_num_queries):
+    stream = csv_file(category, ["Producto {n},Desc,10,PEN,NEW,{{category}}".format(n=n) for n in range(10)])
+
+    # categorías + 3 lotes de bulk_create (con sus savepoints)
+    with django_assert_num_queries(1 + 3 * 3):
+        report = import_products(stream, vendor, file_format="csv", batch_size=4)
+
+    assert report.created == 10
+
+
+@pytest.mark.django_db
+def test_import_falls_back_to_row_inserts_on_database_errors(vendor, category):
+    rows = [
+        {"name": "Bueno", "description": "x", "price": 1, "currency": "PEN", "state": "NEW", "category": category.id},
+        # state pasa el serializer pero excede el max_length de la columna
+        {"name": "Malo", "description": "x", "price": 1, "currency": "PEN", "state": "USED/XYZ", "category": category.id},
+    ]
+    stream = io.StringIO("".join(json.dumps(row) + "\n" for row in rows) + "no es json\n")
+
+    report = import_products(stream, vendor, file_format="jsonl")
+
+    assert report.created == 1
+    assert sorted(error["line"] for error in report.errors) == [2, 3]
+    assert Product.objects.get(vendor=vendor).name == "Bueno"
+
+
+@pytest.mark.django_db
+def test_import_caps_reported_errors(vendor, category, monkeypatch):
+    monkeypatch.setattr(importers, "MAX_REPORTED_ERRORS", 2)
+    stream = csv_file(category, ["X,Y,caro,PEN,NEW,{category}"] * 5)
+
+    result = import_products(stream, vendor, file_format="csv").as_dict()
+
+    assert result["failed"] == 5
+    assert len(result["errors"]) == 2
+    assert result["errors_truncated"] is True
+
+
+@pytest.mark.django_db
+def test_import_endpoint_invalidates_cached_listing(api_client, user, category):
+    assert api_client.get("/api/product/").json() == []
+    content = csv_file(category, ["Guitarra,Eléctrica,300,PEN,NEW,{category}"]).getvalue().encode()
+
+    response = api_client.post(
+        "/api/product/import/",
+        {"file": SimpleUploadedFile("inventario.csv", content, content_type="text/csv")},
+        format="multipart",
+    )
+
+    assert response.status_code == 201
+    assert response.json()["created"] == 1
+    listing = api_client.get("/api/product/").json()
+    assert [(p["name"], p["vendor_id"]) for p in listing] == [("Guitarra", user.id)]
+
+
+@pytest.mark.django_db
+def test_import_command(tmp_path, vendor, category):
+    path = tmp_path / "productos.jsonl"
+    path.write_text(json.dumps({
+        "name": "Sillón", "description": "Cuero", "price": 450, "currency": "PEN",
+        "state": "USED/B", "category": category.id,
+    }) + "\n", encoding="utf-8")
+    out = io.StringIO()
+
+    call_command("import_products", str(path), vendor=vendor.email, stdout=out)
+
+    assert "1 productos creados" in out.getvalue()
+    assert Product.objects.filter(vendor=vendor, name="Sillón").exists()
+
+
+@pytest.mark.django_db
+def test_import_endpoint_reports_encoding_errors_after_committed_batches(api_client, user, category):
+    # Más de un lote (IMPORT_BATCH_SIZE) en UTF-8 y luego un byte inválido
+    good = csv_file(category, ["Producto {n},Desc,10,PEN,NEW,{{category}}".format(n=n) for n in range(600)])
+    content = good.getvalue().encode() + b"Caf\xe9,Latin-1,10,PEN,NEW,1\n"
+
+    response = api_client.post(
+        "/api/product/import/",
+        {"file": SimpleUploadedFile("inventario.csv", content, content_type="text/csv")},
+        format="multipart",
+    )
+
+    assert response.status_code == 201
+    report = response.json()
+    assert report["created"] == Product.objects.filter(vendor=user).count() >= importers.IMPORT_BATCH_SIZE
+    assert report["failed"] == 1
+    [error] = report["errors"]
+    # Encabezado en la línea 1: la primera fila no leída es created + 2
+    assert error["line"] == report["created"] + 2
+    assert "UTF-8" in error["errors"]["non_field_errors"][0]
@@ -0,0 +1,22 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+
+@pytest.mark.django_db
+def test_every_filter_combination_uses_an_index():
+    out = StringIO()
+    call_command("check_product_indexes", stdout=out)
+    assert "SEQ SCAN" not in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_missing_location_index_is_reported():
+    with connection.cursor() as cursor:
+        cursor.execute("DROP INDEX product_location_idx")
+        cursor.execute("DROP INDEX product_distrito_idx")
+    out = StringIO()
+    with pytest.raises(CommandError, match="departamento=Arequipa"):
+        call_command("check_product_indexes", stdout=out)
@@ -0,0 +1,60 @@
+def _walk(client, url):
+    ids, pages = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        body = response.json()
+        ids.extend(p["id"] for p in body["results"])
+        url = body["next"]
+        pages += 1
+    return ids, pages
+
+
+def test_list_without_cursor_keeps_plain_list(api_client, make_products):
+    make_products(3, images=0)
+    response = api_client.get("/api/product/")
+    assert isinstance(response.json(), list)
+
+
+def test_list_without_cursor_applies_ordering(api_client, user, vendor, make_products):
+    least, most, middle = make_products(3, images=0)
+    user.favorite_products.add(most, middle)
+    vendor.favorite_products.add(most)
+
+    response = api_client.get("/api/product/?ordering=-favorite_count")
+
+    assert [row["id"] for row in response.json()] == [most.id, middle.id, least.id]
+    assert [row["id"] for row in api_client.get("/api/product/?ordering=id").json()] == [least.id, most.id, middle.id]
+
+
+def test_cursor_pagination_visits_every_product_once(api_client, make_products):
+    products = make_products(25, images=0)
+    ids, pages = _walk(api_client, "/api/product/?page_size=10")
+    assert ids == sorted((p.id for p in products), reverse=True)
+    assert pages == 3
+
+
+def test_price_ordering_is_stable_with_ties_and_filters(api_client, make_products, category):
+    make_products(7, images=0, price=50)
+    cheap = make_products(9, images=0, price=10, departamento="Arequipa")
+    make_products(5, images=0, price=10, departamento="Lima")
+
+    url = f"/api/product/?page_size=4&ordering=price&departamento=Arequipa&category={category.id}"
+    ids, _ = _walk(api_client, url)
+    assert ids == [p.id for p in cheap]
+
+
+def test_previous_cursor_returns_the_preceding_page(api_client, make_products):
+    make_products(12, images=0)
+    first = api_client.get("/api/product/?page_size=5&ordering=-price").json()
+    second = api_client.get(first["next"]).json()
+    back = api_client.get(second["previous"]).json()
+
+    assert first["previous"] is None
+    assert [p["id"] for p in back["results"]] == [p["id"] for p in first["results"]]
+    assert back["previous"] is None
+
+
+def test_invalid_cursor_returns_404(api_client):
+    response = api_client.get("/api/product/?cursor=no-es-un-cursor")
+    assert response.status_code == 404
@@ -0,0 +1,49 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries), response.json()
+
+
+def test_product_list_query_count_is_constant(api_client, user, make_products):
+    user.favorite_products.add(*make_products(3))
+    small, _ = _count_queries(api_client, "/api/product/")
+
+    make_products(30)
+    large, data = _count_queries(api_client, "/api/product/")
+
+    assert len(data) == 33
+    assert small == large == 3
+    assert sum(p["is_favorite"] for p in data) == 3
+
+
+def test_listing_actions_query_count_is_constant(api_client, user, vendor, category, make_products):
+    products = make_products(2)
+    user.favorite_products.add(*products)
+    urls = [
+        f"/api/product/category/{category.id}/all/",
+        "/api/product/favorite/",
+    ]
+    before = [_count_queries(api_client, url)[0] for url in urls]
+
+    user.favorite_products.add(*make_products(20))
+    after = [_count_queries(api_client, url)[0] for url in urls]
+
+    assert before == after
+
+
+def test_vendor_listing_query_count_is_constant(vendor, make_products):
+    client = APIClient()
+    client.force_authenticate(user=vendor)
+    make_products(2)
+    small, _ = _count_queries(client, "/api/product/me/")
+    make_products(20)
+    large, data = _count_queries(client, "/api/product/me/")
+
+    assert len(data) == 22
+    assert small == large
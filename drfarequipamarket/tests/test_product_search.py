@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from drfarequipamarket.product.models import Product
+
+
+def _names(client, query):
+    response = client.get("/api/product/", {"search": query})
+    assert response.status_code == 200
+    return [p["name"] for p in response.json()]
+
+
+def test_search_ignores_accents_and_uses_stemming(api_client, make_products):
+    make_products(1, images=0, name="Cámara réflex Canon")
+    make_products(1, images=0, name="Bicicleta montañera")
+    assert _names(api_client, "camara") == ["Cámara réflex Canon"]
+    assert _names(api_client, "cámaras") == ["Cámara réflex Canon"]
+
+
+def test_search_vector_is_not_exposed(api_client, make_products):
+    make_products(1, images=0)
+    assert "search_vector" not in api_client.get("/api/product/").json()[0]
+
+
+def test_search_covers_description_category_and_location(api_client, make_products, category):
+    make_products(1, images=0, name="Equipo A", description="Incluye trípode de aluminio")
+    make_products(1, images=0, name="Equipo B", distrito="Yanahuara")
+    make_products(1, images=0, name="Equipo C")
+
+    assert _names(api_client, "tripode") == ["Equipo A"]
+    assert _names(api_client, "yanahuara") == ["Equipo B"]
+    assert len(_names(api_client, "electronica")) == 3
+
+
+def test_name_matches_rank_above_description_matches(api_client, make_products):
+    make_products(1, images=0, name="Funda", description="Funda para guitarra acústica")
+    make_products(1, images=0, name="Guitarra acústica", description="Poco uso")
+    assert _names(api_client, "guitarra") == ["Guitarra acústica", "Funda"]
+
+
+def test_typos_fall_back_to_trigram_similarity(api_client, make_products):
+    make_products(1, images=0, name="Refrigeradora Samsung")
+    make_products(1, images=0, name="Lavadora LG")
+    assert _names(api_client, "refrigeradra") == ["Refrigeradora Samsung"]
+
+
+def test_search_combines_with_filters(api_client, make_products):
+    make_products(1, images=0, name="Laptop Lenovo", departamento="Arequipa")
+    make_products(1, images=0, name="Laptop HP", departamento="Lima")
+    response = api_client.get("/api/product/", {"search": "laptop", "departamento": "Lima"})
+    assert [p["name"] for p in response.json()] == ["Laptop HP"]
+
+
+def test_category_rename_and_rebuild_refresh_the_vector(api_client, make_products, category):
+    make_products(2, images=0)
+    category.name = "Fotografía"
+    category.save()
+    assert len(_names(api_client, "fotografia")) == 2
+
+    Product.objects.update(search_vector=None)
+    cache.clear()
+    assert _names(api_client, "fotografia") == []
+    call_command("rebuild_search_index", batch_size=1, stdout=StringIO())
+    assert len(_names(api_client, "fotografia")) == 2
+
+
+def test_paginated_search_keeps_rank_order(api_client, make_products):
+    make_products(1, images=0, name="Guitarra acústica", description="Poco uso")
+    make_products(1, images=0, name="Funda", description="Funda para guitarra acústica")
+
+    with CaptureQueriesContext(connection) as queries:
+        first = api_client.get("/api/product/", {"search": "guitarra", "page_size": 1})
+    assert [p["name"] for p in first.data["results"]] == ["Guitarra acústica"]
+    # Sin consulta previa de exists(): solo la página
+    assert not any("EXISTS" in query["sql"].upper() for query in queries)
+
+    second = api_client.get(first.data["next"])
+    assert [p["name"] for p in second.data["results"]] == ["Funda"]
+    assert second.data["next"] is None
+    assert [p["name"] for p in api_client.get(second.data["previous"]).data["results"]] == ["Guitarra acústica"]
+
+
+def test_paginated_typos_keep_the_trigram_fallback(api_client, make_products):
+    make_products(1, images=0, name="Refrigeradora Samsung")
+    make_products(1, images=0, name="Refrigeradora LG")
+    make_products(1, images=0, name="Lavadora LG")
+
+    first = api_client.get("/api/product/", {"search": "refrigeradra", "page_size": 1})
+    assert len(first.data["results"]) == 1
+    assert "search_mode=fuzzy" in first.data["next"]
+
+    second = api_client.get(first.data["next"])
+    names = [p["name"] for p in first.data["results"] + second.data["results"]]
+    assert sorted(names) == ["Refrigeradora LG", "Refrigeradora Samsung"]
@@ -0,0 +1,92 @@
+import json
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.files.base import ContentFile
+
+from drfarequipamarket.chat.routing import websocket_urlpatterns
+from drfarequipamarket.profiling import instrument_storage, profiled
+
+
+def server_timing(response):
+    return {
+        name: (float(duration), desc)
+        for name, duration, desc in re.findall(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', response["Server-Timing"])
+    }
+
+
+@pytest.mark.django_db
+def test_requests_report_server_timing(api_client, chat_group):
+    response = api_client.get("/api/chatgroup/")
+
+    assert response.status_code == 200
+    timing = server_timing(response)
+    assert set(timing) == {"db", "storage", "render", "total"}
+    assert re.fullmatch(r"[1-9]\d* consultas", timing["db"][1])
+    assert timing["storage"][1] == "0 llamadas"
+    assert timing["total"][0] >= timing["db"][0] + timing["render"][0]
+
+
+@pytest.mark.django_db
+def test_slow_requests_and_queries_are_logged_with_view_name(api_client, chat_group, settings, caplog):
+    settings.PERF_SLOW_REQUEST_MS = 0
+    settings.PERF_SLOW_QUERY_MS = 0
+
+    with caplog.at_level(logging.WARNING, logger="drfarequipamarket.profiling"):
+        api_client.get("/api/chatgroup/")
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(m.startswith("Consulta lenta") and "(chatgroup-list)" in m and "SELECT" in m for m in messages)
+    assert messages[-1].startswith("Request lento GET /api/chatgroup/ (chatgroup-list):")
+
+
+@pytest.mark.django_db
+def test_instrumentation_can_be_disabled(api_client, settings, caplog):
+    settings.PERF_INSTRUMENTATION = False
+    settings.PERF_SLOW_REQUEST_MS = 0
+
+    with caplog.at_level(logging.WARNING, logger="drfarequipamarket.profiling"):
+        response = api_client.get("/api/chatgroup/")
+
+    assert "Server-Timing" not in response
+    assert not caplog.records
+
+
+def test_storage_calls_are_counted_once(local_image_storage):
+    storage = instrument_storage(local_image_storage)
+    assert instrument_storage(storage) is storage
+
+    with profiled("subida") as profile:
+        # save() llama internamente a exists(): cuenta como una sola llamada
+        name = storage.save("a.txt", ContentFile(b"hola"))
+        storage.exists(name)
+    storage.delete(name)
+
+    assert profile.storage_calls == 2
+    assert profile.storage_ms > 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_websocket_messages_are_profiled(chat_group, user, settings, caplog):
+    settings.PERF_SLOW_REQUEST_MS = 0
+
+    @async_to_sync
+    async def scenario():
+        client = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/chatroom/{chat_group.group_name_id}")
+        client.scope["user"] = user
+        assert (await client.connect())[0]
+        await client.send_to(text_data=json.dumps({"action": "message", "body": "Hola"}))
+        await client.receive_from(timeout=5)
+        await client.disconnect()
+
+    with caplog.at_level(logging.WARNING, logger="drfarequipamarket.profiling"):
+        scenario()
+
+    [message] = [record.getMessage() for record in caplog.records]
+    assert message.startswith(f"Request lento ChatroomConsumer.message (chat {chat_group.id}):")
+    queries = int(re.search(r"(\d+) consultas", message).group(1))
+    assert queries > 0
@@ -0,0 +1,71 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from drfarequipamarket.product.models import Category, District, ProductImage
+
+
+def _get(client, url, **headers):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, headers=headers)
+    return response, len(ctx.captured_queries)
+
+
+def test_category_list_is_served_from_cache_and_revalidated(api_client, category):
+    first, _ = _get(api_client, "/api/category/")
+    second, queries = _get(api_client, "/api/category/")
+    assert queries == 0
+    assert second.json() == first.json()
+
+    not_modified, queries = _get(api_client, "/api/category/", If_None_Match=first["ETag"])
+    assert not_modified.status_code == 304
+    assert queries == 0
+
+    Category.objects.create(name="Hogar")
+    changed, _ = _get(api_client, "/api/category/", If_None_Match=first["ETag"])
+    assert changed.status_code == 200
+    assert changed["ETag"] != first["ETag"]
+    assert len(changed.json()["results"]) == 2
+
+
+def test_query_params_are_part_of_the_key(api_client, make_products):
+    make_products(1, images=0, departamento="Lima")
+    make_products(1, images=0, departamento="Cusco")
+    lima, _ = _get(api_client, "/api/product/?departamento=Lima")
+    cusco, _ = _get(api_client, "/api/product/?departamento=Cusco")
+    assert lima["ETag"] != cusco["ETag"]
+    assert [p["departamento"] for p in cusco.json()] == ["Cusco"]
+
+
+def test_product_reads_are_invalidated_by_image_and_favourite_changes(api_client, user, make_products):
+    product = make_products(1, images=0)[0]
+    url = f"/api/product/{product.id}/"
+    first, _ = _get(api_client, url)
+    assert first.json()["product_image"] == []
+
+    ProductImage.objects.create(product=product, url="product_images/nueva.jpg")
+    with_image, _ = _get(api_client, url, If_None_Match=first["ETag"])
+    assert with_image.status_code == 200
+    assert len(with_image.json()["product_image"]) == 1
+
+    user.favorite_products.add(product)
+    favourite, _ = _get(api_client, "/api/product/")
+    assert favourite.json()[0]["is_favorite"] is True
+    product.favorite_products.clear()
+    assert _get(api_client, "/api/product/")[0].json()[0]["is_favorite"] is False
+
+
+def test_product_cache_is_per_user(api_client, vendor, make_products):
+    make_products(1, images=0)
+    mine = APIClient()
+    mine.force_authenticate(user=vendor)
+    assert len(_get(api_client, "/api/product/?mine=true")[0].json()) == 0
+    assert len(_get(mine, "/api/product/?mine=true")[0].json()) == 1
+
+
+def test_district_list_is_cached(api_client):
+    District.objects.create(name="Cayma")
+    _get(api_client, "/api/district/")
+    cached, queries = _get(api_client, "/api/district/")
+    assert queries == 0
+    assert cached.json() == [{"id": cached.json()[0]["id"], "name": "Cayma"}]
@@ -0,0 +1,101 @@
+import pytest
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from drfarequipamarket.chat.middleware import TokenAuthMiddleware
+from drfarequipamarket.chat.routing import websocket_urlpatterns
+from drfarequipamarket.users.authentication import TokenCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def token(user):
+    return Token.objects.create(user=user)
+
+
+@pytest.fixture
+def token_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+def test_cached_token_saves_the_lookup_query(token_client):
+    _, first = count_queries(token_client, "/api/chatgroup/")
+    response, second = count_queries(token_client, "/api/chatgroup/")
+
+    assert response.status_code == 200
+    assert second == first - 1
+
+
+@pytest.mark.django_db
+def test_deleted_token_and_inactive_user_are_rejected(token_client, token, user):
+    assert token_client.get("/api/chatgroup/").status_code == 200
+
+    user.is_active = False
+    user.save()
+    assert token_client.get("/api/chatgroup/").status_code == 401
+
+    user.is_active = True
+    user.save()
+    assert token_client.get("/api/chatgroup/").status_code == 200
+
+    token.delete()
+    assert token_client.get("/api/chatgroup/").status_code == 401
+
+
+def test_token_cache_is_bounded_lru_with_ttl(django_user_model):
+    clock = FakeClock()
+    cache = TokenCache(max_entries=2, timeout=10, clock=clock)
+    users = [django_user_model(pk=pk) for pk in (1, 2, 3)]
+
+    cache.set("a", users[0], None)
+    cache.set("b", users[1], None)
+    assert cache.get("a") is not None  # "a" pasa a ser el más reciente
+    cache.set("c", users[2], None)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    cache.invalidate_user(3)
+    assert cache.get("c") is None
+
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.entries == {} and cache.keys_by_user == {}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_websocket_authenticates_with_token(chat_group, token):
+    application = TokenAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    @async_to_sync
+    async def connect(path, headers=None):
+        client = WebsocketCommunicator(application, path, headers=headers or [])
+        connected, _ = await client.connect()
+        await client.disconnect()
+        return connected
+
+    path = f"/ws/chatroom/{chat_group.group_name_id}"
+    assert connect(f"{path}?token={token.key}")
+    assert connect(path, [(b"authorization", f"Token {token.key}".encode())])
+    assert not connect(f"{path}?token=invalido")
+    assert not connect(path)
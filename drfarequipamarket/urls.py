@@ -9,6 +9,7 @@ from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 from drfarequipamarket.product import views
 from drfarequipamarket.chat import views as ViewChat
+from drfarequipamarket.monitoring import DatabasePoolStatsView, MetricsView
 
 # Changed imports
 from django.urls import re_path as url
@@ -30,6 +31,8 @@ router.register(r"message", views.MessageViewSet)
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include(router.urls)),
+    path("api/monitoring/db-pool/", DatabasePoolStatsView.as_view(), name="db_pool_stats"),
+    path("api/monitoring/metrics/", MetricsView.as_view(), name="metrics"),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/schema/docs/", SpectacularSwaggerView.as_view(url_name="schema")
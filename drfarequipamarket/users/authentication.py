@@ -0,0 +1,112 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+
+class TokenCache:
+    """
+    Caché en memoria del proceso token -> (usuario, token): LRU acotado a
+    ``max_entries`` y con vencimiento de ``timeout`` segundos.
+
+    Las invalidaciones (ver signals.py) solo alcanzan al proceso donde
+    ocurren; en los demás la entrada dura como mucho ``timeout``, por eso
+    conviene un valor corto.
+    """
+
+    def __init__(self, max_entries, timeout, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.keys_by_user = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self.clock():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, user, token):
+        if self.max_entries <= 0 or self.timeout <= 0:
+            return
+        with self.lock:
+            self._remove(key)
+            self.entries[key] = (self.clock() + self.timeout, (user, token))
+            self.keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def invalidate_user(self, user_id):
+        with self.lock:
+            for key in [*self.keys_by_user.get(user_id, ())]:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_user.clear()
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1][0].pk
+        keys = self.keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_user[user_id]
+
+
+token_cache = TokenCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    timeout=settings.TOKEN_CACHE_TIMEOUT,
+)
+
+
+def resolve_token(key):
+    """
+    Devuelve ``(usuario, token)`` para la clave ``key`` o lanza
+    AuthenticationFailed, con los mismos mensajes que TokenAuthentication.
+
+    Un acierto en caché no hace consultas; un fallo hace una sola (token y
+    usuario juntos). Cada llamada recibe su propia copia del usuario, así
+    que modificar ``request.user`` no altera la entrada cacheada.
+    """
+    cached = token_cache.get(key)
+    if cached is None:
+        try:
+            token = Token.objects.select_related("user").get(key=key)
+        except Token.DoesNotExist:
+            raise AuthenticationFailed(_("Invalid token."))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        token_cache.set(key, token.user, token)
+        cached = (token.user, token)
+    user, token = cached
+    return copy.copy(user), token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication de DRF resolviendo el token con resolve_token."""
+
+    def authenticate_credentials(self, key):
+        return resolve_token(key)
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .models import CustomUser
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    # Logout o rotación del token
+    token_cache.invalidate(instance.key)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    # Desactivación, borrado o cambios de perfil: request.user no debe
+    # quedar desactualizado.
+    token_cache.invalidate_user(instance.pk)